@@ -1,61 +1,654 @@
 """
 Account class untuk mengelola akun keuangan
 """
-from datetime import datetime
-from typing import List, Optional
+import bisect
+import functools
+import itertools
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Union
+
+from currency import BASE_CURRENCY, FxTable, format_amount, get_fx_table
+from instrumentation import timed
+from search_index import TransactionSearchIndex
+from utils import Reporter
+
+TransactionId = Union[str, int]  # int hanya untuk data lama (id lama berbasis id(self))
+
+# Nomor versi diambil dari satu counter untuk semua Account, sehingga akun yang
+# dimuat ulang tidak pernah memakai nomor versi yang sama dengan akun sebelumnya
+_versions = itertools.count(1)
+
+_CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_id_lock = threading.Lock()
+_last_id_ms = 0
+_last_id_random = 0
+
+def generate_transaction_id() -> str:
+    """Membuat ID transaksi unik bergaya ULID (26 karakter, urut sesuai waktu pembuatan)"""
+    global _last_id_ms, _last_id_random
+    
+    with _id_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_id_ms:
+            # Milidetik yang sama: naikkan bagian acak agar tetap monotonic
+            now_ms = _last_id_ms
+            _last_id_random += 1
+        else:
+            _last_id_random = int.from_bytes(os.urandom(10), "big") >> 1
+        _last_id_ms = now_ms
+        value = (now_ms << 80) | _last_id_random
+    
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+class TransactionType(str, Enum):
+    """Jenis transaksi; turunan str sehingga tetap sama dengan 'income'/'expense'"""
+    INCOME = "income"
+    EXPENSE = "expense"
+    
+    def __str__(self):
+        return self.value
+    
+    def __format__(self, format_spec):
+        return self.value.__format__(format_spec)
+
+_TRANSACTION_TYPES = {member.value: member for member in TransactionType}
+
+# Waktu transaksi disimpan sebagai integer mikrodetik sejak _EPOCH (waktu lokal naive)
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_MICROSECOND = timedelta(microseconds=1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+def to_timestamp(value: datetime) -> int:
+    """Konversi datetime ke timestamp integer (mikrodetik sejak 1970-01-01, waktu lokal)"""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+def from_timestamp(timestamp: int) -> datetime:
+    """Konversi timestamp integer kembali ke datetime"""
+    return _EPOCH + timedelta(microseconds=timestamp)
+
+def month_key(year: int, month: int) -> int:
+    """Key bulan sebagai satu integer (urut sesuai waktu)"""
+    return year * 12 + month - 1
+
+@functools.lru_cache(maxsize=4096)
+def _month_key_for_day(day: int) -> int:
+    day_date = date.fromordinal(_EPOCH_ORDINAL + day)
+    return month_key(day_date.year, day_date.month)
+
+# Registry kategori: transaksi dengan kategori yang sama berbagi satu objek string
+_categories: Dict[str, str] = {}
+
+def intern_category(category: str) -> str:
+    """Kembalikan objek string kategori yang dipakai bersama"""
+    return _categories.setdefault(category, category)
 
 class Transaction:
     """Class untuk merepresentasikan transaksi"""
     
-    def __init__(self, amount: float, description: str, transaction_type: str, category: str = ""):
-        self.id = id(self)  # Simple ID menggunakan object id
-        self.amount = amount
+    # Tanpa __dict__ per objek; penting untuk ledger berisi jutaan transaksi
+    __slots__ = ("id", "amount", "description", "_transaction_type", "_category", "timestamp", "month_key",
+                 "goal_id", "currency", "original_amount")
+    
+    def __init__(self, amount: float, description: str, transaction_type: str, category: str = "",
+                 transaction_id: Optional[TransactionId] = None, timestamp: Optional[int] = None,
+                 goal_id: Optional[str] = None, currency: Optional[str] = None,
+                 original_amount: Optional[float] = None):
+        self.id = transaction_id if transaction_id is not None else generate_transaction_id()
+        self.amount = amount  # selalu dalam Rupiah (mata uang dasar)
         self.description = description
-        self.transaction_type = transaction_type.lower()  # 'income' atau 'expense'
+        self.transaction_type = transaction_type  # 'income' atau 'expense'
         self.category = category
-        self.date = datetime.now()
+        self.goal_id = goal_id  # id FinancialGoal untuk setoran (expense) / penarikan (income) tabungan
+        # Untuk transaksi dalam mata uang asing: kode mata uang dan jumlah aslinya (None = Rupiah)
+        self.currency = currency
+        self.original_amount = original_amount
+        self.set_timestamp(timestamp if timestamp is not None else to_timestamp(datetime.now()))
+    
+    @property
+    def transaction_type(self) -> TransactionType:
+        return self._transaction_type
+    
+    @transaction_type.setter
+    def transaction_type(self, value: str):
+        transaction_type = _TRANSACTION_TYPES.get(value)
+        self._transaction_type = transaction_type or TransactionType(value.lower())
+    
+    @property
+    def date(self) -> datetime:
+        """Waktu transaksi; datetime hanya dibuat saat dibutuhkan (tampilan, export)"""
+        return from_timestamp(self.timestamp)
+    
+    @date.setter
+    def date(self, value: datetime):
+        self.set_timestamp(to_timestamp(value))
+    
+    def set_timestamp(self, timestamp: int):
+        """Set waktu transaksi dari timestamp integer beserta key bulannya"""
+        self.timestamp = timestamp
+        self.month_key = _month_key_for_day(timestamp // MICROSECONDS_PER_DAY)
+    
+    @property
+    def category(self) -> str:
+        return self._category
+    
+    @category.setter
+    def category(self, value: str):
+        self._category = intern_category(value)
         
     def __str__(self):
-        return f"{self.date.strftime('%Y-%m-%d %H:%M')} - {self.transaction_type.capitalize()}: {self.description} - Rp {self.amount:,.0f}"
+        text = f"{self.date.strftime('%Y-%m-%d %H:%M')} - {self.transaction_type.capitalize()}: {self.description} - Rp {self.amount:,.0f}"
+        if self.currency is not None:
+            text += f" ({format_amount(self.original_amount, self.currency)})"
+        return text
     
     def __repr__(self):
         return f"Transaction(amount={self.amount}, description='{self.description}', type='{self.transaction_type}')"
+    
+    def to_dict(self) -> dict:
+        """Konversi transaksi ke dictionary untuk disimpan ke JSON"""
+        data = {
+            "id": self.id,
+            "amount": self.amount,
+            "description": self.description,
+            "transaction_type": self.transaction_type,
+            "category": self.category,
+            "date": self.date.isoformat(),
+            "ts": self.timestamp
+        }
+        # Hanya ditulis jika ada, agar record transaksi biasa (dan hash-nya di storage) tidak berubah
+        if self.goal_id is not None:
+            data["goal_id"] = self.goal_id
+        if self.currency is not None:
+            data["currency"] = self.currency
+            data["original_amount"] = self.original_amount
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transaction":
+        """Membuat transaksi dari dictionary hasil load JSON"""
+        # Data baru menyimpan 'ts' sehingga tidak perlu parsing tanggal;
+        # 'date' tetap ditulis untuk dibaca manusia dan dipakai oleh data lama
+        timestamp = data.get("ts")
+        if timestamp is None:
+            timestamp = to_timestamp(datetime.fromisoformat(data["date"]))
+        return cls(
+            data["amount"],
+            data["description"],
+            data["transaction_type"],
+            data["category"],
+            transaction_id=data.get("id"),
+            timestamp=timestamp,
+            goal_id=data.get("goal_id"),
+            currency=data.get("currency"),
+            original_amount=data.get("original_amount")
+        )
+
+def _transaction_timestamp(transaction: Transaction) -> int:
+    return transaction.timestamp
+
+def _sorted_insert(transactions: List[Transaction], transaction: Transaction) -> int:
+    """Sisipkan transaksi ke list yang urut tanggal, kembalikan posisinya"""
+    if not transactions or transaction.timestamp >= transactions[-1].timestamp:
+        transactions.append(transaction)
+        return len(transactions) - 1
+    
+    position = bisect.bisect_right(transactions, transaction.timestamp, key=_transaction_timestamp)
+    transactions.insert(position, transaction)
+    return position
 
-class Account:
+def _sorted_position(transactions: List[Transaction], transaction: Transaction) -> int:
+    """Posisi transaksi di list yang urut tanggal (binary search lalu cek identitas)"""
+    position = bisect.bisect_left(transactions, transaction.timestamp, key=_transaction_timestamp)
+    while transactions[position] is not transaction:
+        position += 1
+    return position
+
+class Account(Reporter):
     """Class untuk mengelola akun keuangan personal"""
     
     def __init__(self, owner_name: str, initial_balance: float = 0.0):
-        self.owner_name = owner_name
+        # Naik setiap kali akun berubah; dipakai sebagai key cache (chart, budget, export)
+        self.version = next(_versions)
+        self._listeners: List[Callable[["Account", str], None]] = []
+        self._owner_name = owner_name
         self.balance = initial_balance
-        self.transactions: List[Transaction] = []
+        self.opening_balance = initial_balance
+        self.transactions: List[Transaction] = []  # selalu urut berdasarkan tanggal
         self.created_date = datetime.now()
+        self._transactions_by_id: Dict[TransactionId, Transaction] = {}
+        # True jika ada id bentrok yang diganti (file lama); storage harus menulis ulang seluruh file
+        self.ids_reassigned = False
+        # Tabel kurs untuk transaksi mata uang asing; LedgerStorage memasang tabel di folder ledger
+        self.fx_table: FxTable = get_fx_table()
+        # Agregat yang dijaga secara incremental pada setiap add/update/delete
+        self._monthly_totals: Dict[int, dict] = {}  # key: month_key(tahun, bulan)
+        self._category_totals: Dict[str, dict] = {}
+        # Prefix sum saldo: _running_balances[i] = saldo setelah transactions[i].
+        # Dihitung lazy dan dipotong dari posisi transaksi yang berubah.
+        self._running_balances: List[float] = []
+        # Index sekunder untuk query: jenis/kategori -> transaksi (urut tanggal)
+        self._type_index: Dict[str, List[Transaction]] = {}
+        self._category_index: Dict[str, List[Transaction]] = {}
+        # Prefix sum pengeluaran per kategori, sejajar dengan _category_index[kategori]:
+        # _category_expense_sums[k][i] = total expense bucket[0..i]. Lazy, dipotong seperti _running_balances.
+        self._category_expense_sums: Dict[str, List[float]] = {}
+        # Tabungan per financial goal: goal_id -> total setoran bersih dan transaksinya
+        self._goal_totals: Dict[str, float] = {}
+        self._goal_index: Dict[str, List[Transaction]] = {}
+        # Inverted index pencarian dibangun di latar belakang setelah load (prepare_search_index)
+        # atau saat pertama kali dipakai (lihat _searchable)
+        self._search_index: Optional[TransactionSearchIndex] = None
+        self._search_build: Optional[tuple] = None  # (versi akun, thread, [index hasil build])
+        # Hasil pencarian teks terakhir, urut tanggal: (versi akun, teks, transaksi)
+        self._search_hits: Optional[tuple] = None
+    
+    @property
+    def owner_name(self) -> str:
+        return self._owner_name
+    
+    @owner_name.setter
+    def owner_name(self, value: str):
+        if value != self._owner_name:
+            self._owner_name = value
+            self._touch("rename")
+    
+    def subscribe(self, callback: Callable[["Account", str], None]) -> Callable[["Account", str], None]:
+        """Daftarkan callback(account, event) yang dipanggil setiap akun berubah
+        
+        event: "add", "update", "delete", "rename" atau "load".
+        """
+        self._listeners.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback: Callable[["Account", str], None]):
+        """Hapus callback yang didaftarkan dengan subscribe()"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _touch(self, event: str):
+        """Naikkan versi dan beri tahu subscriber"""
+        self.version = next(_versions)
+        for callback in list(self._listeners):
+            callback(self, event)
+    
+    def _index_transaction(self, transaction: Transaction):
+        """Daftarkan transaksi ke index id; id yang bentrok diganti dengan id baru"""
+        if transaction.id in self._transactions_by_id:
+            transaction.id = generate_transaction_id()
+            self.ids_reassigned = True
+        self._transactions_by_id[transaction.id] = transaction
+    
+    def prepare_search_index(self) -> threading.Thread:
+        """Bangun inverted index di thread latar belakang (dipanggil frontend interaktif setelah load)
         
-    def add_income(self, amount: float, description: str, category: str = "Income") -> bool:
-        """Menambah pemasukan"""
+        Thread hanya membaca snapshot daftar transaksi; index dipasang oleh _searchable di
+        thread pemilik akun, dan dibuang jika akun berubah selama index dibangun.
+        """
+        transactions = list(self.transactions)
+        result: List[TransactionSearchIndex] = []
+        
+        def build():
+            index = TransactionSearchIndex()
+            for transaction in transactions:
+                index.add(transaction)
+            result.append(index)
+        
+        thread = threading.Thread(target=build, name="search-index", daemon=True)
+        self._search_build = (self.version, thread, result)
+        thread.start()
+        return thread
+    
+    def _searchable(self) -> TransactionSearchIndex:
+        """Inverted index pencarian; dari build latar belakang jika masih berlaku, selain itu dibangun sekali
+        
+        Load akun (mis. perintah CLI 'balance') tidak perlu men-tokenize setiap deskripsi.
+        """
+        if self._search_index is None and self._search_build is not None:
+            version, thread, result = self._search_build
+            self._search_build = None
+            if version == self.version:
+                thread.join()
+                self._search_index = result[0] if result else None
+        if self._search_index is None:
+            index = TransactionSearchIndex()
+            for transaction in self.transactions:
+                index.add(transaction)
+            self._search_index = index
+        return self._search_index
+    
+    def _text_hits(self, text: str) -> List[Transaction]:
+        """Transaksi yang cocok dengan teks, urut tanggal (lama ke baru)
+        
+        Disimpan per versi akun, jadi halaman berikutnya dari pencarian yang sama
+        cukup slicing tanpa mencari dan mengurutkan ulang kandidat.
+        """
+        if self._search_hits is None or self._search_hits[:2] != (self.version, text):
+            self._search_hits = (self.version, text, self._searchable().search(text)[::-1])
+        return self._search_hits[2]
+    
+    def get_transaction(self, transaction_id: TransactionId) -> Optional[Transaction]:
+        """Mencari transaksi berdasarkan id dalam O(1)"""
+        return self._transactions_by_id.get(transaction_id)
+    
+    @staticmethod
+    def _signed_amount(transaction: Transaction) -> float:
+        return transaction.amount if transaction.transaction_type == "income" else -transaction.amount
+    
+    def _apply_totals(self, transaction: Transaction, sign: int):
+        """Tambah (sign=1) atau kurangi (sign=-1) kontribusi transaksi ke saldo dan agregat"""
+        self.balance += sign * self._signed_amount(transaction)
+        kind = "income" if transaction.transaction_type == "income" else "expense"
+        
+        monthly = self._monthly_totals.setdefault(transaction.month_key, {"income": 0, "expense": 0, "count": 0})
+        monthly[kind] += sign * transaction.amount
+        monthly["count"] += sign
+        if monthly["count"] == 0:
+            del self._monthly_totals[transaction.month_key]
+        
+        category = self._category_totals.setdefault(transaction.category, {"income": 0, "expense": 0, "count": 0})
+        category[kind] += sign * transaction.amount
+        category["count"] += sign
+        if category["count"] == 0:
+            del self._category_totals[transaction.category]
+        
+        if transaction.goal_id is not None:
+            # Expense ke goal = setoran, income dari goal = penarikan
+            self._goal_totals[transaction.goal_id] = (
+                self._goal_totals.get(transaction.goal_id, 0) - sign * self._signed_amount(transaction))
+    
+    def _position(self, transaction: Transaction) -> int:
+        """Posisi transaksi di list utama"""
+        return _sorted_position(self.transactions, transaction)
+    
+    def _invalidate_running_balances(self, position: int):
+        del self._running_balances[position:]
+    
+    def _update_secondary_indexes(self, transaction: Transaction, sign: int):
+        """Tambah (sign=1) atau hapus (sign=-1) transaksi dari index jenis, kategori dan goal"""
+        indexes = [(self._type_index, transaction.transaction_type),
+                   (self._category_index, transaction.category)]
+        if transaction.goal_id is not None:
+            indexes.append((self._goal_index, transaction.goal_id))
+        for index, key in indexes:
+            if sign > 0:
+                position = _sorted_insert(index.setdefault(key, []), transaction)
+            else:
+                bucket = index[key]
+                position = _sorted_position(bucket, transaction)
+                del bucket[position]
+                if not bucket:
+                    del index[key]
+            if index is self._category_index:
+                self._invalidate_category_sums(key, position)
+    
+    def _invalidate_category_sums(self, category: str, position: int):
+        sums = self._category_expense_sums.get(category)
+        if sums is not None:
+            del sums[position:]
+    
+    def _add_transaction(self, transaction: Transaction):
+        """Tambahkan transaksi ke akun beserta index dan agregatnya (urutan tanggal dijaga)"""
+        position = _sorted_insert(self.transactions, transaction)
+        if position < len(self.transactions) - 1:
+            self._invalidate_running_balances(position)
+        self._index_transaction(transaction)
+        self._update_secondary_indexes(transaction, 1)
+        if self._search_index is not None:
+            self._search_index.add(transaction)
+        self._apply_totals(transaction, 1)
+        self._touch("add")
+    
+    def _remove_transaction(self, transaction: Transaction):
+        """Hapus transaksi dari akun beserta index dan agregatnya"""
+        position = self._position(transaction)
+        del self.transactions[position]
+        self._invalidate_running_balances(position)
+        del self._transactions_by_id[transaction.id]
+        self._update_secondary_indexes(transaction, -1)
+        if self._search_index is not None:
+            self._search_index.remove(transaction)
+        self._apply_totals(transaction, -1)
+        self._touch("delete")
+    
+    def _replace_transaction(self, old: Transaction, new: Transaction):
+        """Ganti transaksi di posisi yang sama (id dan tanggal tetap sama)"""
+        position = self._position(old)
+        self.transactions[position] = new
+        self._invalidate_running_balances(position)
+        self._transactions_by_id[new.id] = new
+        self._update_secondary_indexes(old, -1)
+        self._update_secondary_indexes(new, 1)
+        if self._search_index is not None:
+            self._search_index.remove(old)
+            self._search_index.add(new)
+        self._apply_totals(old, -1)
+        self._apply_totals(new, 1)
+        self._touch("update")
+    
+    def _ensure_running_balances(self, upto: int):
+        """Lengkapi prefix sum saldo sampai indeks `upto` (eksklusif)"""
+        running = self._running_balances
+        if len(running) >= upto:
+            return
+        
+        balance = running[-1] if running else self.opening_balance
+        for transaction in self.transactions[len(running):upto]:
+            if transaction.transaction_type == "income":
+                balance += transaction.amount
+            else:
+                balance -= transaction.amount
+            running.append(balance)
+    
+    @timed()
+    def get_running_balances(self, start: int = 0, stop: Optional[int] = None) -> List[float]:
+        """Saldo setelah setiap transaksi pada transactions[start:stop]"""
+        stop = len(self.transactions) if stop is None else min(stop, len(self.transactions))
+        self._ensure_running_balances(stop)
+        return self._running_balances[start:stop]
+    
+    def get_balance_after(self, transaction_id: TransactionId) -> Optional[float]:
+        """Saldo tepat setelah transaksi tertentu (O(log N) untuk mencari posisinya)"""
+        transaction = self.get_transaction(transaction_id)
+        if transaction is None:
+            return None
+        
+        position = self._position(transaction)
+        self._ensure_running_balances(position + 1)
+        return self._running_balances[position]
+    
+    @timed()
+    def get_balance_at(self, date: datetime, inclusive: bool = True) -> float:
+        """Saldo pada waktu tertentu (transaksi pada waktu `date` ikut dihitung jika inclusive)"""
+        return self.get_balance_at_timestamp(to_timestamp(date), inclusive)
+    
+    def get_balance_at_timestamp(self, timestamp: int, inclusive: bool = True) -> float:
+        """Seperti get_balance_at, dengan waktu berupa timestamp integer"""
+        search = bisect.bisect_right if inclusive else bisect.bisect_left
+        count = search(self.transactions, timestamp, key=_transaction_timestamp)
+        if count == 0:
+            return self.opening_balance
+        
+        self._ensure_running_balances(count)
+        return self._running_balances[count - 1]
+    
+    def _foreign_amount(self, amount: float, currency: Optional[str]) -> Optional[tuple]:
+        """(jumlah Rupiah, kode mata uang atau None, jumlah asli atau None); None jika kurs tidak ada"""
+        if currency is None or currency.upper() == BASE_CURRENCY:
+            return amount, None, None
+        base_amount = self.fx_table.to_base(amount, currency)
+        if base_amount is None:
+            self._report(f"❌ Kurs {currency.upper()} tidak tersedia di tabel kurs")
+            return None
+        return base_amount, currency.upper(), amount
+    
+    @timed()
+    def add_income(self, amount: float, description: str, category: str = "Income",
+                   goal_id: Optional[str] = None, currency: Optional[str] = None) -> Optional[Transaction]:
+        """Menambah pemasukan; kembalikan transaksi baru, None jika gagal
+        
+        goal_id: catat sebagai penarikan tabungan dari financial goal.
+        currency: mata uang asing, dikonversi ke Rupiah dengan tabel kurs.
+        """
         if amount <= 0:
-            print("❌ Jumlah pemasukan harus lebih dari 0")
-            return False
+            self._report("❌ Jumlah pemasukan harus lebih dari 0")
+            return None
+        
+        converted = self._foreign_amount(amount, currency)
+        if converted is None:
+            return None
+        amount, currency, original_amount = converted
             
-        transaction = Transaction(amount, description, "income", category)
-        self.transactions.append(transaction)
-        self.balance += amount
-        print(f"✅ Pemasukan berhasil ditambahkan: Rp {amount:,.0f}")
-        return True
+        transaction = Transaction(amount, description, "income", category, goal_id=goal_id,
+                                  currency=currency, original_amount=original_amount)
+        self._add_transaction(transaction)
+        self._report(f"✅ Pemasukan berhasil ditambahkan: Rp {amount:,.0f}")
+        return transaction
     
-    def add_expense(self, amount: float, description: str, category: str = "Expense") -> bool:
-        """Menambah pengeluaran"""
+    @timed()
+    def add_expense(self, amount: float, description: str, category: str = "Expense",
+                    goal_id: Optional[str] = None, currency: Optional[str] = None) -> Optional[Transaction]:
+        """Menambah pengeluaran; kembalikan transaksi baru, None jika gagal
+        
+        goal_id: catat sebagai setoran tabungan untuk financial goal.
+        """
         if amount <= 0:
-            print("❌ Jumlah pengeluaran harus lebih dari 0")
-            return False
+            self._report("❌ Jumlah pengeluaran harus lebih dari 0")
+            return None
+        
+        converted = self._foreign_amount(amount, currency)
+        if converted is None:
+            return None
+        amount, currency, original_amount = converted
             
         if amount > self.balance:
-            print(f"❌ Saldo tidak mencukupi. Saldo saat ini: Rp {self.balance:,.0f}")
-            return False
+            self._report(f"❌ Saldo tidak mencukupi. Saldo saat ini: Rp {self.balance:,.0f}")
+            return None
             
-        transaction = Transaction(amount, description, "expense", category)
-        self.transactions.append(transaction)
-        self.balance -= amount
-        print(f"✅ Pengeluaran berhasil dicatat: Rp {amount:,.0f}")
+        transaction = Transaction(amount, description, "expense", category, goal_id=goal_id,
+                                  currency=currency, original_amount=original_amount)
+        self._add_transaction(transaction)
+        self._report(f"✅ Pengeluaran berhasil dicatat: Rp {amount:,.0f}")
+        return transaction
+    
+    @timed()
+    def add_batch(self, entries: List[tuple]) -> bool:
+        """Menambah banyak transaksi sekaligus
+        
+        entries berisi tuple (jenis, jumlah, kategori, deskripsi) atau
+        (jenis, jumlah, kategori, deskripsi, tanggal[, id]) untuk transaksi bertanggal
+        (mis. catch-up transaksi berulang dengan id tetap per kejadian). Semua entri dicek
+        lebih dulu; jika ada yang tidak valid atau membuat saldo negatif, tidak ada
+        transaksi yang ditambahkan.
+        """
+        balance = self.balance
+        for number, (transaction_type, amount, category, description, *_) in enumerate(entries, 1):
+            if transaction_type not in _TRANSACTION_TYPES:
+                self._report(f"❌ Transaksi ke-{number}: jenis transaksi harus 'income' atau 'expense'")
+                return False
+            if amount <= 0:
+                self._report(f"❌ Transaksi ke-{number}: jumlah harus lebih dari 0")
+                return False
+            if transaction_type == "expense" and amount > balance:
+                self._report(f"❌ Transaksi ke-{number}: saldo tidak mencukupi (saldo saat itu Rp {balance:,.0f})")
+                return False
+            balance += amount if transaction_type == "income" else -amount
+        
+        for transaction_type, amount, category, description, *extra in entries:
+            timestamp = to_timestamp(extra[0]) if extra else None
+            transaction_id = extra[1] if len(extra) > 1 else None
+            self._add_transaction(Transaction(amount, description, transaction_type, category,
+                                              transaction_id=transaction_id, timestamp=timestamp))
+        
+        self._report(f"✅ {len(entries)} transaksi berhasil ditambahkan")
+        return True
+    
+    @timed()
+    def update_transaction(self, transaction_id: TransactionId, amount: Optional[float] = None,
+                           description: Optional[str] = None, category: Optional[str] = None,
+                           transaction_type: Optional[str] = None) -> bool:
+        """Mengubah transaksi; saldo dan ringkasan disesuaikan tanpa hitung ulang"""
+        transaction = self.get_transaction(transaction_id)
+        if transaction is None:
+            self._report("❌ Transaksi tidak ditemukan")
+            return False
+        
+        if amount is not None and amount <= 0:
+            self._report("❌ Jumlah transaksi harus lebih dari 0")
+            return False
+        
+        if transaction_type is not None and transaction_type.lower() not in ("income", "expense"):
+            self._report("❌ Jenis transaksi harus 'income' atau 'expense'")
+            return False
+        
+        new_amount = amount if amount is not None else transaction.amount
+        new_type = transaction_type.lower() if transaction_type is not None else transaction.transaction_type
+        new_signed = new_amount if new_type == "income" else -new_amount
+        new_balance = self.balance - self._signed_amount(transaction) + new_signed
+        if new_balance < 0 and new_balance < self.balance:
+            self._report(f"❌ Saldo tidak mencukupi. Saldo saat ini: Rp {self.balance:,.0f}")
+            return False
+        
+        reindex = new_type != transaction.transaction_type or (
+            category is not None and category != transaction.category)
+        
+        retokenize = (description is not None and description != transaction.description) or (
+            category is not None and category != transaction.category)
+        
+        self._apply_totals(transaction, -1)
+        if reindex:
+            self._update_secondary_indexes(transaction, -1)
+        if retokenize and self._search_index is not None:
+            self._search_index.remove(transaction)
+        if new_amount != transaction.amount or new_type != transaction.transaction_type:
+            self._invalidate_running_balances(self._position(transaction))
+            if not reindex:
+                bucket = self._category_index[transaction.category]
+                self._invalidate_category_sums(transaction.category, _sorted_position(bucket, transaction))
+        if transaction.currency is not None and new_amount != transaction.amount:
+            # Jumlah baru dalam Rupiah; jumlah asli disesuaikan dengan kurs transaksi semula
+            transaction.original_amount *= new_amount / transaction.amount
+        transaction.amount = new_amount
+        transaction.transaction_type = new_type
+        if description is not None:
+            transaction.description = description
+        if category is not None:
+            transaction.category = category
+        if reindex:
+            self._update_secondary_indexes(transaction, 1)
+        if retokenize and self._search_index is not None:
+            self._search_index.add(transaction)
+        self._apply_totals(transaction, 1)
+        self._touch("update")
+        
+        self._report("✅ Transaksi berhasil diperbarui")
+        return True
+    
+    @timed()
+    def delete_transaction(self, transaction_id: TransactionId) -> bool:
+        """Menghapus transaksi; saldo dan ringkasan disesuaikan tanpa hitung ulang"""
+        transaction = self.get_transaction(transaction_id)
+        if transaction is None:
+            self._report("❌ Transaksi tidak ditemukan")
+            return False
+        
+        new_balance = self.balance - self._signed_amount(transaction)
+        if new_balance < 0 and new_balance < self.balance:
+            self._report(f"❌ Saldo tidak mencukupi. Saldo saat ini: Rp {self.balance:,.0f}")
+            return False
+        
+        self._remove_transaction(transaction)
+        self._report("✅ Transaksi berhasil dihapus")
         return True
     
     def get_balance(self) -> float:
@@ -68,42 +661,165 @@ class Account:
             return self.transactions[-limit:]
         return self.transactions
     
+    def get_category_expense_between(self, category: str, start_date: datetime, end_date: datetime) -> float:
+        """Total pengeluaran kategori dengan start_date <= tanggal < end_date
+        
+        Dua binary search di index kategori ditambah selisih prefix sum: O(log N) per query
+        setelah prefix sum kategori terbentuk (dibuat sekali, lalu hanya diperpanjang).
+        """
+        bucket = self._category_index.get(category)
+        if not bucket:
+            return 0.0
+        low = bisect.bisect_left(bucket, to_timestamp(start_date), key=_transaction_timestamp)
+        high = bisect.bisect_left(bucket, to_timestamp(end_date), key=_transaction_timestamp)
+        if high <= low:
+            return 0.0
+        
+        sums = self._category_expense_sums.setdefault(category, [])
+        if len(sums) < high:
+            total = sums[-1] if sums else 0.0
+            for transaction in bucket[len(sums):high]:
+                if transaction.transaction_type == "expense":
+                    total += transaction.amount
+                sums.append(total)
+        return sums[high - 1] - (sums[low - 1] if low else 0.0)
+    
+    def get_goal_savings(self, goal_id: str) -> float:
+        """Total tabungan bersih untuk financial goal dari transaksi yang terhubung (O(1))"""
+        return self._goal_totals.get(goal_id, 0.0)
+    
+    def get_goal_transactions(self, goal_id: str) -> List[Transaction]:
+        """Transaksi yang terhubung ke financial goal, urut tanggal"""
+        return list(self._goal_index.get(goal_id, []))
+    
+    def get_transactions_between(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+        """Transaksi dengan start_date <= tanggal < end_date (binary search, urut tanggal)"""
+        low = bisect.bisect_left(self.transactions, to_timestamp(start_date), key=_transaction_timestamp)
+        high = bisect.bisect_left(self.transactions, to_timestamp(end_date), key=_transaction_timestamp)
+        return self.transactions[low:high]
+    
+    @timed()
     def get_monthly_summary(self, month: int, year: int) -> dict:
         """Mendapatkan ringkasan bulanan"""
-        monthly_transactions = [
-            t for t in self.transactions 
-            if t.date.month == month and t.date.year == year
-        ]
-        
-        total_income = sum(t.amount for t in monthly_transactions if t.transaction_type == "income")
-        total_expense = sum(t.amount for t in monthly_transactions if t.transaction_type == "expense")
+        totals = self._monthly_totals.get(month_key(year, month), {"income": 0, "expense": 0, "count": 0})
         
         return {
             "month": month,
             "year": year,
-            "total_income": total_income,
-            "total_expense": total_expense,
-            "net_income": total_income - total_expense,
-            "transaction_count": len(monthly_transactions)
+            "total_income": totals["income"],
+            "total_expense": totals["expense"],
+            "net_income": totals["income"] - totals["expense"],
+            "transaction_count": totals["count"]
         }
     
+    @timed()
     def get_category_summary(self) -> dict:
         """Mendapatkan ringkasan per kategori"""
-        category_summary = {}
+        return {category: dict(totals) for category, totals in self._category_totals.items()}
+    
+    @timed()
+    def search_transactions(self, query: str, limit: Optional[int] = None) -> List[Transaction]:
+        """Cari transaksi berdasarkan kata di deskripsi/kategori (prefix), terbaru lebih dulu"""
+        return self._searchable().search(query, limit)
+    
+    def get_categories(self) -> List[str]:
+        """Daftar kategori yang dipakai (diambil dari agregat, tanpa scan transaksi)"""
+        return sorted(self._category_totals)
+    
+    @timed()
+    def query_transactions(self, transaction_type: Optional[str] = None, category: Optional[str] = None,
+                           start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                           text: Optional[str] = None, min_amount: Optional[float] = None,
+                           max_amount: Optional[float] = None, page: int = 1, page_size: int = 25) -> dict:
+        """Mencari transaksi dengan filter dan paginasi (terbaru lebih dulu)
         
-        for transaction in self.transactions:
-            category = transaction.category
-            if category not in category_summary:
-                category_summary[category] = {"income": 0, "expense": 0, "count": 0}
-            
-            if transaction.transaction_type == "income":
-                category_summary[category]["income"] += transaction.amount
-            else:
-                category_summary[category]["expense"] += transaction.amount
-            
-            category_summary[category]["count"] += 1
+        Teks dicocokkan per kata sebagai prefix melalui inverted index. Tanpa teks,
+        sumber data diambil dari index jenis/kategori terkecil dan dipersempit dengan
+        binary search pada rentang tanggal. Jika tidak ada filter tambahan, satu halaman
+        diambil langsung dengan slicing tanpa scan.
+        """
+        source = self.transactions
+        need_type_check = transaction_type is not None
+        need_category_check = category is not None
+        
+        if text:
+            # Kandidat dari inverted index; jenis dan kategori dicek per item
+            source = self._text_hits(text)
+        elif category is not None:
+            source = self._category_index.get(category, [])
+            need_category_check = False
+        if transaction_type is not None and not text:
+            type_bucket = self._type_index.get(transaction_type, [])
+            if category is None or len(type_bucket) < len(source):
+                source = type_bucket
+                need_type_check = False
+                need_category_check = category is not None
+        
+        low = 0 if start_date is None else bisect.bisect_left(
+            source, to_timestamp(start_date), key=_transaction_timestamp)
+        high = len(source) if end_date is None else bisect.bisect_right(
+            source, to_timestamp(end_date), key=_transaction_timestamp)
+        page = max(page, 1)
+        skip = (page - 1) * page_size
+        
+        def matches(t: Transaction) -> bool:
+            if need_type_check and t.transaction_type != transaction_type:
+                return False
+            if need_category_check and t.category != category:
+                return False
+            if min_amount is not None and t.amount < min_amount:
+                return False
+            if max_amount is not None and t.amount > max_amount:
+                return False
+            return True
+        
+        if not (need_type_check or need_category_check
+                or min_amount is not None or max_amount is not None):
+            total = max(high - low, 0)
+            stop = max(high - skip, low)
+            start = max(stop - page_size, low)
+            items = source[start:stop][::-1]
+        else:
+            total = 0
+            items = []
+            for position in range(high - 1, low - 1, -1):
+                transaction = source[position]
+                if matches(transaction):
+                    if skip <= total < skip + page_size:
+                        items.append(transaction)
+                    total += 1
+        
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": max((total + page_size - 1) // page_size, 1)
+        }
+    
+    @timed()
+    def to_dict(self) -> dict:
+        """Konversi akun beserta transaksinya ke dictionary untuk disimpan ke JSON"""
+        return {
+            "owner_name": self.owner_name,
+            "balance": self.balance,
+            "created_date": self.created_date.isoformat(),
+            "transactions": [t.to_dict() for t in self.transactions]
+        }
+    
+    @classmethod
+    @timed()
+    def from_dict(cls, data: dict) -> "Account":
+        """Membuat akun dari dictionary hasil load JSON"""
+        # Saldo dihitung ulang dari transaksi
+        account = cls(data["owner_name"], 0)
+        account.created_date = datetime.fromisoformat(data["created_date"])
+        
+        for trans_data in data["transactions"]:
+            account._add_transaction(Transaction.from_dict(trans_data))
+        account._touch("load")
         
-        return category_summary
+        return account
     
     def __str__(self):
         return f"Akun: {self.owner_name} | Saldo: Rp {self.balance:,.0f} | Transaksi: {len(self.transactions)}"
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Load test untuk api_server.py: request per detik dan latensi dari banyak koneksi keep-alive
+
+Contoh penggunaan:
+    python api_loadtest.py --spawn --size 100000               # jalankan server sementara dengan ledger sintetis
+    python api_loadtest.py --port 8765 --ledger finance_data   # terhadap server yang sudah berjalan
+    python api_loadtest.py --spawn --connections 64 --write-ratio 0.1 --duration 20
+
+Campuran request: list transaksi (halaman acak), ringkasan bulanan, ringkasan kategori,
+budget, dan (sesuai --write-ratio) penambahan transaksi.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ledger_generator import generate_account
+from storage import LedgerStorage
+
+
+class Client:
+    """Satu koneksi HTTP/1.1 keep-alive"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+                          .encode("latin-1") + data)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {k.strip().lower(): v.strip() for k, v in (line.split(":", 1) for line in lines[1:] if ":" in line)}
+
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(headers.get("content-length", "0")))
+
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+
+def _pick_request(ledger: str, write_ratio: float, total_pages: int) -> Tuple[str, str, str, Optional[dict]]:
+    """(nama, method, path, body) acak sesuai campuran beban"""
+    if random.random() < write_ratio:
+        return ("add", "POST", f"/ledgers/{ledger}/transactions",
+                {"type": "income", "amount": random.randint(1, 500) * 1000,
+                 "category": "Load Test", "description": "Transaksi load test"})
+    kind = random.choice(["list", "list", "monthly", "categories", "budgets"])
+    if kind == "list":
+        return kind, "GET", f"/ledgers/{ledger}/transactions?page={random.randint(1, total_pages)}&page_size=25", None
+    if kind == "monthly":
+        return kind, "GET", f"/ledgers/{ledger}/summary/monthly?month={random.randint(1, 12)}", None
+    return kind, "GET", f"/ledgers/{ledger}/{'summary/categories' if kind == 'categories' else 'budgets'}", None
+
+
+async def _worker(host: str, port: int, ledger: str, deadline: float, write_ratio: float,
+                  total_pages: int, latencies: Dict[str, List[float]], errors: List[str]):
+    client = Client(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            name, method, path, body = _pick_request(ledger, write_ratio, total_pages)
+            start = time.perf_counter()
+            try:
+                status, payload = await client.request(method, path, body)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                errors.append(f"{name}: {e!r}")
+                await client.close()
+                continue
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(f"{name}: HTTP {status} {payload[:120]!r}")
+    finally:
+        await client.close()
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_load(host: str, port: int, ledger: str, connections: int, duration: float,
+                   write_ratio: float) -> dict:
+    """Jalankan beban selama `duration` detik dan kembalikan ringkasan hasil"""
+    probe = Client(host, port)
+    status, payload = await probe.request("GET", f"/ledgers/{ledger}/transactions?page_size=25")
+    await probe.close()
+    if status != 200:
+        raise SystemExit(f"❌ Ledger '{ledger}' tidak bisa dibaca: HTTP {status} {payload[:200]!r}")
+    total_pages = json.loads(payload)["total_pages"]
+
+    latencies: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_worker(host, port, ledger, deadline, write_ratio, total_pages, latencies, errors)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "connections": connections,
+        "duration_s": elapsed,
+        "requests": len(all_latencies),
+        "requests_per_second": len(all_latencies) / elapsed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "latency_ms": {
+            name: {
+                "count": len(values),
+                "mean": statistics.fmean(values) * 1000,
+                "p50": _percentile(values, 0.50) * 1000,
+                "p95": _percentile(values, 0.95) * 1000,
+                "p99": _percentile(values, 0.99) * 1000,
+            }
+            for name, values in sorted(latencies.items())
+        },
+    }
+
+
+def _spawn_server(size: int, port: int) -> Tuple[subprocess.Popen, str]:
+    """Buat ledger sintetis di folder sementara lalu jalankan api_server.py terhadapnya"""
+    directory = tempfile.mkdtemp(prefix="finance-api-")
+    print(f"🏗️  Membuat ledger sintetis {size:,} transaksi di {directory} ...")
+    LedgerStorage(os.path.join(directory, "loadtest.json")).save(
+        generate_account(size, owner_name="Load Test"), replace=True)
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_server.py"),
+         "--data-dir", directory, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+    return server, directory
+
+
+async def _wait_until_ready(host: str, port: int, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise SystemExit("❌ Server tidak merespons")
+            await asyncio.sleep(0.1)
+
+
+def print_report(result: dict):
+    print(f"\n📈 {result['requests']:,} request dalam {result['duration_s']:.1f} detik "
+          f"dengan {result['connections']} koneksi")
+    print(f"   ⚡ {result['requests_per_second']:,.0f} request/detik, {result['errors']} error")
+    print(f"\n{'Request':<12}{'Jumlah':>10}{'Mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for name, stats in result["latency_ms"].items():
+        print(f"{name:<12}{stats['count']:>10,}{stats['mean']:>10.2f}{stats['p50']:>10.2f}"
+              f"{stats['p95']:>10.2f}{stats['p99']:>10.2f}")
+    for sample in result["error_samples"]:
+        print(f"   ❌ {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test HTTP/JSON API Personal Finance Manager")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ledger", default="finance_data", help="Nama ledger yang diuji")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Jalankan server sementara dengan ledger sintetis (ledger 'loadtest')")
+    parser.add_argument("--size", type=int, default=10_000, help="Jumlah transaksi ledger sintetis (--spawn)")
+    parser.add_argument("--connections", type=int, default=32, help="Jumlah koneksi paralel")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durasi beban (detik)")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="Porsi request yang menulis (0-1)")
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    server = directory = None
+    ledger = args.ledger
+    if args.spawn:
+        server, directory = _spawn_server(args.size, args.port)
+        ledger = "loadtest"
+
+    try:
+        asyncio.run(_wait_until_ready(args.host, args.port))
+        result = asyncio.run(run_load(args.host, args.port, ledger, args.connections,
+                                      args.duration, args.write_ratio))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=2)
+        print(f"\n💾 Hasil ditulis ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
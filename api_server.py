@@ -0,0 +1,657 @@
+"""
+HTTP/JSON API lokal untuk Account dan BudgetManager (asyncio, tanpa dependency tambahan)
+
+Menjalankan server:
+    python api_server.py --data-dir . --port 8765
+
+Setiap ledger adalah file <nama>.json di data-dir dengan skema finance_data.json
+(ledger 'finance_data' = file yang dipakai CLI dan Streamlit). Ledger dimuat sekali
+ke memori dan dimuat ulang hanya jika file diubah proses lain.
+
+Endpoint (semua body dan respons JSON, kecuali export CSV):
+    GET    /ledgers                                  daftar ledger di data-dir
+    POST   /ledgers                                  {"name", "owner_name", "initial_balance"}
+    GET    /ledgers/<nama>                           pemilik, saldo, jumlah transaksi
+    GET    /ledgers/<nama>/transactions              ?page&page_size&type&category&text&start&end&min&max
+    POST   /ledgers/<nama>/transactions              {"type", "amount", "category", "description", "currency"}
+    GET    /ledgers/<nama>/summary/monthly           ?month&year&currency
+    GET    /ledgers/<nama>/summary/categories        ?currency
+    GET    /ledgers/<nama>/budgets                   ?month&year&currency
+    PUT    /ledgers/<nama>/budgets/<kategori>        {"limit", "period", "days", "anchor_date"}
+    DELETE /ledgers/<nama>/budgets/<kategori>
+    GET    /ledgers/<nama>/goals
+    POST   /ledgers/<nama>/goals                     {"name", "target_amount", "target_date"}
+    POST   /ledgers/<nama>/goals/<goal>/savings      {"amount", "description"}  (<goal>: id atau nama)
+    POST   /ledgers/<nama>/goals/<goal>/withdrawals  {"amount", "description"}
+    GET    /ledgers/<nama>/export.csv                CSV di-stream per blok (chunked)
+
+Transaksi berulang yang jatuh tempo dicatat saat ledger dimuat dan setiap
+--recurring-interval detik.
+
+Penulisan ke satu ledger diserialkan dengan asyncio.Lock per ledger dan I/O disk
+dijalankan di thread pool, sehingga request baca (termasuk ke ledger yang sama)
+tetap dilayani selama file sedang ditulis. Account hanya diubah di thread event loop:
+thread I/O menulis snapshot, dan hasil merge dengan proses lain dimuat sebagai
+Account baru lalu dipasang di loop.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from account import Account
+from budget_manager import BudgetManager
+from currency import DEFAULT_RATES_FILE
+from storage import LedgerStorage
+
+_LEDGER_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# fx_rates.json di data-dir adalah tabel kurs ledger (currency.rates_file_for), bukan ledger
+_RESERVED_NAMES = {os.path.splitext(DEFAULT_RATES_FILE)[0]}
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+MAX_BODY = 1024 * 1024
+EXPORT_CHUNK_ROWS = 2000
+
+
+class ApiError(Exception):
+    """Error yang dikirim ke client sebagai {"error": pesan} dengan status HTTP tertentu"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _quiet(reporter):
+    """Matikan print pesan ✅/❌; handler membaca last_message untuk dikirim sebagai pesan error"""
+    reporter.echo = False
+    return reporter
+
+
+class Ledger:
+    """Satu ledger di memori: akun, budget manager, storage dan lock penulisan"""
+
+    def __init__(self, name: str, storage: LedgerStorage, account: Account):
+        self.name = name
+        self.storage = storage
+        self.account = _quiet(account)
+        self.budget_manager = _quiet(BudgetManager.from_dict(storage.get_section("budget_manager", {})))
+        self.write_lock = asyncio.Lock()
+
+    async def reload(self):
+        """Muat ulang dari disk (file diubah proses lain, mis. CLI)
+
+        Account baru dibuat di thread I/O dan baru dipasang di loop setelah selesai dimuat,
+        jadi request baca tidak pernah melihat akun yang sedang diubah thread lain.
+        """
+        account = await asyncio.get_running_loop().run_in_executor(None, self.storage.load)
+        if account is not None:
+            self.account = _quiet(account)
+            self.account.prepare_search_index()
+            self.budget_manager = _quiet(BudgetManager.from_dict(self.storage.get_section("budget_manager", {})))
+
+    async def save(self):
+        """Simpan snapshot akun di thread writer storage; muat ulang jika file di-merge dengan proses lain"""
+        # Snapshot (to_dict) dibuat di loop; thread writer hanya menyentuh dict hasil snapshot
+        await asyncio.wrap_future(self.storage.save_async(self.account))
+        if not self.storage.is_current():
+            await self.reload()
+
+    async def run_recurring(self) -> Optional[int]:
+        """Catat transaksi berulang yang jatuh tempo (satu batch + satu kali simpan)
+
+        None jika batch ditolak (mis. saldo tidak cukup); alasannya dicetak ke stderr.
+        """
+        from recurring import RecurringScheduler
+
+        async with self.write_lock:
+            scheduler = _quiet(RecurringScheduler.from_dict(self.storage.get_section(RecurringScheduler.SECTION, {})))
+            count = scheduler.catch_up(self.account, storage=self.storage)
+            if count is None:
+                print(f"❌ Transaksi berulang '{self.name}' belum dicatat: {scheduler.last_message}", file=sys.stderr)
+            elif count:
+                self.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+                await self.save()
+        return count
+
+    async def save_budget_manager(self):
+        """Simpan file beserta section budget_manager"""
+        self.storage.set_section("budget_manager", self.budget_manager.to_dict())
+        await self.save()
+
+
+class LedgerRegistry:
+    """Ledger yang sudah dimuat, per nama file di data-dir"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._ledgers: Dict[str, Ledger] = {}
+        self._load_lock = asyncio.Lock()
+
+    def path(self, name: str) -> str:
+        if not _LEDGER_NAME.match(name):
+            raise ApiError(400, "Nama ledger hanya boleh berisi huruf, angka, '_' dan '-'")
+        if name in _RESERVED_NAMES:
+            raise ApiError(400, f"Nama ledger '{name}' dipakai untuk file kurs")
+        return os.path.join(self.directory, name + ".json")
+
+    def loaded(self) -> List[str]:
+        return list(self._ledgers)
+
+    def names(self) -> List[str]:
+        return sorted(name for name, ext in map(os.path.splitext, os.listdir(self.directory))
+                      if ext == ".json" and _LEDGER_NAME.match(name) and name not in _RESERVED_NAMES)
+
+    async def get(self, name: str) -> Ledger:
+        """Ambil ledger; dimuat (atau dimuat ulang jika file berubah) di thread I/O"""
+        ledger = self._ledgers.get(name)
+        if ledger is not None and ledger.storage.is_current():
+            return ledger
+
+        loop = asyncio.get_running_loop()
+        if ledger is not None:
+            async with ledger.write_lock:
+                if not ledger.storage.is_current():
+                    await ledger.reload()
+            return ledger
+
+        async with self._load_lock:
+            ledger = self._ledgers.get(name)
+            if ledger is None:
+                storage = LedgerStorage(self.path(name))
+                account = await loop.run_in_executor(None, storage.load)
+                if account is None:
+                    raise ApiError(404, f"Ledger '{name}' tidak ditemukan")
+                ledger = self._ledgers[name] = Ledger(name, storage, account)
+                # Kejadian berulang yang terlewat selama server mati dicatat saat ledger dimuat
+                await ledger.run_recurring()
+                # Index pencarian dibangun di latar belakang, bukan saat pencarian pertama
+                ledger.account.prepare_search_index()
+            return ledger
+
+    async def create(self, name: str, owner_name: str, initial_balance: float) -> Ledger:
+        async with self._load_lock:
+            storage = LedgerStorage(self.path(name))
+            if name in self._ledgers or storage.exists():
+                raise ApiError(409, f"Ledger '{name}' sudah ada")
+            account = _quiet(Account(owner_name))
+            if initial_balance > 0:
+                # Saldo awal dicatat sebagai transaksi karena saldo dihitung ulang dari transaksi saat load
+                account.add_income(initial_balance, "Saldo awal", "Saldo Awal")
+            await asyncio.get_running_loop().run_in_executor(None, lambda: storage.save(account, replace=True))
+            ledger = self._ledgers[name] = Ledger(name, storage, account)
+            return ledger
+
+
+# ---------------------------------------------------------------------------
+# Helper parameter dan serialisasi
+
+def _query_int(query: Dict[str, str], key: str, default: Optional[int] = None,
+               minimum: int = 1, maximum: Optional[int] = None) -> Optional[int]:
+    if key not in query:
+        return default
+    try:
+        value = int(query[key])
+    except ValueError:
+        raise ApiError(400, f"Parameter '{key}' harus berupa angka")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ApiError(400, f"Parameter '{key}' di luar rentang")
+    return value
+
+
+def _query_float(query: Dict[str, str], key: str) -> Optional[float]:
+    if key not in query:
+        return None
+    try:
+        return float(query[key])
+    except ValueError:
+        raise ApiError(400, f"Parameter '{key}' harus berupa angka")
+
+
+def _query_date(query: Dict[str, str], key: str) -> Optional[datetime]:
+    if key not in query:
+        return None
+    try:
+        return datetime.fromisoformat(query[key])
+    except ValueError:
+        raise ApiError(400, f"Parameter '{key}' harus berformat ISO (YYYY-MM-DD)")
+
+
+def _body_amount(body: dict, key: str) -> float:
+    try:
+        return float(body[key])
+    except KeyError:
+        raise ApiError(400, f"Field '{key}' wajib diisi")
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Field '{key}' harus berupa angka")
+
+
+def _month_year(query: Dict[str, str]) -> Tuple[int, int]:
+    now = datetime.now()
+    return (_query_int(query, "month", now.month, 1, 12),
+            _query_int(query, "year", now.year, 1900, 9999))
+
+
+def _in_currency(ledger: "Ledger", query: Dict[str, str], data: dict) -> dict:
+    """Konversi field uang di ringkasan ke mata uang ?currency= (default Rupiah)"""
+    currency = query.get("currency")
+    if not currency:
+        return data
+    converted = ledger.account.fx_table.convert_totals(data, currency)
+    if converted is None:
+        raise ApiError(400, f"Kurs {currency.upper()} tidak tersedia di tabel kurs")
+    return dict(converted, currency=currency.upper())
+
+
+def _transaction_json(transaction) -> dict:
+    data = transaction.to_dict()
+    data.pop("ts", None)
+    return data
+
+
+def _ledger_json(ledger: Ledger) -> dict:
+    account = ledger.account
+    return {"name": ledger.name, "owner_name": account.owner_name, "balance": account.balance,
+            "transaction_count": len(account.transactions), "version": account.version}
+
+
+# ---------------------------------------------------------------------------
+# Handler endpoint: (registry, parameter path, query, body) -> (status, payload)
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+async def list_ledgers(registry: LedgerRegistry, query, body):
+    return 200, {"ledgers": registry.names()}
+
+
+async def create_ledger(registry: LedgerRegistry, query, body):
+    name = body.get("name")
+    owner_name = body.get("owner_name") or name
+    if not name:
+        raise ApiError(400, "Field 'name' wajib diisi")
+    initial_balance = _body_amount(body, "initial_balance") if "initial_balance" in body else 0.0
+    if initial_balance < 0:
+        raise ApiError(400, "Saldo awal tidak boleh negatif")
+    ledger = await registry.create(name, owner_name, initial_balance)
+    return 201, _ledger_json(ledger)
+
+
+async def get_ledger(registry: LedgerRegistry, query, body, name):
+    return 200, _ledger_json(await registry.get(name))
+
+
+async def list_transactions(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    transaction_type = query.get("type")
+    if transaction_type not in (None, "income", "expense"):
+        raise ApiError(400, "Parameter 'type' harus 'income' atau 'expense'")
+    result = ledger.account.query_transactions(
+        transaction_type=transaction_type,
+        category=query.get("category"),
+        start_date=_query_date(query, "start"),
+        end_date=_query_date(query, "end"),
+        text=query.get("text"),
+        min_amount=_query_float(query, "min"),
+        max_amount=_query_float(query, "max"),
+        page=_query_int(query, "page", 1),
+        page_size=_query_int(query, "page_size", 25, maximum=500),
+    )
+    result["items"] = [_transaction_json(t) for t in result["items"]]
+    return 200, result
+
+
+async def add_transaction(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    transaction_type = body.get("type")
+    if transaction_type not in ("income", "expense"):
+        raise ApiError(400, "Field 'type' harus 'income' atau 'expense'")
+    amount = _body_amount(body, "amount")
+    category = body.get("category") or ("Income" if transaction_type == "income" else "Expense")
+    description = body.get("description") or category
+
+    async with ledger.write_lock:
+        account = ledger.account
+        add = account.add_income if transaction_type == "income" else account.add_expense
+        transaction = add(amount, description, category, currency=body.get("currency"))
+        if transaction is None:
+            raise ApiError(400, account.last_message or "Transaksi gagal ditambahkan")
+        # Satu baris journal dari record yang diserialisasi di loop; ditulis di thread I/O
+        appended = not account.ids_reassigned and await asyncio.get_running_loop().run_in_executor(
+            None, ledger.storage.append_change, transaction.id, transaction.to_dict())
+        if not appended:
+            # File diubah proses lain (atau id diganti saat load): simpan ulang dengan merge
+            await ledger.save()
+        account = ledger.account
+
+    return 201, {"transaction": _transaction_json(transaction), "balance": account.balance}
+
+
+async def monthly_summary(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    month, year = _month_year(query)
+    return 200, _in_currency(ledger, query, ledger.account.get_monthly_summary(month, year))
+
+
+async def category_summary(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    return 200, _in_currency(ledger, query, {"categories": ledger.account.get_category_summary()})
+
+
+async def list_budgets(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    month, year = _month_year(query)
+    manager = ledger.budget_manager
+    budgets = [_in_currency(ledger, query, status) for status in manager.check_all_budgets(ledger.account, month, year)]
+    return 200, {"month": month, "year": year, "budgets": budgets,
+                 "alerts": manager.get_budget_alerts(ledger.account, month, year)}
+
+
+async def put_budget(registry: LedgerRegistry, query, body, name, category):
+    ledger = await registry.get(name)
+    limit = _body_amount(body, "limit")
+    try:
+        anchor = datetime.fromisoformat(body["anchor_date"]) if body.get("anchor_date") else None
+        days = int(body["days"]) if body.get("days") is not None else None
+    except (TypeError, ValueError):
+        raise ApiError(400, "Field 'anchor_date' harus berformat ISO dan 'days' berupa bilangan bulat")
+    async with ledger.write_lock:
+        manager = ledger.budget_manager
+        if not manager.add_budget(category, limit, body.get("period", "monthly"), days, anchor):
+            raise ApiError(400, manager.last_message or "Budget gagal disimpan")
+        await ledger.save_budget_manager()
+    return 200, ledger.budget_manager.budgets[category].to_dict()
+
+
+async def delete_budget(registry: LedgerRegistry, query, body, name, category):
+    ledger = await registry.get(name)
+    async with ledger.write_lock:
+        if ledger.budget_manager.budgets.pop(category, None) is None:
+            raise ApiError(404, f"Budget '{category}' tidak ditemukan")
+        await ledger.save_budget_manager()
+    return 200, {"deleted": category}
+
+
+async def list_goals(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    return 200, {"goals": ledger.budget_manager.get_all_goals_progress(ledger.account)}
+
+
+async def add_goal(registry: LedgerRegistry, query, body, name):
+    ledger = await registry.get(name)
+    goal_name = body.get("name")
+    if not goal_name:
+        raise ApiError(400, "Field 'name' wajib diisi")
+    target_amount = _body_amount(body, "target_amount")
+    try:
+        target_date = datetime.fromisoformat(body["target_date"])
+    except (KeyError, TypeError, ValueError):
+        raise ApiError(400, "Field 'target_date' wajib berformat ISO (YYYY-MM-DD)")
+
+    async with ledger.write_lock:
+        manager = ledger.budget_manager
+        if not manager.add_financial_goal(goal_name, target_amount, target_date):
+            raise ApiError(400, manager.last_message or "Goal gagal ditambahkan")
+        await ledger.save_budget_manager()
+    return 201, ledger.budget_manager.get_goal(goal_name).get_progress()
+
+
+async def save_for_goal(registry: LedgerRegistry, query, body, name, goal_name):
+    ledger = await registry.get(name)
+    amount = _body_amount(body, "amount")
+    async with ledger.write_lock:
+        manager = ledger.budget_manager
+        if not manager.save_for_goal(goal_name, amount, ledger.account, body.get("description", "")):
+            message = manager.last_message or "Tabungan gagal dicatat"
+            raise ApiError(404 if manager.get_goal(goal_name) is None else 400, message)
+        await ledger.save_budget_manager()
+    goal = ledger.budget_manager.get_goal(goal_name)
+    return 200, {"goal": goal.get_progress(), "balance": ledger.account.balance}
+
+
+async def withdraw_from_goal(registry: LedgerRegistry, query, body, name, goal_name):
+    ledger = await registry.get(name)
+    amount = _body_amount(body, "amount")
+    async with ledger.write_lock:
+        manager = ledger.budget_manager
+        if not manager.withdraw_from_goal(goal_name, amount, ledger.account, body.get("description", "")):
+            message = manager.last_message or "Penarikan gagal dicatat"
+            raise ApiError(404 if manager.get_goal(goal_name) is None else 400, message)
+        await ledger.save_budget_manager()
+    goal = ledger.budget_manager.get_goal(goal_name)
+    return 200, {"goal": goal.get_progress(), "balance": ledger.account.balance}
+
+
+async def export_csv(registry: LedgerRegistry, query, body, name):
+    """Export CSV dengan format yang sama seperti FinanceApp.export_to_csv, di-stream per blok"""
+    ledger = await registry.get(name)
+    account = ledger.account
+    # Snapshot daftar transaksi agar penulisan di tengah stream tidak menggeser baris
+    transactions = list(account.transactions)
+    balances = account.get_running_balances(0, len(transactions))
+
+    async def chunks():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Tanggal', 'Jenis', 'Kategori', 'Deskripsi', 'Jumlah', 'Saldo'])
+        for start in range(0, len(transactions), EXPORT_CHUNK_ROWS):
+            for transaction, balance in zip(transactions[start:start + EXPORT_CHUNK_ROWS],
+                                            balances[start:start + EXPORT_CHUNK_ROWS]):
+                sign = "+" if transaction.transaction_type == "income" else "-"
+                writer.writerow([
+                    transaction.date.strftime('%d/%m/%Y %H:%M'),
+                    transaction.transaction_type.capitalize(),
+                    transaction.category,
+                    transaction.description,
+                    f"{sign}{transaction.amount:,.0f}",
+                    f"{balance:,.0f}",
+                ])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    return 200, StreamingResponse(chunks(), "text/csv; charset=utf-8", f"{name}.csv")
+
+
+class StreamingResponse:
+    """Respons yang dikirim dengan Transfer-Encoding: chunked"""
+
+    def __init__(self, chunks, content_type: str, filename: Optional[str] = None):
+        self.chunks = chunks
+        self.content_type = content_type
+        self.filename = filename
+
+
+ROUTES: List[Tuple[str, "re.Pattern", Handler]] = [
+    (method, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in [
+        ("GET", r"/ledgers", list_ledgers),
+        ("POST", r"/ledgers", create_ledger),
+        ("GET", r"/ledgers/([^/]+)", get_ledger),
+        ("GET", r"/ledgers/([^/]+)/transactions", list_transactions),
+        ("POST", r"/ledgers/([^/]+)/transactions", add_transaction),
+        ("GET", r"/ledgers/([^/]+)/summary/monthly", monthly_summary),
+        ("GET", r"/ledgers/([^/]+)/summary/categories", category_summary),
+        ("GET", r"/ledgers/([^/]+)/budgets", list_budgets),
+        ("PUT", r"/ledgers/([^/]+)/budgets/([^/]+)", put_budget),
+        ("DELETE", r"/ledgers/([^/]+)/budgets/([^/]+)", delete_budget),
+        ("GET", r"/ledgers/([^/]+)/goals", list_goals),
+        ("POST", r"/ledgers/([^/]+)/goals", add_goal),
+        ("POST", r"/ledgers/([^/]+)/goals/([^/]+)/savings", save_for_goal),
+        ("POST", r"/ledgers/([^/]+)/goals/([^/]+)/withdrawals", withdraw_from_goal),
+        ("GET", r"/ledgers/([^/]+)/export\.csv", export_csv),
+    ]
+]
+
+
+# ---------------------------------------------------------------------------
+# HTTP/1.1 minimal (keep-alive, Content-Length, chunked untuk stream)
+
+class ApiServer:
+    """Server HTTP asyncio; setiap koneksi dilayani oleh coroutine sendiri"""
+
+    def __init__(self, registry: LedgerRegistry, host: str = "127.0.0.1", port: int = 8765,
+                 recurring_interval: float = 60.0):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.recurring_interval = recurring_interval
+        self.requests = 0
+
+    async def recurring_timer(self):
+        """Timer catch-up transaksi berulang untuk ledger yang sudah dimuat"""
+        while True:
+            await asyncio.sleep(self.recurring_interval)
+            for name in list(self.registry.loaded()):
+                try:
+                    count = await (await self.registry.get(name)).run_recurring()
+                except Exception as e:
+                    print(f"❌ Transaksi berulang '{name}' gagal: {e!r}", file=sys.stderr)
+                    continue
+                if count:
+                    print(f"🔁 {count} transaksi berulang dicatat untuk ledger '{name}'")
+
+    async def dispatch(self, method: str, target: str, body: bytes):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                raise ApiError(400, "Body harus berupa JSON")
+            if not isinstance(payload, dict):
+                raise ApiError(400, "Body harus berupa object JSON")
+            return await handler(self.registry, query, payload, *(unquote(g) for g in match.groups()))
+
+        if allowed:
+            raise ApiError(405, f"Method {method} tidak didukung untuk {path}")
+        raise ApiError(404, f"Endpoint {path} tidak ditemukan")
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        connection = "keep-alive" if keep_alive else "close"
+        if isinstance(payload, StreamingResponse):
+            headers = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                       f"Content-Type: {payload.content_type}\r\n"
+                       f"Transfer-Encoding: chunked\r\nConnection: {connection}\r\n")
+            if payload.filename:
+                headers += f'Content-Disposition: attachment; filename="{payload.filename}"\r\n'
+            writer.write((headers + "\r\n").encode("latin-1"))
+            async for chunk in payload.chunks:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                # Tunggu buffer socket terkuras agar export besar tidak menumpuk di memori
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        else:
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            writer.write((f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                          f"Content-Type: application/json; charset=utf-8\r\n"
+                          f"Content-Length: {len(data)}\r\nConnection: {connection}\r\n\r\n"
+                          ).encode("latin-1") + data)
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 413, {"error": "Header terlalu besar"}, False)
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Request line tidak valid"}, False)
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._send(writer, 400, {"error": "Content-Length tidak valid"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._send(writer, 413, {"error": "Body terlalu besar"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except ApiError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    print(f"❌ Error pada {method} {target}: {e!r}", file=sys.stderr)
+                    status, payload = 500, {"error": "Terjadi error di server"}
+
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        addresses = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"🚀 API server berjalan di http://{addresses} (data: {os.path.abspath(self.registry.directory)})")
+        timer = asyncio.create_task(self.recurring_timer()) if self.recurring_interval > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API lokal Personal Finance Manager")
+    parser.add_argument("--data-dir", default=".", help="Folder berisi file ledger <nama>.json")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat bind (default: hanya lokal)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recurring-interval", type=float, default=60.0,
+                        help="Interval (detik) pengecekan transaksi berulang; 0 = nonaktif")
+    args = parser.parse_args(argv)
+
+    server = ApiServer(LedgerRegistry(args.data_dir), args.host, args.port, args.recurring_interval)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print(f"\n👋 API server dihentikan ({server.requests} request dilayani)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Benchmark untuk hot path Account, BudgetManager dan persistence
+
+Contoh penggunaan:
+    python benchmark.py                                   # ukuran default 1K, 10K, 100K
+    python benchmark.py --sizes 1000 1000000 --output bench.json
+    python benchmark.py --compare bench.json              # bandingkan dengan hasil sebelumnya
+
+Hasil ditulis sebagai JSON (waktu dalam detik per operasi, puncak memori dari
+tracemalloc dalam byte) sehingga bisa dibandingkan antar commit.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from account import Account, Transaction
+from budget_manager import BudgetManager
+from finance_app import FinanceApp
+from ledger_generator import generate_account, iter_ledger
+from reports import get_daily_balance_trend
+from storage import LedgerStorage
+from utils import CategoryManager
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def build_ledger(size: int, seed: int = 42) -> Account:
+    """Membuat ledger sintetis realistis berisi sekitar `size` transaksi selama 4 tahun"""
+    return generate_account(size, years=4, seed=seed, owner_name="Benchmark")
+
+
+class _LegacyTransaction:
+    """Transaction sebelum memakai __slots__ dan enum (hanya untuk pembanding memori)"""
+    
+    def __init__(self, amount, description, transaction_type, category="", transaction_id=None):
+        self.id = transaction_id
+        self.amount = amount
+        self.description = description
+        self.transaction_type = transaction_type.lower()
+        self.category = category
+        self.date = datetime.now()
+    
+    @classmethod
+    def from_dict(cls, data: dict):
+        transaction = cls(data["amount"], data["description"], data["transaction_type"], data["category"],
+                          transaction_id=data.get("id"))
+        transaction.date = datetime.fromisoformat(data["date"])
+        return transaction
+
+
+def transaction_memory(size: int, transaction_class=Transaction, seed: int = 42) -> float:
+    """Byte per transaksi yang tertahan setelah memuat `size` record seperti saat load JSON
+    
+    Record di-parse dari JSON per chunk agar setiap string adalah objek baru, sama seperti
+    hasil json.load pada file data; yang diukur adalah memori list transaksi beserta
+    string, float dan datetime miliknya.
+    """
+    rows = iter_ledger(size, years=4, seed=seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        transactions = []
+        while True:
+            chunk = [
+                {"id": f"ID{len(transactions) + i:024d}", "amount": amount, "description": description,
+                 "transaction_type": transaction_type, "category": category, "date": date}
+                for i, (date, transaction_type, category, description, amount) in zip(range(10_000), rows)
+            ]
+            if not chunk:
+                break
+            records = json.loads(json.dumps(chunk))
+            del chunk
+            transactions.extend(transaction_class.from_dict(record) for record in records)
+            del records
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (current - baseline) / max(len(transactions), 1)
+
+
+def compare_transaction_memory(size: int) -> dict:
+    """Bandingkan memori per transaksi representasi lama dan sekarang"""
+    legacy = transaction_memory(size, _LegacyTransaction)
+    current = transaction_memory(size, Transaction)
+    print(f"🧠 Memori per transaksi ({size:,} baris): lama {legacy:,.0f} B, "
+          f"sekarang {current:,.0f} B ({(current - legacy) / legacy * 100:+.1f}%)", file=sys.stderr)
+    return {"size": size, "legacy_bytes_per_transaction": legacy, "bytes_per_transaction": current}
+
+
+@contextlib.contextmanager
+def quiet():
+    """Sembunyikan print dari Account/FinanceApp selama pengukuran"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _measure(func: Callable[[], None], repeat: int, min_time: float, number: Optional[int] = None,
+             reset: Optional[Callable[[], None]] = None) -> List[float]:
+    """Jalankan func beberapa kali, kembalikan waktu per panggilan untuk setiap repeat
+
+    Tanpa `number`, jumlah loop dikalibrasi agar satu repeat minimal `min_time` detik.
+    `reset` dipanggil (tidak diukur) setelah setiap repeat untuk operasi yang mengubah ledger.
+    """
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 10 if elapsed < min_time / 10 else 2
+        timings = [elapsed / number]
+    else:
+        timings = []
+
+    while len(timings) < repeat:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+        if reset:
+            reset()
+    return timings
+
+
+def _peak_memory(func: Callable[[], None]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _benchmark_cases(account: Account, workdir: str) -> Dict[str, dict]:
+    """Daftar operasi yang diukur untuk satu ledger"""
+    now = datetime.now()
+
+    budget_manager = BudgetManager()
+    with quiet():
+        for category in CategoryManager.get_expense_categories():
+            budget_manager.add_budget(category, 5_000_000)
+
+    app = FinanceApp()
+    app.account = account
+    app.data_file = os.path.join(workdir, "finance_data.json")
+    app.storage = LedgerStorage(app.data_file)
+
+    def add_income():
+        account.add_income(50_000, "Pemasukan - Bonus", "Bonus")
+
+    def add_expense():
+        account.add_expense(1_000, "Pengeluaran - Makanan & Minuman", "Makanan & Minuman")
+
+    original_size = len(account.transactions)
+
+    def remove_added():
+        # Kembalikan ledger ke ukuran semula setelah benchmark yang menambah transaksi
+        while len(account.transactions) > original_size:
+            account._remove_transaction(account.transactions[-1])
+
+    def save():
+        if not app.save_data_to_json():
+            raise RuntimeError("save gagal")
+
+    def load():
+        loader = FinanceApp()
+        loader.data_file = app.data_file
+        loader.storage = LedgerStorage(app.data_file)
+        if not loader.load_data_from_json():
+            raise RuntimeError("load gagal")
+
+    def export_csv():
+        previous = os.getcwd()
+        os.chdir(workdir)
+        try:
+            if not app.export_to_csv():
+                raise RuntimeError("export gagal")
+        finally:
+            os.chdir(previous)
+
+    return {
+        "account.add_income": {"func": add_income, "number": 1000, "reset": remove_added},
+        "account.add_expense": {"func": add_expense, "number": 1000, "reset": remove_added},
+        "account.get_monthly_summary": {"func": lambda: account.get_monthly_summary(now.month, now.year)},
+        "account.get_category_summary": {"func": account.get_category_summary},
+        "budget_manager.check_all_budgets": {
+            "func": lambda: budget_manager.check_all_budgets(account, now.month, now.year)
+        },
+        "finance_app.save_data_to_json": {"func": save},
+        "finance_app.load_data_from_json": {"func": load},
+        "finance_app.export_to_csv": {"func": export_csv},
+        "reports.get_daily_balance_trend": {"func": lambda: get_daily_balance_trend(account, days=30)},
+    }
+
+
+def run_benchmarks(sizes: List[int], repeat: int, min_time: float, selected: List[str]) -> List[dict]:
+    results = []
+    for size in sizes:
+        print(f"📦 Membuat ledger {size:,} transaksi...", file=sys.stderr)
+        account = build_ledger(size)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            cases = _benchmark_cases(account, workdir)
+            # Save harus jalan lebih dulu agar load punya file
+            with quiet():
+                cases["finance_app.save_data_to_json"]["func"]()
+
+            for name, case in cases.items():
+                if selected and not any(pattern in name for pattern in selected):
+                    continue
+
+                with quiet():
+                    timings = _measure(case["func"], repeat, min_time, case.get("number"), case.get("reset"))
+                    peak = _peak_memory(case["func"])
+                    if case.get("reset"):
+                        case["reset"]()
+
+                result = {
+                    "name": name,
+                    "size": size,
+                    "repeat": repeat,
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "mean": statistics.mean(timings),
+                    "peak_memory_bytes": peak,
+                }
+                results.append(result)
+                print(f"  {name:<36} {result['median'] * 1000:>12.4f} ms  "
+                      f"peak {peak / 1024:>10.1f} KiB", file=sys.stderr)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results: List[dict], baseline_file: str, threshold: float):
+    """Cetak perbandingan median dengan hasil benchmark sebelumnya"""
+    with open(baseline_file, 'r', encoding='utf-8') as file:
+        baseline = {(r["name"], r["size"]): r for r in json.load(file)["results"]}
+
+    print(f"\n📊 Perbandingan dengan {baseline_file}")
+    regressions = 0
+    for result in results:
+        previous = baseline.get((result["name"], result["size"]))
+        if not previous:
+            continue
+        change = (result["median"] - previous["median"]) / previous["median"] * 100 if previous["median"] else 0
+        flag = "🚨" if change > threshold else "✅" if change < -threshold else "  "
+        regressions += change > threshold
+        print(f"{flag} {result['name']:<36} {result['size']:>10,}  {change:+8.1f}%")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Personal Finance Manager")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES,
+                        help="Jumlah transaksi per ledger (mis. 1000 10000000; kosong = lewati)")
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durasi minimal satu pengulangan (detik)")
+    parser.add_argument("--only", nargs="*", default=[], help="Hanya jalankan benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--memory", type=int, metavar="N",
+                        help="Ukur byte per transaksi (representasi lama vs sekarang) untuk N transaksi")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Batas perubahan (%%) yang dianggap regresi")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat, args.min_time, args.only)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.memory:
+        report["memory"] = compare_transaction_memory(args.memory)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+        print(f"✅ Hasil benchmark disimpan ke: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
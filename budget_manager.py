@@ -1,34 +1,84 @@
 """
 Budget Manager untuk mengelola anggaran dan target keuangan
 """
-from datetime import datetime
-from typing import Dict, List
-from account import Account
+import calendar
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from account import Account, generate_transaction_id
+from instrumentation import timed
+from utils import Reporter, add_months
+
+PERIODS = ("monthly", "weekly", "biweekly", "rolling", "pay_cycle")
+PERIOD_LABELS = {"monthly": "bulan", "weekly": "minggu", "biweekly": "2 minggu", "rolling": "N hari",
+                 "pay_cycle": "siklus gajian"}
+PERIOD_DAYS = {"weekly": 7, "biweekly": 14}
+DEFAULT_ANCHOR = datetime(2024, 1, 1)  # hari Senin; minggu dimulai hari Senin
+
+
+def _reference_moment(month: int, year: int) -> datetime:
+    """Sekarang jika bulan/tahun adalah bulan ini, selain itu akhir bulan tersebut"""
+    now = datetime.now()
+    if (now.year, now.month) == (year, month):
+        return now
+    return datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, 59)
+
 
 class Budget:
-    """Class untuk mengelola budget per kategori"""
+    """Class untuk mengelola budget per kategori
     
-    def __init__(self, category: str, monthly_limit: float):
+    Periode budget: bulan kalender (default), mingguan/dua mingguan dan siklus gajian
+    (sejajar dengan anchor_date), atau rolling N hari yang berakhir hari ini.
+    Pemakaian dihitung dengan Account.get_category_expense_between (O(log N)).
+    """
+    
+    def __init__(self, category: str, monthly_limit: float, period: str = "monthly",
+                 period_days: Optional[int] = None, anchor_date: Optional[datetime] = None):
         self.category = category
-        self.monthly_limit = monthly_limit
+        self.monthly_limit = monthly_limit  # limit per periode; nama lama dipertahankan untuk data lama
+        self.period = period
+        self.period_days = period_days
+        self.anchor_date = anchor_date or DEFAULT_ANCHOR
         self.created_date = datetime.now()
+    
+    def period_bounds(self, at: datetime) -> Tuple[datetime, datetime]:
+        """Awal (inklusif) dan akhir (eksklusif) periode yang memuat waktu `at`"""
+        if self.period == "monthly":
+            start = datetime(at.year, at.month, 1)
+            return start, add_months(start, 1, 1)
+        
+        if self.period == "rolling":
+            end = datetime.combine(at.date(), datetime.min.time()) + timedelta(days=1)
+            return end - timedelta(days=self.period_days), end
         
-    def check_usage(self, account: Account, month: int, year: int) -> dict:
-        """Cek penggunaan budget untuk bulan tertentu"""
-        monthly_expenses = [
-            t for t in account.transactions 
-            if (t.transaction_type == "expense" and 
-                t.category == self.category and
-                t.date.month == month and 
-                t.date.year == year)
-        ]
-        
-        total_spent = sum(t.amount for t in monthly_expenses)
+        anchor = datetime.combine(self.anchor_date.date(), datetime.min.time())
+        if self.period == "pay_cycle":
+            months = (at.year - anchor.year) * 12 + at.month - anchor.month
+            start = add_months(anchor, months, anchor.day)
+            if start > at:
+                months -= 1
+                start = add_months(anchor, months, anchor.day)
+            return start, add_months(anchor, months + 1, anchor.day)
+        
+        step = timedelta(days=PERIOD_DAYS[self.period])
+        start = anchor + step * ((at - anchor) // step)
+        return start, start + step
+    
+    def check_usage(self, account: Account, month: int, year: int, at: Optional[datetime] = None) -> dict:
+        """Cek penggunaan budget untuk periode yang memuat `at`
+        
+        Tanpa `at`: budget bulanan memakai bulan/tahun yang diminta; periode lain memakai
+        hari ini jika bulan yang diminta adalah bulan ini, atau akhir bulan tersebut.
+        """
+        start, end = self.period_bounds(at or _reference_moment(month, year))
+        total_spent = account.get_category_expense_between(self.category, start, end)
         remaining = self.monthly_limit - total_spent
         usage_percentage = (total_spent / self.monthly_limit) * 100 if self.monthly_limit > 0 else 0
         
         return {
             "category": self.category,
+            "period": self.period,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
             "limit": self.monthly_limit,
             "spent": total_spent,
             "remaining": remaining,
@@ -36,24 +86,62 @@ class Budget:
             "is_over_budget": total_spent > self.monthly_limit
         }
     
+    @property
+    def period_label(self) -> str:
+        if self.period == "rolling":
+            return f"{self.period_days} hari"
+        return PERIOD_LABELS[self.period]
+    
+    def to_dict(self) -> dict:
+        """Konversi budget ke dictionary untuk disimpan ke JSON"""
+        return {
+            "category": self.category,
+            "monthly_limit": self.monthly_limit,
+            "period": self.period,
+            "period_days": self.period_days,
+            "anchor_date": self.anchor_date.isoformat(),
+            "created_date": self.created_date.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Budget":
+        """Membuat budget dari dictionary hasil load JSON"""
+        budget = cls(data["category"], data["monthly_limit"], data.get("period", "monthly"),
+                     data.get("period_days"),
+                     datetime.fromisoformat(data["anchor_date"]) if data.get("anchor_date") else None)
+        budget.created_date = datetime.fromisoformat(data["created_date"])
+        return budget
+    
     def __str__(self):
-        return f"Budget {self.category}: Rp {self.monthly_limit:,.0f}/bulan"
+        return f"Budget {self.category}: Rp {self.monthly_limit:,.0f}/{self.period_label}"
 
 class FinancialGoal:
-    """Class untuk target keuangan jangka panjang"""
+    """Class untuk target keuangan jangka panjang
+    
+    saved_amount = initial_amount (tabungan di luar ledger, termasuk saldo dari data lama)
+    ditambah total transaksi di akun yang terhubung lewat goal_id; disegarkan dengan sync().
+    """
     
-    def __init__(self, name: str, target_amount: float, target_date: datetime):
+    def __init__(self, name: str, target_amount: float, target_date: datetime,
+                 goal_id: Optional[str] = None):
+        self.id = goal_id or generate_transaction_id()
         self.name = name
         self.target_amount = target_amount
         self.target_date = target_date
+        self.initial_amount = 0.0
         self.saved_amount = 0.0
         self.created_date = datetime.now()
+    
+    def sync(self, account: Account):
+        """Hitung ulang saved_amount dari total per-goal di akun (O(1))"""
+        self.saved_amount = self.initial_amount + account.get_goal_savings(self.id)
         
     def add_savings(self, amount: float) -> bool:
-        """Menambah tabungan untuk goal ini"""
+        """Menambah tabungan di luar ledger (tanpa transaksi) untuk goal ini"""
         if amount <= 0:
             return False
         
+        self.initial_amount += amount
         self.saved_amount += amount
         return True
     
@@ -66,6 +154,7 @@ class FinancialGoal:
         daily_savings_needed = remaining_amount / max(days_remaining, 1) if days_remaining > 0 else 0
         
         return {
+            "id": self.id,
             "name": self.name,
             "target_amount": self.target_amount,
             "saved_amount": self.saved_amount,
@@ -76,56 +165,142 @@ class FinancialGoal:
             "is_achieved": self.saved_amount >= self.target_amount
         }
     
+    def to_dict(self) -> dict:
+        """Konversi goal ke dictionary untuk disimpan ke JSON"""
+        # saved_amount tidak disimpan: selalu diturunkan dari transaksi yang terhubung
+        return {
+            "id": self.id,
+            "name": self.name,
+            "target_amount": self.target_amount,
+            "target_date": self.target_date.isoformat(),
+            "initial_amount": self.initial_amount,
+            "created_date": self.created_date.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "FinancialGoal":
+        """Membuat goal dari dictionary hasil load JSON"""
+        goal = cls(data["name"], data["target_amount"], datetime.fromisoformat(data["target_date"]),
+                   goal_id=data.get("id"))
+        # Data lama tanpa id hanya punya counter saved_amount; dipakai sebagai saldo awal goal
+        goal.initial_amount = data.get("initial_amount", data.get("saved_amount", 0.0))
+        goal.saved_amount = goal.initial_amount
+        goal.created_date = datetime.fromisoformat(data["created_date"])
+        return goal
+    
     def __str__(self):
         progress = self.get_progress()
         return f"Goal: {self.name} - {progress['progress_percentage']:.1f}% (Rp {self.saved_amount:,.0f}/{self.target_amount:,.0f})"
 
-class BudgetManager:
+class BudgetManager(Reporter):
     """Class untuk mengelola budget dan financial goals"""
     
     def __init__(self):
         self.budgets: Dict[str, Budget] = {}
-        self.financial_goals: List[FinancialGoal] = []
+        self.goals: Dict[str, FinancialGoal] = {}  # key: goal.id, urut waktu ditambahkan
+        self._goal_ids_by_name: Dict[str, str] = {}
+        # Hasil check_usage per (kategori, limit, bulan, tahun), berlaku untuk satu Account.version
+        self._usage_cache: Dict[tuple, dict] = {}
+        self._usage_version = None
     
-    def add_budget(self, category: str, monthly_limit: float) -> bool:
-        """Menambah budget untuk kategori"""
+    def add_budget(self, category: str, monthly_limit: float, period: str = "monthly",
+                   period_days: Optional[int] = None, anchor_date: Optional[datetime] = None) -> bool:
+        """Menambah budget untuk kategori (limit berlaku per periode)"""
         if monthly_limit <= 0:
-            print("❌ Limit budget harus lebih dari 0")
+            self._report("❌ Limit budget harus lebih dari 0")
+            return False
+        
+        if period not in PERIODS:
+            self._report(f"❌ Periode harus salah satu dari: {', '.join(PERIODS)}")
             return False
         
-        self.budgets[category] = Budget(category, monthly_limit)
-        print(f"✅ Budget untuk '{category}' berhasil ditambahkan: Rp {monthly_limit:,.0f}/bulan")
+        if period == "rolling" and (period_days is None or period_days < 1):
+            self._report("❌ Budget rolling membutuhkan jumlah hari minimal 1")
+            return False
+        
+        budget = Budget(category, monthly_limit, period, period_days if period == "rolling" else None, anchor_date)
+        self.budgets[category] = budget
+        self._report(f"✅ Budget untuk '{category}' berhasil ditambahkan: Rp {monthly_limit:,.0f}/{budget.period_label}")
         return True
     
     def add_financial_goal(self, name: str, target_amount: float, target_date: datetime) -> bool:
         """Menambah financial goal"""
         if target_amount <= 0:
-            print("❌ Target amount harus lebih dari 0")
+            self._report("❌ Target amount harus lebih dari 0")
             return False
         
         if target_date <= datetime.now():
-            print("❌ Target date harus di masa depan")
+            self._report("❌ Target date harus di masa depan")
+            return False
+        
+        if name in self._goal_ids_by_name:
+            self._report(f"❌ Financial goal '{name}' sudah ada")
             return False
         
-        goal = FinancialGoal(name, target_amount, target_date)
-        self.financial_goals.append(goal)
-        print(f"✅ Financial goal '{name}' berhasil ditambahkan")
+        self._register_goal(FinancialGoal(name, target_amount, target_date))
+        self._report(f"✅ Financial goal '{name}' berhasil ditambahkan")
         return True
     
-    def check_all_budgets(self, account: Account, month: int, year: int) -> List[dict]:
-        """Cek semua budget untuk bulan tertentu"""
+    def _register_goal(self, goal: FinancialGoal):
+        self.goals[goal.id] = goal
+        self._goal_ids_by_name[goal.name] = goal.id
+    
+    @property
+    def financial_goals(self) -> List[FinancialGoal]:
+        """Daftar goal (kompatibilitas dengan kode lama yang memakai list)"""
+        return list(self.goals.values())
+    
+    def get_goal(self, key: str) -> Optional[FinancialGoal]:
+        """Cari goal berdasarkan id atau nama dalam O(1)"""
+        goal = self.goals.get(key)
+        if goal is None:
+            goal_id = self._goal_ids_by_name.get(key)
+            goal = self.goals.get(goal_id) if goal_id is not None else None
+        return goal
+    
+    def remove_goal(self, key: str) -> bool:
+        """Menghapus goal (transaksi tabungan yang sudah tercatat tidak ikut dihapus)"""
+        goal = self.get_goal(key)
+        if goal is None:
+            self._report(f"❌ Financial goal '{key}' tidak ditemukan")
+            return False
+        del self.goals[goal.id]
+        del self._goal_ids_by_name[goal.name]
+        self._report(f"✅ Financial goal '{goal.name}' dihapus")
+        return True
+    
+    def sync_goals(self, account: Account):
+        """Segarkan saved_amount semua goal dari total per-goal di akun"""
+        for goal in self.goals.values():
+            goal.sync(account)
+    
+    @timed()
+    def check_all_budgets(self, account: Account, month: int, year: int,
+                          at: Optional[datetime] = None) -> List[dict]:
+        """Cek semua budget untuk bulan tertentu (periode non-bulanan: lihat Budget.check_usage)"""
         budget_status = []
         
+        if account.version != self._usage_version:
+            self._usage_cache.clear()
+            self._usage_version = account.version
+        
         for budget in self.budgets.values():
-            status = budget.check_usage(account, month, year)
-            budget_status.append(status)
+            # Key memakai batas periode agar budget rolling ikut bergeser walau akun tidak berubah
+            bounds = budget.period_bounds(at or _reference_moment(month, year))
+            key = (budget.category, budget.monthly_limit, bounds)
+            status = self._usage_cache.get(key)
+            if status is None:
+                status = self._usage_cache[key] = budget.check_usage(account, month, year, at)
+            budget_status.append(dict(status))
         
         return budget_status
     
-    def get_budget_alerts(self, account: Account, month: int, year: int) -> List[str]:
+    @timed()
+    def get_budget_alerts(self, account: Account, month: int, year: int,
+                          at: Optional[datetime] = None) -> List[str]:
         """Mendapatkan alert untuk budget yang hampir habis atau over"""
         alerts = []
-        budget_status = self.check_all_budgets(account, month, year)
+        budget_status = self.check_all_budgets(account, month, year, at)
         
         for status in budget_status:
             if status["is_over_budget"]:
@@ -136,22 +311,66 @@ class BudgetManager:
         return alerts
     
     def save_for_goal(self, goal_name: str, amount: float, account: Account, description: str = "") -> bool:
-        """Menyimpan uang untuk financial goal tertentu"""
-        goal = next((g for g in self.financial_goals if g.name == goal_name), None)
+        """Menyimpan uang untuk financial goal tertentu (goal_name boleh berupa id atau nama)"""
+        goal = self.get_goal(goal_name)
+        
+        if not goal:
+            self._report(f"❌ Financial goal '{goal_name}' tidak ditemukan")
+            return False
+        
+        # Catat sebagai expense dari akun utama yang terhubung ke goal
+        expense_description = description or f"Tabungan untuk {goal.name}"
+        if account.add_expense(amount, expense_description, "Savings", goal_id=goal.id):
+            goal.sync(account)
+            self._report(f"✅ Berhasil menabung Rp {amount:,.0f} untuk goal '{goal.name}'")
+            return True
+        
+        self.last_message = account.last_message
+        return False
+    
+    def withdraw_from_goal(self, goal_name: str, amount: float, account: Account, description: str = "") -> bool:
+        """Menarik tabungan financial goal kembali ke akun utama (goal_name boleh berupa id atau nama)"""
+        goal = self.get_goal(goal_name)
         
         if not goal:
-            print(f"❌ Financial goal '{goal_name}' tidak ditemukan")
+            self._report(f"❌ Financial goal '{goal_name}' tidak ditemukan")
             return False
         
-        # Catat sebagai expense dari akun utama
-        expense_description = description or f"Tabungan untuk {goal_name}"
-        if account.add_expense(amount, expense_description, "Savings"):
-            goal.add_savings(amount)
-            print(f"✅ Berhasil menabung Rp {amount:,.0f} untuk goal '{goal_name}'")
+        goal.sync(account)
+        if amount > goal.saved_amount:
+            self._report(f"❌ Tabungan goal '{goal.name}' hanya Rp {goal.saved_amount:,.0f}")
+            return False
+        
+        # Catat sebagai income ke akun utama yang terhubung ke goal
+        income_description = description or f"Penarikan dari {goal.name}"
+        if account.add_income(amount, income_description, "Savings", goal_id=goal.id):
+            goal.sync(account)
+            self._report(f"✅ Berhasil menarik Rp {amount:,.0f} dari goal '{goal.name}'")
             return True
         
+        self.last_message = account.last_message
         return False
     
-    def get_all_goals_progress(self) -> List[dict]:
-        """Mendapatkan progress semua financial goals"""
-        return [goal.get_progress() for goal in self.financial_goals]
\ No newline at end of file
+    def get_all_goals_progress(self, account: Optional[Account] = None) -> List[dict]:
+        """Mendapatkan progress semua financial goals (disegarkan dari akun jika diberikan)"""
+        if account is not None:
+            self.sync_goals(account)
+        return [goal.get_progress() for goal in self.goals.values()]
+    
+    def to_dict(self) -> dict:
+        """Konversi budget dan goals ke dictionary untuk disimpan ke JSON"""
+        return {
+            "budgets": [budget.to_dict() for budget in self.budgets.values()],
+            "financial_goals": [goal.to_dict() for goal in self.goals.values()]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "BudgetManager":
+        """Membuat BudgetManager dari dictionary hasil load JSON"""
+        manager = cls()
+        for budget_data in data.get("budgets", []):
+            budget = Budget.from_dict(budget_data)
+            manager.budgets[budget.category] = budget
+        for goal_data in data.get("financial_goals", []):
+            manager._register_goal(FinancialGoal.from_dict(goal_data))
+        return manager
@@ -0,0 +1,208 @@
+"""
+Builder figure Plotly untuk laporan keuangan beserta cache LRU per sesi
+
+Plotly di-import di dalam builder: import-nya memakan ratusan milidetik dan
+tidak diperlukan selama figure masih ada di cache atau view aktif tanpa chart.
+"""
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+from account import Account
+from instrumentation import timed
+from reports import get_daily_balance_trend
+
+# Palet warna kontras tinggi untuk pie chart
+INCOME_COLORS = ['#10b981', '#3b82f6', '#8b5cf6', '#f59e0b', '#ef4444', '#06b6d4', '#84cc16', '#f97316']
+EXPENSE_COLORS = ['#dc2626', '#f59e0b', '#7c3aed', '#ec4899', '#06b6d4', '#84cc16', '#f97316', '#6366f1']
+
+_PIE_STYLES = {
+    "income": ("Pemasukan per Kategori", INCOME_COLORS, '#1e40af'),
+    "expense": ("Pengeluaran per Kategori", EXPENSE_COLORS, '#dc2626'),
+}
+
+
+class FigureCache:
+    """Cache figure dengan batas ukuran; figure paling lama tidak dipakai dibuang lebih dulu"""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._figures: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Ambil figure dari cache, atau buat dengan builder jika belum ada"""
+        figure = self._figures.get(key)
+        if figure is not None:
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return figure
+
+        self.misses += 1
+        figure = builder()
+        self._figures[key] = figure
+        if len(self._figures) > self.maxsize:
+            self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        self._figures.clear()
+
+    def __len__(self):
+        return len(self._figures)
+
+
+@timed()
+def build_category_pie(category_summary: Dict[str, dict], kind: str):
+    """Pie chart pemasukan (kind='income') atau pengeluaran (kind='expense') per kategori"""
+    import plotly.express as px
+
+    title, colors, title_color = _PIE_STYLES[kind]
+    categories = [category for category, data in category_summary.items() if data[kind] > 0]
+
+    figure = px.pie(
+        values=[category_summary[category][kind] for category in categories],
+        names=categories,
+        title=title,
+        color_discrete_sequence=colors
+    )
+    figure.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='white',
+        font=dict(color='#0f172a', size=12, family="Arial, sans-serif"),
+        title=dict(
+            font=dict(color=title_color, size=16, family="Arial, sans-serif"),
+            x=0.5
+        ),
+        showlegend=True,
+        legend=dict(
+            font=dict(color='#374151', size=11),
+            bgcolor='rgba(255,255,255,0.8)',
+            bordercolor='#e5e7eb',
+            borderwidth=1
+        )
+    )
+
+    # Update text styling for better readability
+    figure.update_traces(
+        textposition='auto',
+        textinfo='percent+label',
+        textfont=dict(size=11, color='white', family="Arial, sans-serif"),
+        marker=dict(line=dict(color='#ffffff', width=2)),
+        hovertemplate='<b>%{label}</b><br>Jumlah: Rp %{value:,.0f}<br>Persentase: %{percent}<extra></extra>'
+    )
+    return figure
+
+
+@timed()
+def build_balance_trend(account: Account, days: int = 30):
+    """Line chart saldo di awal setiap hari selama `days` hari terakhir"""
+    import plotly.graph_objects as go
+
+    daily_balances = get_daily_balance_trend(account, days=days)
+
+    figure = go.Figure()
+    figure.add_trace(go.Scatter(
+        x=list(daily_balances.keys()),
+        y=list(daily_balances.values()),
+        mode='lines+markers',
+        name='Saldo',
+        line=dict(color='#3b82f6', width=3),
+        marker=dict(color='#1e40af', size=6)
+    ))
+
+    figure.update_layout(
+        title=dict(
+            text="Tren Saldo Harian",
+            font=dict(color='#1e40af', size=16, family="Arial, sans-serif"),
+            x=0.5
+        ),
+        xaxis_title=dict(
+            text="Tanggal",
+            font=dict(color='#374151', size=12)
+        ),
+        yaxis_title=dict(
+            text="Saldo (Rp)",
+            font=dict(color='#374151', size=12)
+        ),
+        xaxis=dict(
+            tickfont=dict(color='#1f2937', size=10),
+            gridcolor='#f3f4f6',
+            linecolor='#d1d5db'
+        ),
+        yaxis=dict(
+            tickfont=dict(color='#1f2937', size=10),
+            gridcolor='#f3f4f6',
+            linecolor='#d1d5db'
+        ),
+        plot_bgcolor='rgba(248,250,252,0.5)',
+        paper_bgcolor='white',
+        font=dict(color='#0f172a', family="Arial, sans-serif"),
+        showlegend=False,
+        margin=dict(l=60, r=20, t=60, b=40)
+    )
+    return figure
+
+
+@timed()
+def build_balance_forecast(forecast: dict):
+    """Line chart proyeksi saldo dengan rentang 95% (hasil forecast.project_balance)"""
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    figure.add_trace(go.Scatter(
+        x=forecast["dates"], y=forecast["high"], mode='lines',
+        line=dict(width=0), hoverinfo='skip', showlegend=False
+    ))
+    figure.add_trace(go.Scatter(
+        x=forecast["dates"], y=forecast["low"], mode='lines', name='Rentang 95%',
+        line=dict(width=0), fill='tonexty', fillcolor='rgba(59,130,246,0.15)'
+    ))
+    figure.add_trace(go.Scatter(
+        x=forecast["dates"], y=forecast["expected"], mode='lines', name='Proyeksi',
+        line=dict(color='#3b82f6', width=3)
+    ))
+
+    figure.update_layout(
+        title=dict(
+            text="Proyeksi Saldo",
+            font=dict(color='#1e40af', size=16, family="Arial, sans-serif"),
+            x=0.5
+        ),
+        xaxis_title=dict(text="Tanggal", font=dict(color='#374151', size=12)),
+        yaxis_title=dict(text="Saldo (Rp)", font=dict(color='#374151', size=12)),
+        xaxis=dict(tickfont=dict(color='#1f2937', size=10), gridcolor='#f3f4f6', linecolor='#d1d5db'),
+        yaxis=dict(tickfont=dict(color='#1f2937', size=10), gridcolor='#f3f4f6', linecolor='#d1d5db'),
+        plot_bgcolor='rgba(248,250,252,0.5)',
+        paper_bgcolor='white',
+        font=dict(color='#0f172a', family="Arial, sans-serif"),
+        legend=dict(orientation='h', y=-0.2),
+        margin=dict(l=60, r=20, t=60, b=40)
+    )
+    return figure
+
+
+def category_pie(cache: FigureCache, account: Account, kind: str):
+    """Pie chart per kategori dari cache (dibuat ulang hanya jika Account.version berubah)"""
+    return cache.get_or_build(
+        ("category_pie", kind, account.version),
+        lambda: build_category_pie(account.get_category_summary(), kind)
+    )
+
+
+def balance_trend(cache: FigureCache, account: Account, days: int = 30):
+    """Tren saldo harian dari cache; key menyertakan tanggal hari ini karena rentang bergeser tiap hari"""
+    return cache.get_or_build(
+        ("balance_trend", days, date.today(), account.version),
+        lambda: build_balance_trend(account, days)
+    )
+
+
+def balance_forecast(cache: FigureCache, account: Account, forecast: dict, rules: Iterable):
+    """Proyeksi saldo dari cache; key menyertakan tanggal mulai dan aturan berulang yang dipakai"""
+    rules_key = tuple((rule.id, rule.amount, rule.next_due) for rule in rules)
+    return cache.get_or_build(
+        ("balance_forecast", forecast["days"], forecast["start_date"], account.version, rules_key),
+        lambda: build_balance_forecast(forecast)
+    )
@@ -0,0 +1,387 @@
+"""
+Subcommand non-interaktif untuk script dan cron
+
+Contoh penggunaan:
+    python main.py add expense 25000 --category Transportasi --description "Grab ke kantor"
+    python main.py import transaksi.txt          # baris 'jumlah;kategori;deskripsi', '-' = stdin
+    python main.py export --output laporan.csv
+    python main.py summary --month 5 --year 2025 --json
+    python main.py add expense 12.5 --currency USD --description "Langganan"   # dikonversi dengan fx_rates.json
+    python main.py summary --currency USD        # laporan dalam mata uang lain
+    python main.py budgets set "Makanan & Minuman" 3000000
+    python main.py budgets set Transportasi 500000 --period rolling --days 14
+    python main.py budgets set Belanja 2000000 --period pay_cycle --anchor 2025-01-25
+    python main.py balance --json
+    python main.py recurring add --type income --amount 8000000 --category Gaji --frequency monthly --start 2025-01-25
+    python main.py recurring run                # untuk cron: catat transaksi berulang yang jatuh tempo
+    python main.py forecast --days 365 --threshold 500000
+
+Modul berat di-import di dalam handler agar setiap perintah cepat dijalankan.
+"""
+import argparse
+import contextlib
+import json
+import sys
+from datetime import datetime, timedelta
+
+
+def _output(args, data: dict, text: str):
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(text)
+
+
+@contextlib.contextmanager
+def _messages(args):
+    """Pesan ✅/❌ dari Account dialihkan ke stderr agar stdout tetap berisi JSON yang valid"""
+    if args.json:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    else:
+        yield
+
+
+def _load_app(args):
+    """Load akun dari file data, keluar dengan error jika tidak ada"""
+    from finance_app import FinanceApp
+    from storage import LedgerStorage
+
+    app = FinanceApp()
+    app.data_file = args.file
+    app.storage = LedgerStorage(args.file)
+    with _messages(args):
+        if not app.load_data_from_json():
+            print(f"❌ Data akun tidak ditemukan di {args.file}. Jalankan mode interaktif untuk membuat akun.",
+                  file=sys.stderr)
+            sys.exit(1)
+    return app
+
+
+def _load_budget_manager(app):
+    from budget_manager import BudgetManager
+    return BudgetManager.from_dict(app.storage.get_section("budget_manager", {}))
+
+
+def _transaction_json(transaction) -> dict:
+    data = transaction.to_dict()
+    data.pop("ts", None)
+    return data
+
+
+def cmd_add(args) -> int:
+    app = _load_app(args)
+    with _messages(args):
+        category = args.category or ("Income" if args.type == "income" else "Expense")
+        description = args.description or f"{'Pemasukan' if args.type == 'income' else 'Pengeluaran'} - {category}"
+        add = app.account.add_income if args.type == "income" else app.account.add_expense
+        transaction = add(args.amount, description, category, currency=args.currency)
+        if transaction is None:
+            return 1
+        # Transaksi baru ditambahkan ke journal, tanpa menulis ulang seluruh file
+        if not app.save_transaction_change(transaction.id):
+            return 1
+
+    _output(args, {"transaction": _transaction_json(transaction), "balance": app.account.balance},
+            f"✅ {transaction}\n💳 Saldo: Rp {app.account.balance:,.0f}")
+    return 0
+
+
+def cmd_import(args) -> int:
+    from utils import InputValidator
+
+    app = _load_app(args)
+    source = sys.stdin if args.source == "-" else open(args.source, 'r', encoding='utf-8')
+    entries, errors = [], []
+    with source:
+        for number, line in enumerate(source, 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            is_valid, result = InputValidator.validate_batch_line(line, args.type)
+            if is_valid:
+                entries.append(result)
+            else:
+                errors.append({"line": number, "error": result})
+
+    for error in errors:
+        print(f"⚠️ Baris {error['line']}: {error['error']}", file=sys.stderr)
+    if errors and args.strict:
+        return 1
+
+    with _messages(args):
+        if entries and not (app.account.add_batch(entries) and app.save_data_to_json()):
+            return 1
+
+    _output(args, {"imported": len(entries), "skipped": errors, "balance": app.account.balance},
+            f"✅ {len(entries)} transaksi diimport, {len(errors)} baris dilewati\n"
+            f"💳 Saldo: Rp {app.account.balance:,.0f}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    app = _load_app(args)
+    filename = args.output or f"finance_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with _messages(args):
+        if not app.export_to_csv(filename):
+            return 1
+    if args.json:
+        _output(args, {"file": filename, "rows": len(app.account.transactions)}, "")
+    return 0
+
+
+def cmd_summary(args) -> int:
+    from currency import BASE_CURRENCY, format_amount
+
+    app = _load_app(args)
+    now = datetime.now()
+    month, year = args.month or now.month, args.year or now.year
+    summary = {"monthly": app.account.get_monthly_summary(month, year),
+               "categories": app.account.get_category_summary()}
+    currency = BASE_CURRENCY
+    if args.currency:
+        # Satu kurs untuk seluruh ringkasan, bukan konversi per transaksi
+        currency = args.currency.upper()
+        converted = app.account.fx_table.convert_totals(summary, currency)
+        if converted is None:
+            print(f"❌ Kurs {currency} tidak tersedia di tabel kurs", file=sys.stderr)
+            return 1
+        summary = dict(converted, currency=currency)
+    monthly, categories = summary["monthly"], summary["categories"]
+
+    lines = [
+        f"📅 Ringkasan {month:02d}/{year}:",
+        f"   💵 Total Pemasukan: {format_amount(monthly['total_income'], currency)}",
+        f"   💸 Total Pengeluaran: {format_amount(monthly['total_expense'], currency)}",
+        f"   📊 Net Income: {format_amount(monthly['net_income'], currency)}",
+        f"   🔢 Jumlah Transaksi: {monthly['transaction_count']}",
+        "🏷️  Ringkasan per Kategori:",
+    ]
+    for category, data in categories.items():
+        net = format_amount(data['income'] - data['expense'], currency)
+        lines.append(f"   {category}: Net {net} ({data['count']} transaksi)")
+
+    _output(args, summary, "\n".join(lines))
+    return 0
+
+
+def cmd_budgets(args) -> int:
+    app = _load_app(args)
+    manager = _load_budget_manager(app)
+
+    if args.action in ("set", "remove"):
+        if not args.category or (args.action == "set" and args.limit is None):
+            print("❌ Gunakan: budgets set KATEGORI LIMIT atau budgets remove KATEGORI", file=sys.stderr)
+            return 2
+        try:
+            anchor = datetime.fromisoformat(args.anchor) if args.anchor else None
+        except ValueError:
+            print("❌ Tanggal harus berformat YYYY-MM-DD", file=sys.stderr)
+            return 2
+        with _messages(args):
+            if args.action == "set":
+                if not manager.add_budget(args.category, args.limit, args.period, args.days, anchor):
+                    return 1
+            elif manager.budgets.pop(args.category, None) is None:
+                print(f"❌ Budget '{args.category}' tidak ditemukan")
+                return 1
+            app.storage.set_section("budget_manager", manager.to_dict())
+            if not app.save_data_to_json():
+                return 1
+
+    now = datetime.now()
+    month, year = args.month or now.month, args.year or now.year
+    statuses = manager.check_all_budgets(app.account, month, year)
+    alerts = manager.get_budget_alerts(app.account, month, year)
+
+    lines = [f"💰 Budget {month:02d}/{year}:"] if statuses else ["📭 Belum ada budget"]
+    for status in statuses:
+        flag = "🚨" if status["is_over_budget"] else "⚠️" if status["usage_percentage"] >= 80 else "✅"
+        period = ""
+        if status["period"] != "monthly":
+            start = datetime.fromisoformat(status["start_date"])
+            end = datetime.fromisoformat(status["end_date"]) - timedelta(days=1)
+            period = f" [{start.strftime('%d/%m')} - {end.strftime('%d/%m')}]"
+        lines.append(f"   {flag} {status['category']}{period}: Rp {status['spent']:,.0f} / Rp {status['limit']:,.0f} "
+                     f"({status['usage_percentage']:.1f}%)")
+    lines.extend(alerts)
+
+    _output(args, {"month": month, "year": year, "budgets": statuses, "alerts": alerts}, "\n".join(lines))
+    return 0
+
+
+def cmd_balance(args) -> int:
+    app = _load_app(args)
+    account = app.account
+    _output(args,
+            {"owner_name": account.owner_name, "balance": account.balance,
+             "transaction_count": len(account.transactions)},
+            f"👤 {account.owner_name}\n💳 Saldo: Rp {account.balance:,.0f}\n📝 Transaksi: {len(account.transactions)}")
+    return 0
+
+
+def cmd_recurring(args) -> int:
+    from recurring import RecurringScheduler
+
+    app = _load_app(args)
+    scheduler = RecurringScheduler.from_dict(app.storage.get_section(RecurringScheduler.SECTION, {}))
+
+    with _messages(args):
+        if args.action == "add":
+            if args.amount is None or args.start is None:
+                print("❌ Gunakan: recurring add --amount JUMLAH --start YYYY-MM-DD [--frequency ...]", file=sys.stderr)
+                return 2
+            try:
+                start = datetime.fromisoformat(args.start)
+                end = datetime.fromisoformat(args.end) if args.end else None
+            except ValueError:
+                print("❌ Tanggal harus berformat YYYY-MM-DD", file=sys.stderr)
+                return 2
+            category = args.category or ("Income" if args.type == "income" else "Expense")
+            rule = scheduler.add_rule(args.type, args.amount, category, args.description or category,
+                                      args.frequency, start, args.interval, end)
+            if rule is None:
+                return 1
+        elif args.action == "remove":
+            if not args.id or not scheduler.remove_rule(args.id):
+                return 1
+
+        count = 0
+        if args.action in ("add", "run"):
+            # Aturan baru dengan tanggal mulai di masa lalu langsung di-catch-up
+            count = scheduler.catch_up(app.account, storage=app.storage)
+            if count is None:
+                print("❌ Transaksi berulang yang jatuh tempo belum dicatat", file=sys.stderr)
+                return 1
+        if args.action in ("add", "remove") or count:
+            app.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+            if not app.save_data_to_json():
+                return 1
+
+    rules = [rule.to_dict() for rule in scheduler.rules.values()]
+    lines = [f"🔁 {count} transaksi berulang dicatat"] if args.action in ("add", "run") else []
+    lines += [f"   {rule.id}  {rule}" for rule in scheduler.rules.values()] or ["📭 Belum ada transaksi berulang"]
+    _output(args, {"created": count, "rules": rules, "balance": app.account.balance}, "\n".join(lines))
+    return 0
+
+
+def cmd_forecast(args) -> int:
+    from forecast import goal_feasibility, low_balance_warnings, project_balance
+    from recurring import RecurringScheduler
+
+    if args.days < 1:
+        print("❌ Jumlah hari proyeksi minimal 1", file=sys.stderr)
+        return 2
+    app = _load_app(args)
+    scheduler = RecurringScheduler.from_dict(app.storage.get_section(RecurringScheduler.SECTION, {}))
+    manager = _load_budget_manager(app)
+
+    forecast = project_balance(app.account, args.days, scheduler.rules.values())
+    warnings = low_balance_warnings(forecast, args.threshold)
+    manager.sync_goals(app.account)
+    goals = [goal_feasibility(forecast, goal) for goal in manager.goals.values()]
+
+    lines = [
+        f"🔮 Proyeksi saldo {args.days} hari:",
+        f"   📊 Rata-rata arus kas harian: Rp {forecast['daily_net']:,.0f} (± Rp {forecast['daily_std']:,.0f})",
+    ]
+    for month in forecast["monthly"]:
+        lines.append(f"   {month['month']}: Rp {month['expected']:,.0f} "
+                     f"(Rp {month['low']:,.0f} - Rp {month['high']:,.0f})")
+    lines.extend(warnings)
+    for goal in goals:
+        flag = "✅" if goal["is_feasible"] else "⚠️"
+        lines.append(f"   {flag} Goal {goal['name']}: peluang tercapai {goal['probability'] * 100:.0f}% "
+                     f"(kurang Rp {goal['shortfall']:,.0f})")
+
+    data = {key: forecast[key] for key in ("start_date", "days", "daily_net", "daily_std", "monthly", "lowest")}
+    _output(args, dict(data, warnings=warnings, goals=goals), "\n".join(lines))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--file", default="finance_data.json", help="File data (default: finance_data.json)")
+    common.add_argument("--json", action="store_true", help="Tampilkan hasil sebagai JSON")
+
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Personal Finance Manager. Tanpa subcommand menjalankan mode interaktif."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    add = subparsers.add_parser("add", parents=[common], help="Tambah satu transaksi")
+    add.add_argument("type", choices=["income", "expense"], help="Jenis transaksi")
+    add.add_argument("amount", type=float, help="Jumlah (dalam --currency, default Rupiah)")
+    add.add_argument("--category", help="Kategori")
+    add.add_argument("--description", help="Deskripsi")
+    add.add_argument("--currency", help="Mata uang jumlah (default IDR; dikonversi dengan tabel kurs)")
+    add.set_defaults(handler=cmd_add)
+
+    import_ = subparsers.add_parser("import", parents=[common],
+                                    help="Import baris 'jumlah;kategori;deskripsi' dari file atau stdin")
+    import_.add_argument("source", help="File sumber, '-' untuk stdin")
+    import_.add_argument("--type", choices=["income", "expense"], default="expense",
+                         help="Jenis default jika jumlah tanpa awalan +/-")
+    import_.add_argument("--strict", action="store_true", help="Batalkan import jika ada baris tidak valid")
+    import_.set_defaults(handler=cmd_import)
+
+    export = subparsers.add_parser("export", parents=[common], help="Export transaksi ke CSV")
+    export.add_argument("--output", help="File CSV tujuan")
+    export.set_defaults(handler=cmd_export)
+
+    summary = subparsers.add_parser("summary", parents=[common], help="Ringkasan bulanan dan per kategori")
+    summary.add_argument("--month", type=int, choices=range(1, 13), metavar="BULAN")
+    summary.add_argument("--year", type=int, metavar="TAHUN")
+    summary.add_argument("--currency", help="Tampilkan ringkasan dalam mata uang ini (default IDR)")
+    summary.set_defaults(handler=cmd_summary)
+
+    budgets = subparsers.add_parser("budgets", parents=[common], help="Lihat atau atur budget")
+    budgets.add_argument("action", nargs="?", choices=["list", "set", "remove"], default="list")
+    budgets.add_argument("category", nargs="?", help="Kategori (untuk set/remove)")
+    budgets.add_argument("limit", nargs="?", type=float, help="Limit per periode (untuk set)")
+    budgets.add_argument("--period", choices=["monthly", "weekly", "biweekly", "rolling", "pay_cycle"],
+                         default="monthly", help="Periode budget (untuk set, default: monthly)")
+    budgets.add_argument("--days", type=int, help="Panjang jendela budget rolling (hari)")
+    budgets.add_argument("--anchor", help="Tanggal awal siklus untuk weekly/biweekly/pay_cycle (YYYY-MM-DD)")
+    budgets.add_argument("--month", type=int, choices=range(1, 13), metavar="BULAN")
+    budgets.add_argument("--year", type=int, metavar="TAHUN")
+    budgets.set_defaults(handler=cmd_budgets)
+
+    recurring = subparsers.add_parser("recurring", parents=[common], help="Kelola dan jalankan transaksi berulang")
+    recurring.add_argument("action", nargs="?", choices=["list", "add", "remove", "run"], default="list")
+    recurring.add_argument("--id", help="Id aturan (untuk remove)")
+    recurring.add_argument("--type", choices=["income", "expense"], default="expense")
+    recurring.add_argument("--amount", type=float, help="Jumlah (Rp)")
+    recurring.add_argument("--category", help="Kategori")
+    recurring.add_argument("--description", help="Deskripsi")
+    recurring.add_argument("--frequency", choices=["daily", "weekly", "monthly", "custom"], default="monthly")
+    recurring.add_argument("--interval", type=int, default=1, help="Setiap N hari/minggu/bulan (custom: N hari)")
+    recurring.add_argument("--start", help="Tanggal kejadian pertama (YYYY-MM-DD[THH:MM])")
+    recurring.add_argument("--end", help="Tanggal akhir (opsional)")
+    recurring.set_defaults(handler=cmd_recurring)
+
+    forecast = subparsers.add_parser("forecast", parents=[common],
+                                     help="Proyeksi saldo, peringatan saldo rendah, dan kelayakan goal")
+    forecast.add_argument("--days", type=int, default=365, help="Jumlah hari proyeksi (default: 365)")
+    forecast.add_argument("--threshold", type=float, default=100_000,
+                          help="Batas peringatan saldo rendah (default: 100000)")
+    forecast.set_defaults(handler=cmd_forecast)
+
+    balance = subparsers.add_parser("balance", parents=[common], help="Saldo saat ini")
+    balance.set_defaults(handler=cmd_balance)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Jalankan subcommand; kembalikan exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+    try:
+        return args.handler(args)
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
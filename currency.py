@@ -0,0 +1,130 @@
+"""
+Mata uang dan tabel kurs (FX) lokal
+
+Semua saldo dan agregat akun disimpan dalam mata uang dasar (Rupiah). Transaksi dalam
+mata uang lain dikonversi sekali saat dicatat; jumlah aslinya disimpan di
+Transaction.original_amount. Laporan dalam mata uang lain cukup membagi total
+agregat dengan satu kurs, sehingga ringkasan ledger multi mata uang sama cepatnya
+dengan ledger satu mata uang.
+
+Format file kurs (fx_rates.json di folder yang sama dengan file ledger, lihat
+rates_file_for), nilai = harga 1 unit dalam Rupiah:
+    {"base": "IDR", "updated": "2025-01-01", "rates": {"USD": 16250, "EUR": 17600}}
+"""
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+BASE_CURRENCY = "IDR"
+DEFAULT_RATES_FILE = "fx_rates.json"
+CHECK_INTERVAL = 1.0  # detik; mtime file kurs dicek paling sering sekali per interval
+
+CURRENCY_SYMBOLS = {"IDR": "Rp", "USD": "$", "EUR": "€", "SGD": "S$", "JPY": "¥", "MYR": "RM", "GBP": "£"}
+# Field ringkasan yang berisi jumlah uang (lihat FxTable.convert_totals)
+MONEY_FIELDS = frozenset(("income", "expense", "total_income", "total_expense", "net_income", "balance",
+                          "limit", "spent", "remaining"))
+# Jumlah digit desimal yang ditampilkan (Rupiah dan Yen tanpa desimal)
+CURRENCY_DECIMALS = {"IDR": 0, "JPY": 0}
+
+
+def format_amount(amount: float, currency: str = BASE_CURRENCY, thousands: str = ",") -> str:
+    """Format jumlah dengan simbol mata uang, mis. 'Rp 1,500,000' atau '$ 12.50'
+
+    thousands="." memakai format Indonesia (titik ribuan, koma desimal): 'Rp 1.500.000'.
+    """
+    symbol = CURRENCY_SYMBOLS.get(currency, currency)
+    text = f"{amount:,.{CURRENCY_DECIMALS.get(currency, 2)}f}"
+    if thousands == ".":
+        text = text.replace(',', '_').replace('.', ',').replace('_', '.')
+    return f"{symbol} {text}"
+
+
+class FxTable:
+    """Tabel kurs dari file; dibaca ulang hanya jika mtime file berubah (dicek tiap CHECK_INTERVAL)"""
+
+    def __init__(self, filename: str = DEFAULT_RATES_FILE):
+        self.filename = filename
+        self.updated: Optional[str] = None
+        self._rates: Dict[str, float] = {BASE_CURRENCY: 1.0}
+        self._mtime: Optional[int] = None
+        self._checked_at: Optional[float] = None
+
+    @property
+    def rates(self) -> Dict[str, float]:
+        """Kurs per mata uang (1 unit = N Rupiah); file tidak ada = hanya Rupiah"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < CHECK_INTERVAL:
+            return self._rates
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._load(mtime)
+        return self._rates
+
+    def _load(self, mtime: Optional[int]):
+        rates = {BASE_CURRENCY: 1.0}
+        self.updated = None
+        if mtime is not None:
+            try:
+                with open(self.filename, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get("base", BASE_CURRENCY) != BASE_CURRENCY:
+                    raise ValueError(f"base harus {BASE_CURRENCY}")
+                for code, rate in data.get("rates", {}).items():
+                    if rate > 0:
+                        rates[code.upper()] = float(rate)
+                self.updated = data.get("updated")
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                print(f"❌ File kurs {self.filename} tidak valid: {e}")
+        self._rates = rates
+        self._mtime = mtime
+
+    @property
+    def currencies(self) -> Tuple[str, ...]:
+        return tuple(self.rates)
+
+    def rate(self, currency: str) -> Optional[float]:
+        """Kurs mata uang ke Rupiah, None jika tidak ada di tabel"""
+        return self.rates.get(currency.upper())
+
+    def to_base(self, amount: float, currency: str) -> Optional[float]:
+        """Konversi jumlah ke Rupiah, None jika kurs tidak tersedia"""
+        rate = self.rate(currency)
+        return amount * rate if rate is not None else None
+
+    def convert_totals(self, totals: dict, currency: str) -> Optional[dict]:
+        """Konversi field uang di ringkasan (hasil get_*_summary, check_all_budgets) dari Rupiah ke `currency`
+
+        Satu kurs untuk seluruh ringkasan; field lain (jumlah transaksi, bulan) tidak diubah.
+        """
+        rate = self.rate(currency)
+        if rate is None:
+            return None
+
+        def convert(data: dict) -> dict:
+            return {key: convert(value) if isinstance(value, dict)
+                    else value / rate if key in MONEY_FIELDS else value
+                    for key, value in data.items()}
+
+        return convert(totals)
+
+
+_tables: Dict[str, FxTable] = {}
+
+
+def rates_file_for(data_file: str) -> str:
+    """File kurs untuk ledger `data_file`: fx_rates.json di folder yang sama (bukan di CWD)"""
+    return os.path.join(os.path.dirname(os.path.abspath(data_file)), DEFAULT_RATES_FILE)
+
+
+def get_fx_table(filename: str = DEFAULT_RATES_FILE) -> FxTable:
+    """Tabel kurs bersama per file (cache kurs dipakai ulang antar pemanggil)"""
+    filename = os.path.abspath(filename)
+    table = _tables.get(filename)
+    if table is None:
+        table = _tables[filename] = FxTable(filename)
+    return table
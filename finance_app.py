@@ -1,8 +1,11 @@
 import os
-import json
 from datetime import datetime, timedelta
 from typing import Optional
-from account import Account, Transaction
+from account import Account
+import instrumentation
+from instrumentation import timed
+from storage import LedgerStorage
+from utils import InputValidator
 
 class FinanceApp:
     """Main application class untuk Personal Finance App"""
@@ -11,108 +14,91 @@ class FinanceApp:
         self.account: Optional[Account] = None
         self.is_running = True
         self.data_file = "finance_data.json"
+        self.storage = LedgerStorage(self.data_file)
     
     def clear_screen(self):
         """Clear terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if os.name == 'nt':
+            os.system('cls')
+        else:
+            # Escape ANSI, tanpa menjalankan shell baru setiap kali menu digambar ulang
+            print("\033[2J\033[H", end="", flush=True)
     
-    def save_data_to_json(self) -> bool:
-        """Simpan data akun ke file JSON"""
+    @timed()
+    def save_data_to_json(self, replace: bool = False, background: bool = False) -> bool:
+        """Simpan data akun ke file JSON
+        
+        Dengan background=True file ditulis di thread writer storage dan menu bisa
+        langsung dipakai lagi; error dilaporkan saat penulisan selesai.
+        """
         if not self.account:
             return False
         
         try:
-            data = {
-                "account": {
-                    "owner_name": self.account.owner_name,
-                    "balance": self.account.balance,
-                    "created_date": self.account.created_date.isoformat(),
-                    "transactions": []
-                }
-            }
-            
-            # Convert transactions to dictionary
-            for transaction in self.account.transactions:
-                transaction_data = {
-                    "id": transaction.id,
-                    "amount": transaction.amount,
-                    "description": transaction.description,
-                    "transaction_type": transaction.transaction_type,
-                    "category": transaction.category,
-                    "date": transaction.date.isoformat()
-                }
-                data["account"]["transactions"].append(transaction_data)
-            
-            with open(self.data_file, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=4, ensure_ascii=False)
-            
+            if background:
+                self.storage.save_async(self.account, replace=replace, callback=self._report_background_save)
+            else:
+                self.storage.save(self.account, replace=replace)
             return True
         except Exception as e:
             print(f"❌ Error saving data: {e}")
             return False
     
+    @staticmethod
+    def _report_background_save(future):
+        error = future.exception()
+        if error is not None:
+            print(f"\n❌ Error saving data: {error}")
+    
+    @timed()
+    def save_transaction_change(self, transaction_id) -> bool:
+        """Simpan edit/hapus satu transaksi tanpa menulis ulang seluruh file"""
+        try:
+            self.storage.record_change(self.account, transaction_id)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving data: {e}")
+            return False
+    
+    def run_recurring(self) -> Optional[int]:
+        """Buat transaksi berulang yang sudah jatuh tempo (satu batch, satu kali simpan); None jika gagal"""
+        from recurring import RecurringScheduler
+        
+        scheduler = RecurringScheduler.from_dict(self.storage.get_section(RecurringScheduler.SECTION, {}))
+        count = scheduler.catch_up(self.account, storage=self.storage)
+        if count is None:
+            print("❌ Transaksi berulang yang jatuh tempo belum dicatat")
+        elif count:
+            self.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+            if self.save_data_to_json():
+                print(f"🔁 {count} transaksi berulang yang terlewat telah dicatat")
+        return count
+    
+    @timed()
     def load_data_from_json(self) -> bool:
         """Load data akun dari file JSON"""
         try:
-            if not os.path.exists(self.data_file):
-                return False
-            
-            with open(self.data_file, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            
-            if "account" not in data:
+            account = self.storage.load()
+            if account is None:
                 return False
             
-            account_data = data["account"]
-            
-            # Create account
-            self.account = Account(
-                account_data["owner_name"],
-                0  # Set initial balance to 0, will be calculated from transactions
-            )
-            
-            # Set created date
-            self.account.created_date = datetime.fromisoformat(account_data["created_date"])
-            
-            # Load transactions
-            self.account.transactions = []
-            balance = 0
-            
-            for trans_data in account_data["transactions"]:
-                transaction = Transaction(
-                    trans_data["amount"],
-                    trans_data["description"],
-                    trans_data["transaction_type"],
-                    trans_data["category"]
-                )
-                transaction.id = trans_data["id"]
-                transaction.date = datetime.fromisoformat(trans_data["date"])
-                
-                self.account.transactions.append(transaction)
-                
-                # Calculate balance
-                if transaction.transaction_type == "income":
-                    balance += transaction.amount
-                else:
-                    balance -= transaction.amount
-            
-            self.account.balance = balance
-            
+            self.account = account
             return True
             
         except Exception as e:
             print(f"❌ Error loading data: {e}")
             return False
     
-    def export_to_csv(self) -> bool:
-        """Export transaksi ke file CSV"""
+    @timed()
+    def export_to_csv(self, filename: Optional[str] = None) -> bool:
+        """Export transaksi ke file CSV (default: finance_export_<waktu>.csv)"""
         if not self.account or not self.account.transactions:
             print("❌ Tidak ada data untuk di-export!")
             return False
         
         try:
             import csv
-            filename = f"finance_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            filename = filename or f"finance_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
             
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = ['Tanggal', 'Jenis', 'Kategori', 'Deskripsi', 'Jumlah', 'Saldo']
@@ -120,13 +106,11 @@ class FinanceApp:
                 
                 writer.writeheader()
                 
-                running_balance = 0
-                for transaction in self.account.transactions:
+                running_balances = self.account.get_running_balances()
+                for transaction, running_balance in zip(self.account.transactions, running_balances):
                     if transaction.transaction_type == "income":
-                        running_balance += transaction.amount
                         amount_display = f"+{transaction.amount:,.0f}"
                     else:
-                        running_balance -= transaction.amount
                         amount_display = f"-{transaction.amount:,.0f}"
                     
                     writer.writerow({
@@ -170,6 +154,7 @@ class FinanceApp:
                     print(f"✅ Data berhasil dimuat untuk {self.account.owner_name}")
                     print(f"💳 Saldo: Rp {self.account.get_balance():,.0f}")
                     print(f"📝 Transaksi: {len(self.account.transactions)}")
+                    self.run_recurring()
                     input("\n📱 Tekan Enter untuk melanjutkan...")
                     return True
                 else:
@@ -193,8 +178,8 @@ class FinanceApp:
         self.account = Account(name, initial_balance)
         print(f"✅ Akun berhasil dibuat untuk {name}")
         
-        # Auto-save new account
-        if self.save_data_to_json():
+        # Auto-save new account (menimpa data lama yang tidak di-load)
+        if self.save_data_to_json(replace=True):
             print("💾 Data akun tersimpan otomatis")
         
         input("\n📱 Tekan Enter untuk melanjutkan...")
@@ -209,6 +194,8 @@ class FinanceApp:
         print("3. 📊 Lihat Saldo & Riwayat")
         print("4. 📈 Laporan Keuangan")
         print("5. ⚙️  Pengaturan")
+        print("6. ✏️  Edit/Hapus Transaksi")
+        print("7. 📥 Input Batch")
         print("0. 🚪 Keluar")
         print("-" * 20)
     
@@ -226,8 +213,8 @@ class FinanceApp:
             
             if self.account.add_income(amount, description, category):
                 # Auto-save after successful transaction
-                if self.save_data_to_json():
-                    print("💾 Data tersimpan otomatis")
+                if self.save_data_to_json(background=True):
+                    print("💾 Data disimpan otomatis")
             
         except ValueError:
             print("❌ Jumlah harus berupa angka!")
@@ -251,14 +238,61 @@ class FinanceApp:
             
             if self.account.add_expense(amount, description, category):
                 # Auto-save after successful transaction
-                if self.save_data_to_json():
-                    print("💾 Data tersimpan otomatis")
+                if self.save_data_to_json(background=True):
+                    print("💾 Data disimpan otomatis")
             
         except ValueError:
             print("❌ Jumlah harus berupa angka!")
         
         input("\n📱 Tekan Enter untuk kembali...")
     
+    def batch_entry(self):
+        """Menu input banyak transaksi sekaligus, disimpan sekali di akhir"""
+        print("\n📥 INPUT BATCH")
+        print("-" * 25)
+        
+        default_type = "income" if input("💵 Jenis default (p)emasukan/(k)pengeluaran [k]: ").strip().lower() == "p" else "expense"
+        print("📝 Ketik atau paste baris 'jumlah;kategori;deskripsi' (kategori & deskripsi opsional).")
+        print("💡 Awalan + / - pada jumlah untuk pemasukan / pengeluaran. Baris kosong untuk selesai.")
+        
+        entries = []
+        errors = []
+        number = 0
+        while True:
+            try:
+                line = input()
+            except EOFError:
+                break
+            if not line.strip():
+                break
+            number += 1
+            is_valid, result = InputValidator.validate_batch_line(line, default_type)
+            if is_valid:
+                entries.append(result)
+            else:
+                errors.append(f"   Baris {number}: {result}")
+        
+        if errors:
+            print(f"\n⚠️ {len(errors)} baris dilewati:")
+            print("\n".join(errors))
+        
+        if not entries:
+            print("❌ Tidak ada transaksi yang valid")
+            input("\n📱 Tekan Enter untuk kembali...")
+            return
+        
+        total_income = sum(amount for kind, amount, _, _ in entries if kind == "income")
+        total_expense = sum(amount for kind, amount, _, _ in entries if kind == "expense")
+        print(f"\n📋 {len(entries)} transaksi valid: "
+              f"+Rp {total_income:,.0f} / -Rp {total_expense:,.0f}")
+        
+        if input("💾 Simpan semua? (y/n): ").lower() == 'y':
+            if self.account.add_batch(entries):
+                if self.save_data_to_json(background=True):
+                    print("💾 Data disimpan otomatis")
+        
+        input("\n📱 Tekan Enter untuk kembali...")
+    
     def view_balance_and_history(self):
         """Menu lihat saldo dan riwayat"""
         print(f"\n📊 SALDO & RIWAYAT")
@@ -281,6 +315,80 @@ class FinanceApp:
             
             if len(transactions) > 10:
                 print(f"\n... dan {len(transactions) - 10} transaksi lainnya")
+            
+            self.search_transactions()
+            return
+        
+        input("\n📱 Tekan Enter untuk kembali...")
+    
+    def search_transactions(self):
+        """Cari transaksi berdasarkan kata kunci sampai user menekan Enter kosong"""
+        while True:
+            query = input("\n🔍 Cari transaksi (kata kunci, Enter untuk kembali): ").strip()
+            if not query:
+                return
+            
+            results = self.account.search_transactions(query)
+            if not results:
+                print("❌ Tidak ada transaksi yang cocok")
+                continue
+            
+            print(f"\n📝 {len(results)} transaksi cocok dengan '{query}':")
+            print("-" * 60)
+            for transaction in results[:20]:
+                icon = "💵" if transaction.transaction_type == "income" else "💸"
+                print(f"{icon} {transaction}")
+            
+            if len(results) > 20:
+                print(f"\n... dan {len(results) - 20} transaksi lainnya")
+    
+    def edit_transactions(self):
+        """Menu edit atau hapus transaksi"""
+        print("\n✏️  EDIT/HAPUS TRANSAKSI")
+        print("-" * 25)
+        
+        recent_transactions = list(reversed(self.account.get_transaction_history(limit=10)))
+        if not recent_transactions:
+            print("📝 Belum ada transaksi")
+            input("\n📱 Tekan Enter untuk kembali...")
+            return
+        
+        for number, transaction in enumerate(recent_transactions, 1):
+            icon = "💵" if transaction.transaction_type == "income" else "💸"
+            print(f"{number:>2}. {icon} {transaction}")
+        
+        choice = input("\n🔢 Pilih nomor transaksi (Enter untuk batal): ").strip()
+        if not choice:
+            return
+        if not choice.isdigit() or not 1 <= int(choice) <= len(recent_transactions):
+            print("❌ Pilihan tidak valid!")
+            input("\n📱 Tekan Enter untuk kembali...")
+            return
+        
+        transaction = recent_transactions[int(choice) - 1]
+        action = input("✏️  (e)dit atau (h)apus? ").strip().lower()
+        
+        if action == "e":
+            try:
+                amount_input = input(f"💰 Jumlah baru (Enter = {transaction.amount:,.0f}): ").strip()
+                amount = float(amount_input) if amount_input else None
+                category = input(f"🏷️  Kategori baru (Enter = {transaction.category}): ").strip() or None
+                description = input(f"📝 Deskripsi baru (Enter = {transaction.description}): ").strip() or None
+                
+                if self.account.update_transaction(transaction.id, amount, description, category):
+                    if self.save_transaction_change(transaction.id):
+                        print("💾 Data tersimpan otomatis")
+            except ValueError:
+                print("❌ Jumlah harus berupa angka!")
+        
+        elif action == "h":
+            confirm = input(f"⚠️ Hapus '{transaction.description}'? (y/n): ").lower()
+            if confirm == 'y' and self.account.delete_transaction(transaction.id):
+                if self.save_transaction_change(transaction.id):
+                    print("💾 Data tersimpan otomatis")
+        
+        else:
+            print("❌ Pilihan tidak valid!")
         
         input("\n📱 Tekan Enter untuk kembali...")
     
@@ -320,9 +428,10 @@ class FinanceApp:
             print("3. 📁 Simpan Data Manual")
             print("4. 🔄 Load Data")
             print("5. 📊 Info Data")
-            print("6. 🔙 Kembali")
+            print("6. 🩺 Diagnostics")
+            print("7. 🔙 Kembali")
             
-            choice = input("\n🔢 Pilih menu (1-6): ").strip()
+            choice = input("\n🔢 Pilih menu (1-7): ").strip()
             
             if choice == "1":
                 new_name = input("👤 Nama baru: ").strip()
@@ -376,12 +485,35 @@ class FinanceApp:
                     print(f"⏰ Terakhir diubah: {mod_time.strftime('%d/%m/%Y %H:%M:%S')}")
                 
             elif choice == "6":
+                self.diagnostics_menu()
+                
+            elif choice == "7":
                 break
             else:
                 print("❌ Pilihan tidak valid!")
             
             input("\n📱 Tekan Enter untuk kembali...")
     
+    def diagnostics_menu(self):
+        """Menampilkan statistik latensi hot path dari instrumentation"""
+        print("\n🩺 DIAGNOSTICS")
+        print("-" * 15)
+        status = "Aktif" if instrumentation.is_enabled() else "Nonaktif"
+        print(f"📡 Instrumentasi: {status}")
+        print(instrumentation.format_report())
+        
+        action = input("\n🔧 (a)ktif/nonaktifkan, (r)eset data, Enter untuk kembali: ").strip().lower()
+        if action == "a":
+            if instrumentation.is_enabled():
+                instrumentation.disable()
+                print("✅ Instrumentasi dinonaktifkan")
+            else:
+                instrumentation.enable()
+                print("✅ Instrumentasi diaktifkan")
+        elif action == "r":
+            instrumentation.reset()
+            print("✅ Data instrumentasi direset")
+    
     def run(self):
         """Menjalankan aplikasi"""
         self.clear_screen()
@@ -396,7 +528,7 @@ class FinanceApp:
             self.display_header()
             self.display_main_menu()
             
-            choice = input("\n🔢 Pilih menu (0-5): ").strip()
+            choice = input("\n🔢 Pilih menu (0-7): ").strip()
             
             if choice == "1":
                 self.add_income()
@@ -408,6 +540,10 @@ class FinanceApp:
                 self.financial_reports()
             elif choice == "5":
                 self.settings_menu()
+            elif choice == "6":
+                self.edit_transactions()
+            elif choice == "7":
+                self.batch_entry()
             elif choice == "0":
                 # Final save before exit
                 print("\n💾 Menyimpan data...")
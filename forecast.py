@@ -0,0 +1,236 @@
+"""
+Proyeksi arus kas dari riwayat transaksi dan transaksi berulang
+
+Arus kas harian bersih per kategori diambil dari `lookback_days` hari terakhir
+(binary search, jadi ukuran ledger tidak berpengaruh) dan diringkas dengan
+statistik rolling (rata-rata dan varians). Transaksi hasil aturan berulang
+dikeluarkan dari riwayat karena kejadian berikutnya sudah diketahui pasti dari
+aturannya. Proyeksi dipakai untuk kelayakan financial goal dan peringatan saldo rendah.
+
+numpy dipakai jika terpasang; tanpa numpy perhitungan memakai Python murni dengan hasil sama.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional
+    np = None
+
+from account import MICROSECONDS_PER_DAY, Account, to_timestamp
+from instrumentation import timed
+
+DEFAULT_LOOKBACK_DAYS = 180
+ROLLING_WINDOW = 30
+Z_SCORE = 1.645  # batas bawah/atas satu sisi 95%
+LOW_BALANCE_THRESHOLD = 100_000
+
+
+def _day_start(moment: datetime) -> datetime:
+    return datetime.combine(moment.date(), datetime.min.time())
+
+
+def _recurring_signatures(rules: Iterable) -> set:
+    return {(rule.transaction_type == "income", rule.category, rule.description, rule.amount) for rule in rules}
+
+
+@timed()
+def daily_flows(account: Account, today: datetime, lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                rules: Iterable = ()) -> Dict[str, List[float]]:
+    """Arus kas bersih per kategori untuk setiap hari dalam `lookback_days` hari sebelum hari ini
+
+    Hari ini tidak diikutkan karena belum lengkap. Transaksi yang cocok dengan aturan
+    berulang (jenis, kategori, deskripsi, jumlah) dikeluarkan.
+    """
+    start = _day_start(today) - timedelta(days=lookback_days)
+    first_day = to_timestamp(start) // MICROSECONDS_PER_DAY
+    excluded = _recurring_signatures(rules)
+
+    flows: Dict[str, List[float]] = {}
+    for transaction in account.get_transactions_between(start, _day_start(today)):
+        is_income = transaction.transaction_type == "income"
+        if excluded and (is_income, transaction.category, transaction.description, transaction.amount) in excluded:
+            continue
+        row = flows.get(transaction.category)
+        if row is None:
+            row = flows[transaction.category] = [0.0] * lookback_days
+        row[transaction.timestamp // MICROSECONDS_PER_DAY - first_day] += (
+            transaction.amount if is_income else -transaction.amount)
+    return flows
+
+
+def category_statistics(flows: Dict[str, List[float]], window: int = ROLLING_WINDOW) -> Dict[str, dict]:
+    """Rata-rata dan simpangan baku arus kas harian per kategori, total dan rolling `window` hari terakhir"""
+    if not flows:
+        return {}
+    categories = list(flows)
+    days = len(flows[categories[0]])
+    window = max(min(window, days), 1)
+
+    if np is not None:
+        matrix = np.array([flows[category] for category in categories])
+        mean = matrix.mean(axis=1)
+        std = matrix.std(axis=1)
+        # Rolling via cumulative sum: satu operasi untuk semua kategori dan semua jendela
+        sums = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+        squares = np.cumsum(np.pad(matrix * matrix, ((0, 0), (1, 0))), axis=1)
+        rolling_mean = (sums[:, window:] - sums[:, :-window]) / window
+        rolling_var = np.maximum((squares[:, window:] - squares[:, :-window]) / window - rolling_mean ** 2, 0)
+        return {
+            category: {
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                "recent_mean": float(rolling_mean[i, -1]),
+                "recent_std": float(math.sqrt(rolling_var[i, -1])),
+            }
+            for i, category in enumerate(categories)
+        }
+
+    statistics = {}
+    for category in categories:
+        values = flows[category]
+        total = sum(values)
+        total_squares = sum(value * value for value in values)
+        recent = values[-window:]
+        recent_mean = sum(recent) / window
+        recent_var = sum(value * value for value in recent) / window - recent_mean ** 2
+        mean = total / days
+        statistics[category] = {
+            "mean": mean,
+            "std": math.sqrt(max(total_squares / days - mean ** 2, 0)),
+            "recent_mean": recent_mean,
+            "recent_std": math.sqrt(max(recent_var, 0)),
+        }
+    return statistics
+
+
+def _recurring_by_day(rules: Iterable, today: datetime, days: int) -> List[float]:
+    """Total transaksi berulang (bertanda) per hari proyeksi; yang terlewat masuk ke hari ke-0"""
+    amounts = [0.0] * (days + 1)
+    horizon_end = _day_start(today) + timedelta(days=days + 1) - timedelta(microseconds=1)
+    for rule in rules:
+        signed = rule.amount if rule.transaction_type == "income" else -rule.amount
+        for when in rule.due_dates(horizon_end):
+            amounts[max((when.date() - today.date()).days, 0)] += signed
+    return amounts
+
+
+@timed()
+def project_balance(account: Account, days: int = 365, rules: Iterable = (),
+                    lookback_days: int = DEFAULT_LOOKBACK_DAYS, today: Optional[datetime] = None) -> dict:
+    """Proyeksi saldo harian `days` hari ke depan beserta rentang 95%
+
+    Saldo hari ke-d = saldo sekarang + d x rata-rata arus kas harian (di luar transaksi
+    berulang) + total transaksi berulang sampai hari itu. Ketidakpastian tumbuh
+    sebesar akar(d) x simpangan baku harian (kategori dianggap independen).
+    """
+    today = today or datetime.now()
+    rules = list(rules)
+    statistics = category_statistics(daily_flows(account, today, lookback_days, rules))
+    drift = sum(s["mean"] for s in statistics.values())
+    daily_std = math.sqrt(sum(s["std"] ** 2 for s in statistics.values()))
+    recurring = _recurring_by_day(rules, today, days)
+
+    if np is not None:
+        steps = np.arange(days + 1)
+        expected_array = account.balance + drift * steps + np.cumsum(recurring)
+        spread = Z_SCORE * daily_std * np.sqrt(steps)
+        expected = expected_array.tolist()
+        low = (expected_array - spread).tolist()
+        high = (expected_array + spread).tolist()
+    else:
+        expected, low, high = [], [], []
+        cumulative = 0.0
+        for step in range(days + 1):
+            cumulative += recurring[step]
+            value = account.balance + drift * step + cumulative
+            spread = Z_SCORE * daily_std * math.sqrt(step)
+            expected.append(value)
+            low.append(value - spread)
+            high.append(value + spread)
+
+    start = today.date()
+    dates = [start + timedelta(days=step) for step in range(days + 1)]
+
+    # Saldo di akhir setiap bulan dalam rentang proyeksi
+    monthly = []
+    for step, day in enumerate(dates):
+        if step == days or dates[step + 1].month != day.month:
+            monthly.append({"month": day.strftime("%Y-%m"), "expected": expected[step],
+                            "low": low[step], "high": high[step]})
+
+    lowest = min(range(days + 1), key=expected.__getitem__)
+    return {
+        "start_date": start.isoformat(),
+        "days": days,
+        "dates": [day.isoformat() for day in dates],
+        "expected": expected,
+        "low": low,
+        "high": high,
+        "daily_net": drift,
+        "daily_std": daily_std,
+        "recurring_total": sum(recurring),
+        "categories": statistics,
+        "monthly": monthly,
+        "lowest": {"date": dates[lowest].isoformat(), "expected": expected[lowest], "low": low[lowest]},
+    }
+
+
+def low_balance_warnings(forecast: dict, threshold: float = LOW_BALANCE_THRESHOLD) -> List[str]:
+    """Peringatan jika saldo proyeksi (atau batas bawah 95%-nya) turun di bawah batas"""
+    def first(values: List[float], limit: float) -> Optional[int]:
+        return next((step for step, value in enumerate(values) if value < limit), None)
+
+    def when(step: int) -> str:
+        return datetime.fromisoformat(forecast["dates"][step]).strftime('%d/%m/%Y')
+
+    alerts = []
+    negative = first(forecast["expected"], 0)
+    below = first(forecast["expected"], threshold)
+    if negative is not None:
+        alerts.append(f"🚨 Saldo diperkirakan negatif mulai {when(negative)} "
+                      f"(Rp {forecast['expected'][negative]:,.0f})")
+    elif below is not None:
+        alerts.append(f"⚠️ Saldo diperkirakan di bawah Rp {threshold:,.0f} mulai {when(below)} "
+                      f"(Rp {forecast['expected'][below]:,.0f})")
+
+    risk = first(forecast["low"], 0)
+    if risk is not None and negative is None:
+        alerts.append(f"⚠️ Risiko saldo negatif (batas bawah 95%) mulai {when(risk)}")
+    return alerts
+
+
+def goal_feasibility(forecast: dict, goal) -> dict:
+    """Kelayakan financial goal berdasarkan proyeksi arus kas sampai tanggal target
+
+    Surplus proyeksi = kenaikan saldo yang diharapkan sampai tanggal target (di luar
+    horizon diekstrapolasi linear). Peluang tercapai memakai pendekatan normal.
+    """
+    progress = goal.get_progress()
+    remaining = max(progress["remaining_amount"], 0)
+    days = max(progress["days_remaining"], 0)
+    horizon = forecast["days"]
+    expected = forecast["expected"]
+
+    if days <= horizon:
+        surplus = expected[days] - expected[0]
+    else:
+        surplus = expected[-1] - expected[0] + (days - horizon) * (expected[-1] - expected[0]) / max(horizon, 1)
+    sigma = forecast["daily_std"] * math.sqrt(days)
+
+    if remaining == 0:
+        probability = 1.0
+    elif sigma > 0:
+        probability = 0.5 * (1 + math.erf((surplus - remaining) / (sigma * math.sqrt(2))))
+    else:
+        probability = 1.0 if surplus >= remaining else 0.0
+
+    return dict(
+        progress,
+        projected_surplus=surplus,
+        shortfall=max(remaining - surplus, 0),
+        probability=probability,
+        is_feasible=probability >= 0.5,
+        beyond_horizon=days > horizon,
+    )
@@ -0,0 +1,171 @@
+"""
+Instrumentasi opsional untuk mengukur latensi hot path (load, save, agregasi, filter, chart, export)
+
+Nonaktif secara default. Aktifkan dengan environment variable FINANCE_INSTRUMENTATION=1
+atau lewat enable() (menu Diagnostics di CLI dan Streamlit). Saat nonaktif, @timed hanya
+menambah satu pengecekan flag per panggilan dan measure() mengembalikan objek no-op.
+"""
+import functools
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+_enabled = os.environ.get("FINANCE_INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_stats: Dict[str, "TimingStats"] = {}
+
+
+class TimingStats:
+    """Jumlah panggilan dan histogram latensi (bucket log2 mikrodetik) untuk satu operasi"""
+
+    __slots__ = ("name", "count", "total", "min", "max", "buckets")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}  # k -> jumlah panggilan dengan latensi < 2^k µs
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1_000_000).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        """Perkiraan persentil (detik) dari batas atas bucket histogram"""
+        if not self.count:
+            return 0.0
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                return min((1 << bucket) / 1_000_000, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "min_ms": self.min * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+            "histogram": {f"<{(1 << bucket) / 1000:.3g}ms": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Hapus semua data yang sudah terkumpul"""
+    with _lock:
+        _stats.clear()
+
+
+def record(name: str, seconds: float):
+    """Catat satu pengukuran latensi"""
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = TimingStats(name)
+        stats.record(seconds)
+
+
+def get_stats() -> List[dict]:
+    """Ringkasan semua operasi, urut dari total waktu terbesar"""
+    with _lock:
+        stats = [s.to_dict() for s in _stats.values()]
+    return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+def format_report() -> str:
+    """Tabel teks ringkasan untuk CLI"""
+    stats = get_stats()
+    if not stats:
+        return "📭 Belum ada data instrumentasi"
+
+    width = max(len(s["name"]) for s in stats)
+    lines = [f"{'Operasi':<{width}}  {'Jumlah':>7}  {'Total ms':>10}  {'Rata2':>9}  "
+             f"{'p50':>9}  {'p95':>9}  {'Maks':>9}"]
+    lines.append("-" * len(lines[0]))
+    for s in stats:
+        lines.append(f"{s['name']:<{width}}  {s['count']:>7}  {s['total_ms']:>10.2f}  {s['mean_ms']:>9.3f}  "
+                     f"{s['p50_ms']:>9.3f}  {s['p95_ms']:>9.3f}  {s['max_ms']:>9.3f}")
+    return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def measure(name: str):
+    """Context manager untuk mengukur satu blok kode: `with measure("gui.chart.trend"): ...`"""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator untuk mengukur latensi fungsi; nama default adalah qualname fungsi"""
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,311 @@
+"""
+Generator ledger sintetis untuk load test, benchmark dan demo
+
+Contoh penggunaan:
+    python ledger_generator.py --transactions 1000000 --years 3 --output demo_data.json --csv demo.csv
+    python ledger_generator.py --years 2 --output finance_data.json --force
+
+Data dibuat deterministik dari --seed: gaji bulanan, tagihan rutin (listrik, air,
+internet, BPJS), THR tahunan, dan pengeluaran harian dengan campuran kategori dari
+CategoryManager.DEFAULT_*_CATEGORIES serta deskripsi berbahasa Indonesia.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+from account import Account, Transaction
+from utils import CategoryManager
+
+MONTH_NAMES = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember"
+]
+
+# Pengeluaran harian: kategori -> (bobot, (min, max) jumlah, deskripsi)
+DAILY_EXPENSES = {
+    "Makanan & Minuman": (45, (10_000, 150_000), [
+        "Makan siang warteg", "Kopi susu gula aren", "GoFood nasi goreng", "GrabFood ayam geprek",
+        "Belanja sayur pasar", "Makan malam keluarga", "Jajan martabak", "Sarapan bubur ayam"
+    ]),
+    "Transportasi": (25, (8_000, 120_000), [
+        "Grab ke kantor", "Gojek pulang", "Isi bensin Pertalite", "Parkir mall",
+        "Tol dalam kota", "KRL commuter line", "GrabCar ke bandara"
+    ]),
+    "Belanja": (10, (25_000, 750_000), [
+        "Belanja bulanan Indomaret", "Beli baju di Shopee", "Sepatu dari Tokopedia",
+        "Peralatan rumah tangga", "Belanja Alfamart"
+    ]),
+    "Hiburan": (6, (25_000, 300_000), [
+        "Nonton bioskop", "Karaoke bareng teman", "Top up game", "Tiket konser", "Main bowling"
+    ]),
+    "Tagihan": (4, (25_000, 150_000), [
+        "Pulsa dan paket data", "Token listrik tambahan"
+    ]),
+    "Kesehatan": (3, (20_000, 500_000), [
+        "Obat di apotek", "Periksa ke dokter umum", "Vitamin dan suplemen"
+    ]),
+    "Pendidikan": (2, (50_000, 400_000), [
+        "Kursus online", "Beli buku", "Seminar pengembangan diri"
+    ]),
+    "Darurat": (1, (100_000, 1_500_000), [
+        "Servis motor mendadak", "Perbaikan atap bocor", "Ganti ban pecah"
+    ]),
+    "Lain-lain": (4, (10_000, 250_000), [
+        "Sumbangan masjid", "Arisan keluarga", "Kado pernikahan teman", "Laundry kiloan"
+    ]),
+}
+
+# Tagihan rutin bulanan: (tanggal, kategori, deskripsi, (min, max))
+MONTHLY_BILLS = [
+    (5, "Tagihan", "Tagihan listrik PLN {month}", (250_000, 650_000)),
+    (7, "Tagihan", "Tagihan air PDAM {month}", (80_000, 200_000)),
+    (10, "Tagihan", "Internet IndiHome {month}", (350_000, 350_000)),
+    (10, "Kesehatan", "Iuran BPJS Kesehatan {month}", (150_000, 150_000)),
+    (26, "Tabungan", "Tabungan bulanan {month}", (500_000, 1_500_000)),
+    (27, "Investasi", "Reksa dana bulanan {month}", (300_000, 1_000_000)),
+]
+
+# Pemasukan tambahan acak: kategori -> (peluang per hari, (min, max), deskripsi)
+EXTRA_INCOME = {
+    "Freelance": (0.03, (500_000, 5_000_000), ["Proyek freelance desain", "Proyek website klien"]),
+    "Investasi": (0.01, (100_000, 2_000_000), ["Dividen saham", "Bunga deposito"]),
+    "Hadiah": (0.005, (100_000, 1_000_000), ["Hadiah ulang tahun", "Angpao lebaran"]),
+    "Lain-lain": (0.01, (50_000, 800_000), ["Jual barang bekas", "Cashback e-wallet"]),
+}
+
+SALARY_DAY = 25
+
+# 'HH:MM:SS' untuk setiap detik dalam sehari, agar tidak diformat ulang per baris
+TIME_OF_DAY = [f"{h:02d}:{m:02d}:{sec:02d}" for h in range(24) for m in range(60) for sec in range(60)]
+
+Row = Tuple[str, str, str, str, float]  # (tanggal ISO, jenis, kategori, deskripsi, jumlah)
+
+
+def _validate_categories():
+    """Pastikan kategori generator sama dengan kategori default aplikasi"""
+    expense = set(CategoryManager.DEFAULT_EXPENSE_CATEGORIES)
+    income = set(CategoryManager.DEFAULT_INCOME_CATEGORIES)
+    unknown = (set(DAILY_EXPENSES) | {bill[1] for bill in MONTHLY_BILLS}) - expense
+    unknown |= (set(EXTRA_INCOME) | {"Gaji", "Bonus"}) - income
+    if unknown:
+        raise ValueError(f"Kategori tidak dikenal: {sorted(unknown)}")
+
+
+def iter_ledger(transactions: Optional[int] = None, years: float = 3.0, seed: int = 42,
+                end_date: Optional[date] = None) -> Iterator[Row]:
+    """Menghasilkan transaksi sintetis secara kronologis
+
+    `transactions` adalah target jumlah baris (kurang lebih); tanpa nilai ini rata-rata
+    sekitar 4 pengeluaran harian per hari. Baris pertama adalah saldo awal yang cukup
+    untuk pengeluaran sampai gaji pertama, sehingga saldo berjalan tidak pernah negatif
+    (sama seperti ledger yang dicatat lewat Account.add_expense).
+    """
+    _validate_categories()
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    days = max(int(years * 365), 1)
+    start_date = end_date - timedelta(days=days - 1)
+
+    fixed_per_day = (len(MONTHLY_BILLS) + 1) / 30 + sum(p for p, _, _ in EXTRA_INCOME.values())
+    daily_rate = 4.0 if transactions is None else max(transactions / days - fixed_per_day, 0.0)
+
+    categories = list(DAILY_EXPENSES)
+    weights = [DAILY_EXPENSES[c][0] for c in categories]
+    average_spend = sum(w * sum(DAILY_EXPENSES[c][1]) / 2 for c, w in zip(categories, weights)) / sum(weights)
+    monthly_bills = sum(sum(bill[3]) / 2 for bill in MONTHLY_BILLS)
+    # Gaji cukup untuk menutup pengeluaran rata-rata plus sedikit surplus
+    salary = round(max(7_500_000, 1.2 * (daily_rate * 30 * average_spend + monthly_bills)), -5)
+    # Range dimulai sebelum gaji pertama: saldo awal menutup satu bulan pengeluaran dan tagihan
+    opening_balance = float(round(salary + monthly_bills, -5))
+
+    # Deskripsi per kategori disiapkan sekali; random diambil lewat rng.random()
+    # karena jauh lebih murah daripada randrange/choice per baris
+    daily_choices = [(c, DAILY_EXPENSES[c][1][0], (DAILY_EXPENSES[c][1][1] - DAILY_EXPENSES[c][1][0]) // 500,
+                      DAILY_EXPENSES[c][2], len(DAILY_EXPENSES[c][2])) for c in categories]
+    whole_rate = int(daily_rate)
+    fraction_rate = daily_rate - whole_rate
+    rand = rng.random
+    choices = rng.choices
+    day_span = 17 * 3600  # pengeluaran harian antara 06:00 dan 23:00
+
+    balance = opening_balance
+    yield (start_date.isoformat() + "T" + TIME_OF_DAY[0], "income", "Saldo Awal", "Saldo awal", opening_balance)
+
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        prefix = day.isoformat() + "T"
+        month_name = MONTH_NAMES[day.month - 1]
+        rows = []
+
+        if day.day == SALARY_DAY:
+            rows.append((8 * 3600, "income", "Gaji", f"Gaji bulan {month_name} {day.year}", float(salary)))
+            if day.month == 3:
+                rows.append((8 * 3600 + 60, "income", "Bonus", f"THR {day.year}", float(salary)))
+
+        for bill_day, category, template, (low, high) in MONTHLY_BILLS:
+            if day.day == bill_day:
+                amount = low + int(rand() * (high - low) / 500) * 500
+                rows.append((9 * 3600 + int(rand() * 3600), "expense", category,
+                             template.format(month=f"{month_name} {day.year}"), float(amount)))
+
+        for category, (probability, (low, high), descriptions) in EXTRA_INCOME.items():
+            if rand() < probability:
+                rows.append((7 * 3600 + int(rand() * 15 * 3600), "income", category,
+                             descriptions[int(rand() * len(descriptions))],
+                             float(low + int(rand() * (high - low) / 1000) * 1000)))
+
+        count = whole_rate + (rand() < fraction_rate)
+        if count:
+            for category, low, steps, descriptions, description_count in choices(daily_choices, weights, k=count):
+                rows.append((6 * 3600 + int(rand() * day_span), "expense", category,
+                             descriptions[int(rand() * description_count)],
+                             float(low + int(rand() * steps) * 500)))
+
+        rows.sort()
+        for seconds, transaction_type, category, description, amount in rows:
+            balance += amount if transaction_type == "income" else -amount
+            if balance < 0:
+                raise RuntimeError(f"Saldo generator negatif pada {day.isoformat()} (Rp {balance:,.0f})")
+            yield (prefix + TIME_OF_DAY[seconds], transaction_type, category, description, amount)
+
+
+def _transaction_id(seed: int, index: int) -> str:
+    # Format berbeda dari ID ULID aplikasi sehingga tidak mungkin bentrok
+    return f"GEN{seed:04X}{index:012X}"
+
+
+def write_json(rows: Iterator[Row], filename: str, owner_name: str = "Demo", seed: int = 42) -> int:
+    """Tulis ledger langsung dalam skema finance_data.json, kembalikan jumlah transaksi"""
+    temp_filename = filename + ".tmp"
+    balance = 0.0
+    count = 0
+    created_date = None
+    escaped = {}  # cache string JSON; deskripsi dan kategori sangat berulang
+
+    def dumps(text: str) -> str:
+        result = escaped.get(text)
+        if result is None:
+            result = escaped[text] = json.dumps(text, ensure_ascii=False)
+        return result
+
+    with open(temp_filename, 'w', encoding='utf-8') as file:
+        file.write('{\n    "revision": 1,\n    "account": {\n        "transactions": [')
+        chunk = []
+        for date_str, transaction_type, category, description, amount in rows:
+            if created_date is None:
+                created_date = date_str
+            balance += amount if transaction_type == "income" else -amount
+            chunk.append(
+                f'{"," if count else ""}\n            {{"id": "{_transaction_id(seed, count)}", '
+                f'"amount": {amount!r}, "description": {dumps(description)}, '
+                f'"transaction_type": "{transaction_type}", "category": {dumps(category)}, '
+                f'"date": "{date_str}"}}'
+            )
+            count += 1
+            if len(chunk) >= 10_000:
+                file.write("".join(chunk))
+                chunk = []
+        file.write("".join(chunk))
+        file.write(
+            f'\n        ],\n        "owner_name": {dumps(owner_name)},'
+            f'\n        "balance": {balance!r},'
+            f'\n        "created_date": "{created_date or datetime.now().isoformat(timespec="seconds")}"'
+            f'\n    }}\n}}\n'
+        )
+
+    os.replace(temp_filename, filename)
+    return count
+
+
+def write_csv(rows: Iterator[Row], filename: str) -> int:
+    """Tulis ledger dalam format CSV yang sama dengan export aplikasi"""
+    running_balance = 0.0
+    count = 0
+
+    amount_cache = {}  # jumlah sangat berulang (kelipatan 500), format sekali saja
+    day_cache = {}
+
+    def formatted():
+        nonlocal running_balance, count
+        for date_str, transaction_type, category, description, amount in rows:
+            count += 1
+            if transaction_type == "income":
+                running_balance += amount
+                key = amount
+            else:
+                running_balance -= amount
+                key = -amount
+            amount_display = amount_cache.get(key)
+            if amount_display is None:
+                amount_display = amount_cache[key] = f"{key:+,.0f}"
+            # Tanggal ISO 'YYYY-MM-DDTHH:MM:SS' -> 'DD/MM/YYYY HH:MM'
+            day = date_str[:10]
+            day_display = day_cache.get(day)
+            if day_display is None:
+                day_display = day_cache[day] = f"{day[8:10]}/{day[5:7]}/{day[0:4]} "
+            yield (day_display + date_str[11:16], transaction_type.capitalize(), category, description,
+                   amount_display, f"{running_balance:,.0f}")
+
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Tanggal', 'Jenis', 'Kategori', 'Deskripsi', 'Jumlah', 'Saldo'])
+        writer.writerows(formatted())
+
+    return count
+
+
+def generate_account(transactions: Optional[int] = None, years: float = 3.0, seed: int = 42,
+                     owner_name: str = "Demo") -> Account:
+    """Membuat Account di memori dari ledger sintetis (untuk benchmark dan test)"""
+    account = Account(owner_name)
+    for index, (date_str, transaction_type, category, description, amount) in enumerate(
+            iter_ledger(transactions, years, seed)):
+        transaction = Transaction(amount, description, transaction_type, category,
+                                  transaction_id=_transaction_id(seed, index))
+        transaction.date = datetime.fromisoformat(date_str)
+        account._add_transaction(transaction)
+        if index == 0:
+            account.created_date = transaction.date
+    return account
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator ledger sintetis Personal Finance Manager")
+    parser.add_argument("--transactions", type=int, help="Target jumlah transaksi (default: ~4 per hari)")
+    parser.add_argument("--years", type=float, default=3.0, help="Rentang waktu ledger dalam tahun")
+    parser.add_argument("--seed", type=int, default=42, help="Seed random agar hasil bisa diulang")
+    parser.add_argument("--owner", default="Demo", help="Nama pemilik akun")
+    parser.add_argument("--output", help="File JSON tujuan (skema finance_data.json)")
+    parser.add_argument("--csv", help="File CSV tujuan (format export aplikasi)")
+    parser.add_argument("--force", action="store_true", help="Timpa file yang sudah ada")
+    args = parser.parse_args()
+
+    if not args.output and not args.csv:
+        parser.error("Pilih minimal satu dari --output atau --csv")
+
+    for filename in (args.output, args.csv):
+        if filename and os.path.exists(filename) and not args.force:
+            parser.error(f"{filename} sudah ada, gunakan --force untuk menimpa")
+
+    for filename, writer in ((args.output, write_json), (args.csv, write_csv)):
+        if not filename:
+            continue
+        start = time.perf_counter()
+        rows = iter_ledger(args.transactions, args.years, args.seed)
+        if writer is write_json:
+            count = write_json(rows, filename, args.owner, args.seed)
+        else:
+            count = write_csv(rows, filename)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {count:,} transaksi ditulis ke {filename} dalam {elapsed:.2f} detik "
+              f"({count / max(elapsed, 1e-9):,.0f} baris/detik)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
+import sys
 
 
-from finance_app import FinanceApp
-
 def main():
     """
     Fungsi utama untuk menjalankan Personal Finance App
     """
+    if len(sys.argv) > 1:
+        # Mode non-interaktif (subcommand) untuk script dan cron
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     try:
         print("🚀 Memulai Personal Finance Manager...")
-        
+
         # Inisialisasi dan jalankan aplikasi
+        from finance_app import FinanceApp
         app = FinanceApp()
         app.run()
-        
+
     except KeyboardInterrupt:
         print("\n\n👋 Aplikasi dihentikan oleh user")
         print("💡 Terima kasih telah menggunakan Personal Finance Manager!")
@@ -23,4 +28,4 @@ def main():
         print("\n🏁 Program selesai")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,139 @@
+"""
+Mode profiling untuk Streamlit: simpan cProfile dan collapsed stack per rerun
+
+Aktifkan dengan environment variable FINANCE_PROFILE=1 atau query param ?profile=1.
+Setiap rerun menghasilkan dua file di folder profil (default: profiles/):
+    <waktu>_<pemicu>.prof       -> dibuka dengan snakeviz / python -m pstats
+    <waktu>_<pemicu>.collapsed  -> input flamegraph.pl / speedscope / inferno
+Hanya `keep` pasang file terbaru yang disimpan (default 20, FINANCE_PROFILE_KEEP, minimal 1).
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional
+
+PROFILE_DIR = os.environ.get("FINANCE_PROFILE_DIR", "profiles")
+PROFILE_KEEP = max(int(os.environ.get("FINANCE_PROFILE_KEEP", "20")), 1)
+_STATE_KEY = "_profiling_last_state"
+
+
+def is_requested(query_params: Optional[Mapping] = None) -> bool:
+    """Cek apakah profiling diminta lewat env var atau query param"""
+    if os.environ.get("FINANCE_PROFILE", "").lower() in ("1", "true", "yes", "on"):
+        return True
+    return query_params is not None and query_params.get("profile") == "1"
+
+
+class StackSampler:
+    """Thread yang mengambil sampel stack satu thread secara berkala (format collapsed)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.002):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="finance-stack-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, filename: str):
+        with open(filename, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+def _snapshot(session_state: Mapping) -> Dict[str, str]:
+    snapshot = {}
+    for key in list(session_state.keys()):
+        if key == _STATE_KEY:
+            continue
+        try:
+            snapshot[key] = repr(session_state[key])[:200]
+        except Exception:
+            continue
+    return snapshot
+
+
+def detect_trigger(session_state) -> str:
+    """Tebak pemicu rerun dari key session_state (widget) yang nilainya berubah sejak rerun sebelumnya"""
+    previous = session_state.get(_STATE_KEY)
+    current = _snapshot(session_state)
+    if previous is None:
+        return "initial"
+
+    changed = sorted(key for key, value in current.items() if previous.get(key) != value)
+    return "+".join(changed[:3]) if changed else "rerun"
+
+
+def remember_state(session_state):
+    """Simpan snapshot session_state di akhir rerun sebagai pembanding rerun berikutnya"""
+    session_state[_STATE_KEY] = _snapshot(session_state)
+
+
+def _rotate(directory: str, keep: int):
+    """Hapus profil lama, sisakan `keep` rerun terbaru (minimal 1: profil yang baru ditulis)"""
+    keep = max(keep, 1)
+    runs: Dict[str, List[str]] = {}
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext in (".prof", ".collapsed"):
+            runs.setdefault(stem, []).append(os.path.join(directory, name))
+
+    # Nama file diawali timestamp sehingga urutan nama = urutan waktu
+    for stem in sorted(runs)[:-keep]:
+        for path in runs[stem]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def profile_rerun(func: Callable[[], None], trigger: str, directory: str = PROFILE_DIR,
+                  keep: int = PROFILE_KEEP) -> str:
+    """Jalankan func dengan cProfile + stack sampler, kembalikan prefix path file profil"""
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9_.+-]+", "-", trigger).strip("-")[:80] or "rerun"
+    prefix = os.path.join(directory, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{slug}")
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        profiler.dump_stats(prefix + ".prof")
+        sampler.write(prefix + ".collapsed")
+        _rotate(directory, keep)
+        print(f"🧪 Profil rerun '{trigger}' ({elapsed * 1000:.0f} ms) disimpan ke {prefix}.prof", file=sys.stderr)
+
+    return prefix
@@ -0,0 +1,249 @@
+"""
+Transaksi berulang (gaji, tagihan) dan scheduler catch-up
+
+Aturan disimpan bersama akun sebagai section 'recurring' di file data. Saat aplikasi
+dibuka (atau lewat timer), semua kejadian yang sudah jatuh tempo dibuat sekaligus
+dengan satu Account.add_batch dan satu kali simpan, sehingga membuka aplikasi
+setelah berbulan-bulan tidak menghasilkan satu save per kejadian.
+
+Catch-up bisa berjalan bersamaan dari beberapa proses (CLI, Streamlit, API, cron).
+Setiap kejadian mendapat id tetap dari (id aturan, tanggal kejadian), sehingga merge
+LedgerStorage menyatukan kejadian yang dibuat dua proses menjadi satu transaksi.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from account import Account, generate_transaction_id, to_timestamp
+from instrumentation import timed
+from utils import Reporter, add_months
+
+FREQUENCIES = ("daily", "weekly", "monthly", "custom")
+FREQUENCY_LABELS = {"daily": "Harian", "weekly": "Mingguan", "monthly": "Bulanan", "custom": "Setiap N hari"}
+
+
+class RecurringRule:
+    """Aturan transaksi berulang; next_due adalah kejadian berikutnya yang belum dibuat"""
+
+    def __init__(self, transaction_type: str, amount: float, category: str, description: str,
+                 frequency: str, start_date: datetime, interval: int = 1,
+                 end_date: Optional[datetime] = None, rule_id: Optional[str] = None):
+        self.id = rule_id or generate_transaction_id()
+        self.transaction_type = transaction_type
+        self.amount = amount
+        self.category = category
+        self.description = description
+        self.frequency = frequency
+        self.interval = interval
+        self.start_date = start_date
+        self.end_date = end_date
+        self.next_due = start_date
+
+    def _step(self) -> Optional[timedelta]:
+        """Jarak antar kejadian untuk frekuensi berbasis hari (None untuk bulanan)"""
+        if self.frequency == "daily" or self.frequency == "custom":
+            return timedelta(days=self.interval)
+        if self.frequency == "weekly":
+            return timedelta(weeks=self.interval)
+        return None
+
+    def _nth_occurrence(self, n: int) -> datetime:
+        """Kejadian ke-n dihitung dari start_date (bukan dari kejadian sebelumnya, agar tanggal 31 tidak bergeser)"""
+        step = self._step()
+        if step is not None:
+            return self.start_date + step * n
+        return add_months(self.start_date, self.interval * n, self.start_date.day)
+
+    def _index_of(self, moment: datetime) -> int:
+        """Nomor kejadian pertama yang >= moment"""
+        step = self._step()
+        if step is not None:
+            return max(-(-(moment - self.start_date) // step), 0)
+        months = (moment.year - self.start_date.year) * 12 + moment.month - self.start_date.month
+        n = max(months // self.interval, 0)
+        while self._nth_occurrence(n) < moment:
+            n += 1
+        return n
+
+    def due_dates(self, now: datetime) -> List[datetime]:
+        """Semua kejadian dari next_due sampai `now` (dan end_date jika ada)"""
+        until = min(now, self.end_date) if self.end_date else now
+        dates = []
+        n = self._index_of(self.next_due)
+        occurrence = self._nth_occurrence(n)
+        while occurrence <= until:
+            dates.append(occurrence)
+            n += 1
+            occurrence = self._nth_occurrence(n)
+        return dates
+
+    def occurrence_id(self, when: datetime) -> str:
+        """Id transaksi untuk kejadian pada `when`; sama di semua proses"""
+        return f"{self.id}-{to_timestamp(when)}"
+
+    def advance_past(self, moment: datetime):
+        """Geser next_due ke kejadian setelah `moment`"""
+        self.next_due = self._nth_occurrence(self._index_of(moment + timedelta(microseconds=1)))
+
+    @property
+    def is_finished(self) -> bool:
+        return self.end_date is not None and self.next_due > self.end_date
+
+    def to_dict(self) -> dict:
+        """Konversi aturan ke dictionary untuk disimpan ke JSON"""
+        return {
+            "id": self.id,
+            "transaction_type": self.transaction_type,
+            "amount": self.amount,
+            "category": self.category,
+            "description": self.description,
+            "frequency": self.frequency,
+            "interval": self.interval,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "next_due": self.next_due.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecurringRule":
+        """Membuat aturan dari dictionary hasil load JSON"""
+        rule = cls(data["transaction_type"], data["amount"], data["category"], data["description"],
+                   data["frequency"], datetime.fromisoformat(data["start_date"]), data.get("interval", 1),
+                   datetime.fromisoformat(data["end_date"]) if data.get("end_date") else None,
+                   rule_id=data["id"])
+        rule.next_due = datetime.fromisoformat(data.get("next_due") or data["start_date"])
+        return rule
+
+    def __str__(self):
+        label = FREQUENCY_LABELS[self.frequency]
+        if self.frequency == "custom":
+            label = f"Setiap {self.interval} hari"
+        elif self.interval > 1:
+            label = f"{label} (setiap {self.interval})"
+        sign = "+" if self.transaction_type == "income" else "-"
+        return (f"{self.description} [{self.category}] {sign}Rp {self.amount:,.0f} - {label}, "
+                f"berikutnya {self.next_due.strftime('%d/%m/%Y')}")
+
+
+class RecurringScheduler(Reporter):
+    """Kumpulan aturan berulang beserta catch-up kejadian yang terlewat"""
+
+    SECTION = "recurring"  # nama section di file data (LedgerStorage.get_section/set_section)
+
+    def __init__(self):
+        self.rules: Dict[str, RecurringRule] = {}
+
+    def add_rule(self, transaction_type: str, amount: float, category: str, description: str,
+                 frequency: str, start_date: datetime, interval: int = 1,
+                 end_date: Optional[datetime] = None) -> Optional[RecurringRule]:
+        """Menambah aturan berulang; None jika tidak valid"""
+        if transaction_type not in ("income", "expense"):
+            self._report("❌ Jenis transaksi harus 'income' atau 'expense'")
+            return None
+        if amount <= 0:
+            self._report("❌ Jumlah harus lebih dari 0")
+            return None
+        if frequency not in FREQUENCIES:
+            self._report(f"❌ Frekuensi harus salah satu dari: {', '.join(FREQUENCIES)}")
+            return None
+        if interval < 1:
+            self._report("❌ Interval minimal 1")
+            return None
+        if end_date is not None and end_date < start_date:
+            self._report("❌ Tanggal akhir harus setelah tanggal mulai")
+            return None
+
+        rule = RecurringRule(transaction_type, amount, category, description, frequency,
+                             start_date, interval, end_date)
+        self.rules[rule.id] = rule
+        self._report(f"✅ Transaksi berulang ditambahkan: {rule}")
+        return rule
+
+    def remove_rule(self, rule_id: str) -> bool:
+        """Menghapus aturan berulang (transaksi yang sudah dibuat tidak ikut dihapus)"""
+        if self.rules.pop(rule_id, None) is None:
+            self._report(f"❌ Aturan '{rule_id}' tidak ditemukan")
+            return False
+        self._report("✅ Aturan berulang dihapus")
+        return True
+
+    def due_entries(self, now: Optional[datetime] = None) -> List[Tuple[RecurringRule, datetime]]:
+        """Semua kejadian jatuh tempo dari semua aturan, urut tanggal"""
+        now = now or datetime.now()
+        due = [(rule, when) for rule in self.rules.values() for when in rule.due_dates(now)]
+        due.sort(key=lambda item: item[1])
+        return due
+
+    def refresh(self, data: dict):
+        """Ambil next_due yang lebih baru dari section di disk (kejadian sudah dibuat proses lain)"""
+        for rule_data in data.get("rules", []):
+            rule = self.rules.get(rule_data.get("id"))
+            if rule is not None and rule_data.get("next_due"):
+                rule.next_due = max(rule.next_due, datetime.fromisoformat(rule_data["next_due"]))
+
+    @timed()
+    def catch_up(self, account: Account, now: Optional[datetime] = None,
+                 storage=None) -> Optional[int]:
+        """Buat semua kejadian yang terlewat dengan satu add_batch; kembalikan jumlah transaksi
+
+        Dengan `storage` (LedgerStorage), next_due dibaca ulang dari file di disk bila file
+        diubah proses lain. Kejadian yang id-nya sudah ada di akun dilewati. next_due aturan
+        hanya digeser jika batch berhasil; jika batch ditolak (mis. saldo tidak cukup)
+        kembalikan None dengan alasan di last_message. Pemanggil cukup menyimpan akun dan
+        section 'recurring' sekali setelahnya.
+        """
+        due = self.due_entries(now)
+        if due and storage is not None and not storage.is_current():
+            self.refresh(storage.read_section(self.SECTION, {}))
+            due = self.due_entries(now)
+        if not due:
+            return 0
+
+        entries = [(rule.transaction_type, rule.amount, rule.category, rule.description, when, transaction_id)
+                   for rule, when in due
+                   for transaction_id in (rule.occurrence_id(when),)
+                   if account.get_transaction(transaction_id) is None]
+        if entries and not account.add_batch(entries):
+            self.last_message = account.last_message
+            return None
+
+        for rule, when in due:
+            rule.advance_past(when)
+        return len(entries)
+
+    def to_dict(self) -> dict:
+        """Konversi aturan ke dictionary untuk disimpan ke JSON"""
+        return {"rules": [rule.to_dict() for rule in self.rules.values()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecurringScheduler":
+        """Membuat scheduler dari dictionary hasil load JSON"""
+        scheduler = cls()
+        for rule_data in data.get("rules", []):
+            rule = RecurringRule.from_dict(rule_data)
+            scheduler.rules[rule.id] = rule
+        return scheduler
+
+
+def merge_sections(base: Optional[dict], local: dict, disk: dict) -> dict:
+    """3-way merge section 'recurring' per aturan (dipakai LedgerStorage saat merge file)
+
+    Aturan baru dari kedua sisi dipertahankan, aturan yang dihapus salah satu sisi
+    dibuang, dan next_due diambil yang paling akhir agar kejadian tidak dibuat dua kali.
+    """
+    base_ids = {rule["id"] for rule in (base or {}).get("rules", [])}
+    disk_rules = {rule["id"]: rule for rule in disk.get("rules", [])}
+    rules = []
+    for rule in local.get("rules", []):
+        theirs = disk_rules.pop(rule["id"], None)
+        if theirs is None:
+            if rule["id"] not in base_ids:
+                rules.append(rule)  # baru di sini
+            continue  # else: dihapus proses lain
+        if theirs.get("next_due") and (rule.get("next_due") or "") < theirs["next_due"]:
+            rule = dict(rule, next_due=theirs["next_due"])
+        rules.append(rule)
+    # Sisa aturan di disk: baru dari proses lain, atau (ada di base) sudah dihapus di sini
+    rules += [rule for rule_id, rule in disk_rules.items() if rule_id not in base_ids]
+    merged = dict(disk)
+    merged.update(local)
+    merged["rules"] = rules
+    return merged
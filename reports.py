@@ -0,0 +1,26 @@
+"""
+Helper laporan keuangan yang dipakai bersama oleh CLI, Streamlit dan benchmark
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from account import MICROSECONDS_PER_DAY, Account, to_timestamp
+from instrumentation import timed
+
+@timed()
+def get_daily_balance_trend(account: Account, days: int = 30, end_date: Optional[datetime] = None) -> Dict[str, float]:
+    """Saldo di awal setiap hari selama `days` hari terakhir (key: 'YYYY-MM-DD')"""
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=days)
+    
+    daily_balances = {}
+    
+    # Saldo di awal setiap hari diambil dari prefix sum saldo (binary search pada timestamp integer)
+    current_date = start_date.date()
+    day_start = to_timestamp(datetime.combine(current_date, datetime.min.time()))
+    end_timestamp = to_timestamp(end_date)
+    while day_start <= end_timestamp:
+        daily_balances[current_date.isoformat()] = account.get_balance_at_timestamp(day_start, inclusive=False)
+        current_date += timedelta(days=1)
+        day_start += MICROSECONDS_PER_DAY
+    
+    return daily_balances
@@ -0,0 +1,99 @@
+"""
+Inverted index untuk pencarian transaksi berdasarkan deskripsi dan kategori
+"""
+import bisect
+import heapq
+import re
+from typing import Dict, List, Optional
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Pecah teks menjadi token huruf kecil"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class TransactionSearchIndex:
+    """Inverted index token -> transaksi yang diperbarui setiap transaksi berubah
+
+    Setiap kata pada query dicocokkan sebagai prefix token ("list" cocok dengan
+    "listrik"), dan semua kata harus cocok (AND).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, dict] = {}  # token -> {id transaksi: transaksi}
+        self._tokens: List[str] = []  # token terurut untuk pencarian prefix
+
+    @staticmethod
+    def _transaction_tokens(transaction) -> set:
+        return set(tokenize(transaction.description)) | set(tokenize(transaction.category))
+
+    def add(self, transaction):
+        """Daftarkan transaksi ke index"""
+        for token in self._transaction_tokens(transaction):
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                bisect.insort(self._tokens, token)
+            posting[transaction.id] = transaction
+
+    def remove(self, transaction):
+        """Hapus transaksi dari index (panggil sebelum deskripsi/kategori diubah)"""
+        for token in self._transaction_tokens(transaction):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(transaction.id, None)
+            if not posting:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def _matching_tokens(self, term: str) -> List[str]:
+        start = bisect.bisect_left(self._tokens, term)
+        stop = bisect.bisect_left(self._tokens, term + "\uffff")
+        return self._tokens[start:stop]
+
+    def search(self, query: str, limit: Optional[int] = None) -> list:
+        """Cari transaksi yang cocok dengan semua kata di query, terbaru lebih dulu"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # Hitung perkiraan ukuran hasil per kata, mulai dari yang paling selektif
+        term_tokens = []
+        for term in set(terms):
+            tokens = self._matching_tokens(term)
+            if not tokens:
+                return []
+            size = sum(len(self._postings[token]) for token in tokens)
+            term_tokens.append((size, term, tokens))
+        term_tokens.sort()
+
+        _, _, tokens = term_tokens[0]
+        candidates = {}
+        for token in tokens:
+            candidates.update(self._postings[token])
+
+        for size, term, tokens in term_tokens[1:]:
+            if size > 4 * len(candidates):
+                # Lebih murah mengecek token milik kandidat langsung
+                candidates = {
+                    transaction_id: transaction
+                    for transaction_id, transaction in candidates.items()
+                    if any(token.startswith(term) for token in self._transaction_tokens(transaction))
+                }
+            else:
+                matched = set()
+                for token in tokens:
+                    matched.update(self._postings[token].keys() & candidates.keys())
+                candidates = {transaction_id: candidates[transaction_id] for transaction_id in matched}
+            if not candidates:
+                return []
+
+        def newest(transaction):
+            return transaction.timestamp
+
+        if limit is not None:
+            return heapq.nlargest(limit, candidates.values(), key=newest)
+        return sorted(candidates.values(), key=newest, reverse=True)
@@ -0,0 +1,532 @@
+"""
+Storage untuk file data keuangan yang dipakai bersama oleh CLI dan Streamlit
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows tidak punya fcntl, lock menjadi no-op
+    fcntl = None
+
+from account import Account, Transaction, TransactionId
+from currency import FxTable, get_fx_table, rates_file_for
+from recurring import RecurringScheduler, merge_sections
+
+# umask hanya bisa dibaca dengan mengubahnya; dibaca sekali saat import (sebelum ada thread writer)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class _SaveJob:
+    """Save latar belakang yang antre; save berikutnya sebelum mulai ditulis digabung ke sini"""
+
+    __slots__ = ("data", "replace", "futures")
+
+    def __init__(self, data: dict, replace: bool, future: Future):
+        self.data = data
+        self.replace = replace
+        self.futures: List[Future] = [future]
+
+
+class _LoadJob:
+    __slots__ = ("future",)
+
+    def __init__(self, future: Future):
+        self.future = future
+
+
+class LedgerStorage:
+    """Class untuk membaca dan menulis finance_data.json dengan aman dari beberapa proses
+
+    Penulisan memakai advisory lock (fcntl) yang hanya dipegang selama pengecekan
+    versi dan rename file. Jika file sudah diubah proses lain sejak terakhir dibaca,
+    perubahan mereka di-merge (3-way) dengan data di memori, bukan ditimpa.
+
+    Edit dan hapus transaksi ditulis ke file journal (JSON lines) di samping file
+    utama, sehingga tidak perlu menulis ulang seluruh file. Journal digabungkan
+    ke file utama pada save berikutnya.
+
+    save_async() dan load_async() menjalankan I/O di thread writer khusus agar UI
+    tidak menunggu disk. Snapshot akun dibuat di thread pemanggil; save yang masih
+    antre digabung sehingga hanya snapshot terbaru yang ditulis. Operasi sinkron
+    (save, record_change, load) menunggu antrean kosong lebih dulu agar urutan
+    penulisan tetap terjaga.
+    """
+
+    def __init__(self, filename: str = "finance_data.json"):
+        self.filename = filename
+        self.lock_filename = filename + ".lock"
+        self.journal_filename = filename + ".journal"
+        self.revision = 0
+        self._marker = None  # stat file utama dan journal saat terakhir sinkron
+        self._base: Dict[Any, int] = {}  # id transaksi -> hash record saat terakhir sinkron
+        self._extra: Dict[str, Any] = {}  # key top-level lain di file (dipertahankan)
+        self._base_sections: Dict[str, Any] = {}  # _extra saat terakhir sinkron (basis merge section)
+        # Thread writer latar belakang (dibuat saat save_async/load_async pertama)
+        self._state_lock = threading.RLock()  # melindungi revision/_marker/_base/_extra
+        self._jobs_changed = threading.Condition()
+        self._jobs: deque = deque()
+        self._busy = False
+        self._writer: Optional[threading.Thread] = None
+        self.status = "idle"  # "idle", "saving", "saved" atau "error"
+        self.last_saved: Optional[float] = None  # time.time() save terakhir yang berhasil
+        self.last_error: Optional[Exception] = None
+
+    def exists(self) -> bool:
+        """Cek apakah file data ada"""
+        return os.path.exists(self.filename)
+
+    @contextmanager
+    def _locked(self):
+        """Advisory lock eksklusif pada file .lock"""
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.lock_filename, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _stat(filename: str):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _disk_marker(self):
+        """Penanda versi data di disk (berubah setiap kali file utama atau journal berubah)"""
+        return (self._stat(self.filename), self._stat(self.journal_filename))
+
+    def is_current(self) -> bool:
+        """True jika file di disk tidak berubah sejak terakhir dibaca/ditulis lewat storage ini
+
+        Selama save latar belakang masih berjalan, data di memori lebih baru dari disk
+        sehingga dianggap current.
+        """
+        if self.is_saving:
+            return True
+        return self._marker is not None and self._disk_marker() == self._marker
+
+    def get_section(self, name: str, default: Any = None) -> Any:
+        """Data top-level lain di file (mis. 'budget_manager'), dibaca saat load terakhir"""
+        return self._extra.get(name, default)
+
+    @property
+    def fx_table(self) -> FxTable:
+        """Tabel kurs di folder yang sama dengan file ledger; dipasang ke akun saat load/save"""
+        return get_fx_table(rates_file_for(self.filename))
+
+    def set_section(self, name: str, value: Any):
+        """Set data top-level lain; ikut ditulis pada save() berikutnya"""
+        self._extra[name] = value
+
+    def read_section(self, name: str, default: Any = None) -> Any:
+        """Section langsung dari file di disk (dibaca di bawah lock jika diubah proses lain)"""
+        if self.is_current() or not self.exists():
+            return self.get_section(name, default)
+        data, _ = self._read()
+        return data.get(name, default)
+
+    @staticmethod
+    def _record_hash(record: dict) -> int:
+        # 'ts' diabaikan agar record lama (tanpa ts) dan record baru dengan isi sama dianggap sama
+        return hash(tuple(value for key, value in record.items() if key != "ts"))
+
+    def _read_once(self) -> dict:
+        with open(self.filename, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+
+        if "account" in data and os.path.exists(self.journal_filename):
+            # Terapkan journal di atas data file utama. File lama bisa berisi id ganda;
+            # record tidak digabung per id, journal hanya mengenai kemunculan pertama
+            # (yang sama dengan transaksi pemilik id itu di Account, lihat _index_transaction)
+            records: List[Optional[dict]] = list(data["account"]["transactions"])
+            positions: Dict[Any, int] = {}
+            for position, record in enumerate(records):
+                positions.setdefault(record["id"], position)
+            with open(self.journal_filename, 'r', encoding='utf-8') as journal:
+                for line in journal:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry["op"] == "upsert":
+                        record = entry["record"]
+                        position = positions.get(record["id"])
+                        if position is None:
+                            positions[record["id"]] = len(records)
+                            records.append(record)
+                        else:
+                            records[position] = record
+                    elif entry["op"] == "delete":
+                        position = positions.pop(entry["id"], None)
+                        if position is not None:
+                            records[position] = None
+            data["account"]["transactions"] = [record for record in records if record is not None]
+
+        return data
+
+    def _read(self):
+        """Baca file utama + journal beserta penandanya
+
+        File utama selalu diganti secara atomik, jadi pembacaan tidak memegang lock;
+        jika data berubah selama dibaca, pembacaan diulang.
+        """
+        for _ in range(5):
+            marker = self._disk_marker()
+            data = self._read_once()
+            if self._disk_marker() == marker:
+                return data, marker
+
+        with self._locked():
+            return self._read_once(), self._disk_marker()
+
+    def _remember(self, data: dict, marker, records: list):
+        """Simpan state sinkron terakhir sebagai basis merge berikutnya"""
+        self.revision = data.get("revision", 0)
+        self._marker = marker
+        self._base = {r["id"]: self._record_hash(r) for r in records}
+        self._extra = {k: v for k, v in data.items() if k not in ("account", "revision")}
+        self._base_sections = dict(self._extra)
+
+    def load(self) -> Optional[Account]:
+        """Load akun dari file, None jika file tidak ada atau tidak berisi akun"""
+        self.flush()
+        return self._load()
+
+    def _load(self) -> Optional[Account]:
+        if not self.exists():
+            return None
+
+        with self._state_lock:
+            data, marker = self._read()
+            if "account" not in data:
+                return None
+
+            account = Account.from_dict(data["account"])
+            account.fx_table = self.fx_table
+            self._remember(data, marker, data["account"]["transactions"])
+        return account
+
+    def _file_mode(self) -> int:
+        try:
+            return os.stat(self.filename).st_mode & 0o777
+        except FileNotFoundError:
+            return 0o666 & ~_UMASK
+
+    def _write_temp(self, data: dict) -> str:
+        """Tulis data ke file sementara di folder yang sama (untuk os.replace atomik)"""
+        import tempfile  # hanya dibutuhkan saat menulis; perintah baca-saja tidak memuatnya
+
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.filename)}.", suffix=".tmp", dir=directory
+        )
+        try:
+            # mkstemp membuat file 0600 dan os.replace mempertahankannya; samakan dengan
+            # mode file lama (atau mode default sesuai umask) agar proses lain tetap bisa membaca
+            os.chmod(temp_path, self._file_mode())
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=4, ensure_ascii=False)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path
+
+    def _build(self, account: Account) -> dict:
+        data = dict(self._extra)
+        data["revision"] = self.revision + 1
+        data["account"] = account.to_dict()
+        return data
+
+    def save(self, account: Account, replace: bool = False) -> None:
+        """Simpan akun ke file; merge dengan perubahan proses lain jika ada
+
+        Dengan replace=True isi file ditimpa tanpa merge (misalnya saat membuat akun baru).
+        """
+        account.fx_table = self.fx_table
+        self.flush()
+        with self._state_lock:
+            self._save(account, replace)
+
+    def _save(self, account: Account, replace: bool):
+        # Serialisasi dan tulis file sementara di luar lock agar lock singkat
+        data = self._build(account)
+        temp_path = self._write_temp(data)
+
+        try:
+            with self._locked():
+                if not replace and self._disk_marker() != self._marker:
+                    # Data sudah diubah proses lain: merge lalu tulis ulang (jarang terjadi)
+                    os.remove(temp_path)
+                    if self.exists():
+                        disk_data = self._read_once()
+                        self._merge(account, disk_data)
+                    data = self._build(account)
+                    temp_path = self._write_temp(data)
+
+                os.replace(temp_path, self.filename)
+                # Isi journal sudah tercakup di file utama
+                if os.path.exists(self.journal_filename):
+                    os.remove(self.journal_filename)
+                marker = self._disk_marker()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._remember(data, marker, data["account"]["transactions"])
+        # File sekarang berisi id hasil penggantian, journal aman dipakai lagi
+        account.ids_reassigned = False
+
+    def record_change(self, account: Account, transaction_id: TransactionId) -> None:
+        """Simpan edit/hapus satu transaksi dengan menambah baris ke journal
+
+        Jika data di disk sudah diubah proses lain, atau id transaksi diganti saat load
+        (id ganda di file lama), jatuh ke save() biasa yang menulis ulang seluruh file.
+        """
+        transaction = account.get_transaction(transaction_id)
+        record = transaction.to_dict() if transaction is not None else None
+        if account.ids_reassigned or not self.append_change(transaction_id, record):
+            self.save(account)
+
+    def append_change(self, transaction_id: TransactionId, record: Optional[dict]) -> bool:
+        """Tambah satu baris journal (record None = hapus) tanpa menyentuh Account
+
+        False jika file di disk sudah diubah proses lain; pemanggil lalu menyimpan ulang
+        (save/save_async) agar perubahan di-merge. Aman dipanggil dari thread I/O
+        karena hanya membaca record yang sudah diserialisasi.
+        """
+        if record is not None:
+            entry = {"op": "upsert", "record": record}
+        else:
+            entry = {"op": "delete", "id": transaction_id}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        # Save latar belakang yang masih antre akan menghapus journal, jadi tunggu dulu
+        self.flush()
+        with self._state_lock, self._locked():
+            if not self.exists() or self._disk_marker() != self._marker:
+                return False
+            with open(self.journal_filename, 'a', encoding='utf-8') as journal:
+                journal.write(line)
+            self._marker = self._disk_marker()
+            if record is not None:
+                self._base[transaction_id] = self._record_hash(record)
+            else:
+                self._base.pop(transaction_id, None)
+            return True
+
+    def _merge(self, account: Account, disk_data: dict):
+        """3-way merge transaksi di disk dengan transaksi di memori berdasarkan id"""
+        self.revision = max(self.revision, disk_data.get("revision", 0))
+        self._extra = self._merge_sections(self._extra, disk_data)
+
+        disk_records = disk_data.get("account", {}).get("transactions", [])
+        disk_ids = set()
+
+        for record in disk_records:
+            transaction_id = record["id"]
+            disk_ids.add(transaction_id)
+            disk_hash = self._record_hash(record)
+            base_hash = self._base.get(transaction_id)
+
+            local = account.get_transaction(transaction_id)
+            if local is not None:
+                local_hash = self._record_hash(local.to_dict())
+                if disk_hash != base_hash and local_hash == base_hash:
+                    # Diubah proses lain, tidak diubah di sini
+                    account._replace_transaction(local, Transaction.from_dict(record))
+            elif base_hash is None:
+                # Transaksi baru dari proses lain
+                account._add_transaction(Transaction.from_dict(record))
+            # else: sudah dihapus di sini, jangan dihidupkan lagi
+
+        # Transaksi yang dihapus proses lain dan tidak diubah di sini
+        for transaction_id, base_hash in list(self._base.items()):
+            local = account.get_transaction(transaction_id)
+            if (transaction_id not in disk_ids and local is not None
+                    and self._record_hash(local.to_dict()) == base_hash):
+                account._remove_transaction(local)
+
+    def _merge_sections(self, local: dict, disk_data: dict) -> dict:
+        """3-way merge section lain: section yang tidak diubah di sini mengikuti disk
+
+        Section 'recurring' di-merge per aturan (next_due terakhir menang) agar kejadian
+        yang sudah dibuat proses lain tidak dibuat ulang.
+        """
+        merged = {k: v for k, v in disk_data.items() if k not in ("account", "revision")}
+        for name, value in local.items():
+            base = self._base_sections.get(name)
+            if name == RecurringScheduler.SECTION and name in merged:
+                merged[name] = merge_sections(base, value, merged[name])
+            elif name not in merged or value != base:
+                merged[name] = value
+        return merged
+
+    def _merge_snapshot(self, data: dict, disk_data: dict) -> dict:
+        """3-way merge snapshot (dict hasil _build) dengan data di disk tanpa menyentuh Account"""
+        local = {record["id"]: record for record in data["account"]["transactions"]}
+        records = []
+        disk_ids = set()
+
+        for record in disk_data.get("account", {}).get("transactions", []):
+            transaction_id = record["id"]
+            disk_ids.add(transaction_id)
+            base_hash = self._base.get(transaction_id)
+            mine = local.get(transaction_id)
+            if mine is not None:
+                changed_there = self._record_hash(record) != base_hash
+                changed_here = self._record_hash(mine) != base_hash
+                records.append(record if changed_there and not changed_here else mine)
+            elif base_hash is None:
+                # Transaksi baru dari proses lain
+                records.append(record)
+            # else: sudah dihapus di sini
+
+        for transaction_id, mine in local.items():
+            if transaction_id in disk_ids:
+                continue
+            base_hash = self._base.get(transaction_id)
+            # Baru di sini, atau dihapus proses lain tetapi diubah di sini
+            if base_hash is None or self._record_hash(mine) != base_hash:
+                records.append(mine)
+
+        merged = self._merge_sections({k: v for k, v in data.items() if k not in ("account", "revision")},
+                                      disk_data)
+        merged["revision"] = max(data["revision"], disk_data.get("revision", 0) + 1)
+        merged["account"] = dict(data["account"], transactions=records)
+        return merged
+
+    # ------------------------------------------------------------------
+    # I/O latar belakang
+
+    @property
+    def is_saving(self) -> bool:
+        """True jika masih ada save/load latar belakang yang antre atau sedang berjalan"""
+        return self._busy or bool(self._jobs)
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="finance-storage-writer", daemon=True)
+            self._writer.start()
+            # Thread daemon: pastikan antrean ditulis sebelum proses keluar
+            atexit.register(self.flush)
+
+    def _enqueue(self, job, merge_with_pending: bool = False):
+        self._ensure_writer()
+        with self._jobs_changed:
+            pending = self._jobs[-1] if self._jobs else None
+            if merge_with_pending and isinstance(pending, _SaveJob):
+                # Snapshot lama belum ditulis: cukup tulis yang terbaru
+                pending.data = job.data
+                pending.replace = pending.replace or job.replace
+                pending.futures.extend(job.futures)
+            else:
+                self._jobs.append(job)
+            self._jobs_changed.notify_all()
+
+    def save_async(self, account: Account, replace: bool = False,
+                   callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Simpan akun di thread writer; Future selesai dengan True setelah file ditulis
+
+        Snapshot dibuat sekarang di thread pemanggil, jadi akun boleh langsung diubah lagi.
+        callback(future) dipanggil dari thread writer dan tidak boleh memanggil
+        method sinkron storage ini (save, load, record_change, flush).
+        """
+        account.fx_table = self.fx_table
+        with self._state_lock:
+            data = self._build(account)
+        future: Future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        self.status = "saving"
+        self._enqueue(_SaveJob(data, replace, future), merge_with_pending=True)
+        return future
+
+    def load_async(self, callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """Load akun di thread writer; Future selesai dengan Account (atau None)"""
+        future: Future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        self._enqueue(_LoadJob(future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu sampai semua save/load latar belakang selesai; False jika timeout"""
+        if self._writer is None:
+            return True
+        if threading.current_thread() is self._writer:
+            raise RuntimeError("flush() tidak boleh dipanggil dari callback storage")
+        with self._jobs_changed:
+            return self._jobs_changed.wait_for(lambda: not self.is_saving, timeout)
+
+    def _write_snapshot(self, job: _SaveJob):
+        data = job.data
+        data["revision"] = self.revision + 1
+        temp_path = self._write_temp(data)
+        try:
+            with self._state_lock, self._locked():
+                merged = not job.replace and self._disk_marker() != self._marker
+                if merged:
+                    # Data diubah proses lain: merge di level record lalu tulis ulang
+                    os.remove(temp_path)
+                    disk_data = self._read_once() if self.exists() else {}
+                    data = self._merge_snapshot(data, disk_data)
+                    temp_path = self._write_temp(data)
+
+                os.replace(temp_path, self.filename)
+                if os.path.exists(self.journal_filename):
+                    os.remove(self.journal_filename)
+                # Setelah merge, akun di memori belum berisi perubahan proses lain:
+                # marker dikosongkan agar is_current() False dan pemanggil memuat ulang
+                self._remember(data, None if merged else self._disk_marker(), data["account"]["transactions"])
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _run_writer(self):
+        while True:
+            with self._jobs_changed:
+                self._jobs_changed.wait_for(lambda: self._jobs)
+                job = self._jobs.popleft()
+                self._busy = True
+
+            result, error = None, None
+            try:
+                if isinstance(job, _SaveJob):
+                    self._write_snapshot(job)
+                    result = True
+                else:
+                    result = self._load()
+            except Exception as e:
+                error = e
+
+            with self._jobs_changed:
+                if isinstance(job, _SaveJob):
+                    if error is None:
+                        self.last_saved = time.time()
+                    else:
+                        self.last_error = error
+                    if not any(isinstance(pending, _SaveJob) for pending in self._jobs):
+                        self.status = "error" if error is not None else "saved"
+                self._busy = False
+                self._jobs_changed.notify_all()
+
+            # Future diselesaikan setelah _busy dilepas agar callback melihat status terbaru
+            for future in (job.futures if isinstance(job, _SaveJob) else [job.future]):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
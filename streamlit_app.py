@@ -1,12 +1,13 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import json
+from datetime import date, datetime
 import os
 from typing import Optional
-from account import Account, Transaction
+from account import Account
+from currency import BASE_CURRENCY, format_amount
+import charts
+import instrumentation
+from instrumentation import measure, timed
+from storage import LedgerStorage
 
 # Configuration
 st.set_page_config(
@@ -645,15 +646,27 @@ class FinanceAppGUI:
         import os
         current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_file = os.path.join(current_dir, "finance_data.json")
-        self.account: Optional[Account] = None
         self.initialize_session_state()
+        self.storage: LedgerStorage = st.session_state.ledger_storage
+        self.figure_cache: charts.FigureCache = st.session_state.figure_cache
         
-        # Load existing data atau buat account baru jika belum ada
-        if not self.load_data_from_json():
-            self.account = Account("Personal Finance")
-            self.save_data_to_json()
+        # Akun disimpan di session state dan hanya dimuat ulang jika file berubah di disk,
+        # sehingga Account.version tetap sama antar rerun dan cache tetap berlaku
+        if self.account is None or not self.storage.is_current():
+            # Load existing data atau buat account baru jika belum ada
+            if not self.load_data_from_json():
+                self.account = Account("Personal Finance")
+                self.save_data_to_json()
         st.session_state.account_loaded = True
     
+    @property
+    def account(self) -> Optional[Account]:
+        return st.session_state.get("account")
+    
+    @account.setter
+    def account(self, value: Optional[Account]):
+        st.session_state.account = value
+    
     def initialize_session_state(self):
         """Initialize session state variables"""
         if 'account_loaded' not in st.session_state:
@@ -663,48 +676,23 @@ class FinanceAppGUI:
         if 'success_message' not in st.session_state:
             st.session_state.success_message = ""
         if 'current_view' not in st.session_state:
-            st.session_state.current_view = "main"  # Default view
+            st.session_state.current_view = "income"  # Default view
+        if 'ledger_storage' not in st.session_state:
+            st.session_state.ledger_storage = LedgerStorage(self.data_file)
+        if 'figure_cache' not in st.session_state:
+            st.session_state.figure_cache = charts.FigureCache(maxsize=16)
     
+    @timed()
     def load_data_from_json(self) -> bool:
         """Load account data from JSON file"""
         try:
-            if not os.path.exists(self.data_file):
-                return False
-            
-            with open(self.data_file, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            
-            if "account" not in data:
+            account = self.storage.load()
+            if account is None:
                 return False
             
-            account_data = data["account"]
-            
-            # Create account
-            self.account = Account(account_data["owner_name"], 0)
-            self.account.created_date = datetime.fromisoformat(account_data["created_date"])
-            
-            # Load transactions
-            self.account.transactions = []
-            balance = 0
-            
-            for trans_data in account_data["transactions"]:
-                transaction = Transaction(
-                    trans_data["amount"],
-                    trans_data["description"],
-                    trans_data["transaction_type"],
-                    trans_data["category"]
-                )
-                transaction.id = trans_data["id"]
-                transaction.date = datetime.fromisoformat(trans_data["date"])
-                
-                self.account.transactions.append(transaction)
-                
-                if transaction.transaction_type == "income":
-                    balance += transaction.amount
-                else:
-                    balance -= transaction.amount
-            
-            self.account.balance = balance
+            self.account = account
+            # Index pencarian dibangun di latar belakang, bukan saat pencarian pertama
+            account.prepare_search_index()
             st.session_state.account_loaded = True
             return True
             
@@ -712,37 +700,32 @@ class FinanceAppGUI:
             st.error(f"❌ Error loading data: {e}")
             return False
     
-    def save_data_to_json(self) -> bool:
-        """Save account data to JSON file"""
+    @timed()
+    def save_data_to_json(self, replace: bool = False, background: bool = False) -> bool:
+        """Save account data to JSON file
+        
+        Dengan background=True file ditulis di thread writer storage; rerun tidak
+        menunggu disk dan progresnya tampil lewat save_status().
+        """
         if not self.account:
             return False
         
         try:
-            import json
-            data = {
-                "account": {
-                    "owner_name": self.account.owner_name,
-                    "balance": self.account.balance,
-                    "created_date": self.account.created_date.isoformat(),
-                    "transactions": []
-                }
-            }
-            
-            for transaction in self.account.transactions:
-                transaction_data = {
-                    "id": transaction.id,
-                    "amount": transaction.amount,
-                    "description": transaction.description,
-                    "transaction_type": transaction.transaction_type,
-                    "category": transaction.category,
-                    "date": transaction.date.isoformat()
-                }
-                data["account"]["transactions"].append(transaction_data)
-            
-            # Tulis data ke file JSON dengan format yang rapi
-            with open(self.data_file, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=4, ensure_ascii=False)
-            
+            # Storage menangani locking dan merge dengan sesi lain
+            if background:
+                self.storage.save_async(self.account, replace=replace)
+            else:
+                self.storage.save(self.account, replace=replace)
+            return True
+        except Exception as e:
+            st.error(f"❌ Error saving data: {e}")
+            return False
+    
+    @timed()
+    def save_transaction_change(self, transaction_id) -> bool:
+        """Save a single edited/deleted transaction without rewriting the whole file"""
+        try:
+            self.storage.record_change(self.account, transaction_id)
             return True
         except Exception as e:
             st.error(f"❌ Error saving data: {e}")
@@ -780,7 +763,7 @@ class FinanceAppGUI:
                         st.error("❌ Nama tidak boleh kosong!")
                     else:
                         self.account = Account(name.strip(), initial_balance)
-                        if self.save_data_to_json():
+                        if self.save_data_to_json(replace=True):
                             st.success(f"✅ Akun berhasil dibuat untuk {name}")
                             st.success("💾 Data akun tersimpan otomatis")
                             st.session_state.account_loaded = True
@@ -788,11 +771,27 @@ class FinanceAppGUI:
                         else:
                             st.error("⚠️ Akun dibuat tetapi gagal menyimpan data")
     
+    def save_status(self):
+        """Tampilkan status penyimpanan: menyimpan, tersimpan, atau error"""
+        if self.storage.is_saving:
+            st.caption("💾 Menyimpan…")
+        elif self.storage.status == "saved" and self.storage.last_saved:
+            st.caption(f"✅ Tersimpan {datetime.fromtimestamp(self.storage.last_saved).strftime('%H:%M:%S')}")
+        elif self.storage.status == "error":
+            st.error(f"❌ Gagal menyimpan data: {self.storage.last_error}")
+    
     def main_dashboard(self):
         """Main dashboard page"""
         # Header
         st.markdown('<div class="main-header"><h1>💰 Personal Finance Manager</h1></div>', unsafe_allow_html=True)
         
+        # Status save latar belakang; selama masih menyimpan diperbarui tiap detik tanpa rerun penuh
+        # (st.fragment dengan run_every butuh Streamlit >= 1.37; versi lama cukup status statis)
+        if self.storage.is_saving and hasattr(st, "fragment"):
+            st.fragment(self.save_status, run_every=1)()
+        else:
+            self.save_status()
+        
         # Success message
         if st.session_state.show_success_message:
             st.success(st.session_state.success_message)
@@ -834,23 +833,29 @@ class FinanceAppGUI:
             </div>
             ''', unsafe_allow_html=True)
         
-        # Main tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["💵 Pemasukan", "💸 Pengeluaran", "📊 Riwayat", "📈 Laporan", "⚙️ Pengaturan"])
-        
-        with tab1:
-            self.add_income_tab()
+        # Navigasi: hanya view yang aktif yang dirender (st.tabs menjalankan semua isi tab setiap rerun)
+        views = {
+            "income": ("💵 Pemasukan", self.add_income_tab),
+            "expense": ("💸 Pengeluaran", self.add_expense_tab),
+            "history": ("📊 Riwayat", self.transaction_history_tab),
+            "reports": ("📈 Laporan", self.financial_reports_tab),
+            "settings": ("⚙️ Pengaturan", self.settings_tab),
+        }
+        if st.session_state.current_view not in views:
+            st.session_state.current_view = "income"
         
-        with tab2:
-            self.add_expense_tab()
+        current_view = st.radio(
+            "Menu",
+            list(views),
+            format_func=lambda view: views[view][0],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="current_view"
+        )
         
-        with tab3:
-            self.transaction_history_tab()
-        
-        with tab4:
-            self.financial_reports_tab()
-        
-        with tab5:
-            self.settings_tab()
+        _, render = views[current_view]
+        with measure(f"FinanceAppGUI.{render.__name__}"):
+            render()
     
     def add_income_tab(self):
         """Add income tab"""
@@ -861,14 +866,16 @@ class FinanceAppGUI:
         
         with col1:
             st.markdown("#### 📝 Form Pemasukan")
+            # Di luar form agar label jumlah langsung mengikuti mata uang yang dipilih
+            currency = self.currency_input("income_currency")
             with st.form("add_income_form", clear_on_submit=True):
                 st.markdown("**💰 Masukkan Detail Pemasukan:**")
                 amount = st.number_input(
-                    "Jumlah (Rp)", 
+                    f"Jumlah ({currency})", 
                     min_value=0.01, 
                     step=1000.0, 
                     key="income_amount",
-                    help="Masukkan jumlah pemasukan dalam Rupiah"
+                    help="Masukkan jumlah pemasukan dalam mata uang yang dipilih"
                 )
                 
                 category = st.selectbox(
@@ -893,13 +900,13 @@ class FinanceAppGUI:
                     submitted = st.form_submit_button("✅ Tambah Pemasukan", type="primary")
                 with col_btn2:
                     if amount > 0:
-                        st.markdown(f"**Total:** Rp {amount:,.0f}")
+                        st.markdown(f"**Total:** {format_amount(amount, currency)}")
                 
                 if submitted:
                     description = f"Pemasukan - {category}"
-                    if self.account.add_income(amount, description, category):
-                        if self.save_data_to_json():
-                            st.session_state.success_message = f"✅ Pemasukan Rp {amount:,.0f} dari {category} berhasil ditambahkan!"
+                    if self.account.add_income(amount, description, category, currency=currency):
+                        if self.save_data_to_json(background=True):
+                            st.session_state.success_message = f"✅ Pemasukan {format_amount(amount, currency)} dari {category} berhasil ditambahkan!"
                             st.session_state.show_success_message = True
                             st.rerun()
         
@@ -945,6 +952,14 @@ class FinanceAppGUI:
                 Total Pemasukan: Rp {monthly_summary['total_income']:,.0f}
                 """)
     
+    def currency_input(self, key: str) -> str:
+        """Pilihan mata uang dari tabel kurs di folder file data; Rupiah saja jika file kurs tidak ada"""
+        currencies = self.storage.fx_table.currencies
+        if len(currencies) == 1:
+            return BASE_CURRENCY
+        return st.selectbox("💱 Mata Uang", currencies, key=key,
+                            help="Jumlah selain Rupiah dikonversi dengan kurs di fx_rates.json")
+    
     def add_expense_tab(self):
         """Add expense tab"""
         st.markdown("### 💸 Tambah Pengeluaran")
@@ -959,18 +974,25 @@ class FinanceAppGUI:
             if self.account.balance < 100000:
                 st.warning("⚠️ **Peringatan**: Saldo Anda kurang dari Rp 100,000")
             
+            # Di luar form agar label jumlah langsung mengikuti mata uang yang dipilih
+            currency = self.currency_input("expense_currency")
             with st.form("add_expense_form", clear_on_submit=True):
                 st.markdown("**💰 Masukkan Detail Pengeluaran:**")
                 amount = st.number_input(
-                    "Jumlah (Rp)", 
+                    f"Jumlah ({currency})", 
                     min_value=0.01, 
                     step=1000.0, 
                     key="expense_amount",
-                    help="Masukkan jumlah pengeluaran dalam Rupiah"
+                    help="Masukkan jumlah pengeluaran dalam mata uang yang dipilih"
                 )
+                # Saldo dalam Rupiah; jumlah dikonversi dengan tabel kurs untuk pengecekan.
+                # Kurs bisa hilang jika fx_rates.json diubah sementara pilihan mata uang tetap
+                base_amount = self.storage.fx_table.to_base(amount, currency)
+                over_balance = base_amount is not None and base_amount > self.account.balance
                 
-                # Check if amount exceeds balance
-                if amount > self.account.balance:
+                if base_amount is None:
+                    st.error(f"❌ Kurs {currency} tidak tersedia di tabel kurs")
+                elif over_balance:
                     st.error(f"❌ Jumlah melebihi saldo! Saldo tersedia: Rp {self.account.balance:,.0f}")
                 
                 category = st.selectbox(
@@ -990,8 +1012,8 @@ class FinanceAppGUI:
                         category = custom_category
                 
                 # Show remaining balance
-                remaining_balance = self.account.balance - amount
-                if amount > 0:
+                if amount > 0 and base_amount is not None:
+                    remaining_balance = self.account.balance - base_amount
                     if remaining_balance >= 0:
                         st.success(f"💳 Sisa saldo setelah transaksi: Rp {remaining_balance:,.0f}")
                     else:
@@ -1003,20 +1025,22 @@ class FinanceAppGUI:
                     submitted = st.form_submit_button(
                         "✅ Tambah Pengeluaran", 
                         type="primary",
-                        disabled=(amount > self.account.balance)
+                        disabled=(base_amount is None or over_balance)
                     )
                 with col_btn2:
                     if amount > 0:
-                        st.markdown(f"**Total:** Rp {amount:,.0f}")
+                        st.markdown(f"**Total:** {format_amount(amount, currency)}")
                 
                 if submitted:
-                    if amount > self.account.balance:
+                    if base_amount is None:
+                        st.error(f"❌ Kurs {currency} tidak tersedia di tabel kurs")
+                    elif over_balance:
                         st.error(f"❌ Saldo tidak mencukupi. Saldo saat ini: Rp {self.account.balance:,.0f}")
                     else:
                         description = f"Pengeluaran - {category}"
-                        if self.account.add_expense(amount, description, category):
-                            if self.save_data_to_json():
-                                st.session_state.success_message = f"✅ Pengeluaran Rp {amount:,.0f} untuk {category} berhasil dicatat!"
+                        if self.account.add_expense(amount, description, category, currency=currency):
+                            if self.save_data_to_json(background=True):
+                                st.session_state.success_message = f"✅ Pengeluaran {format_amount(amount, currency)} untuk {category} berhasil dicatat!"
                                 st.session_state.show_success_message = True
                                 st.rerun()
         
@@ -1088,12 +1112,17 @@ class FinanceAppGUI:
         """Transaction history tab"""
         st.subheader("📊 Riwayat Transaksi")
         
-        transactions = self.account.get_transaction_history()
-        
-        if not transactions:
+        if not self.account.transactions:
             st.info("📝 Belum ada transaksi yang tercatat")
             return
         
+        search_text = st.text_input(
+            "🔍 Cari Transaksi",
+            placeholder="Contoh: grab, listrik nov",
+            key="history_search_text",
+            help="Setiap kata dicocokkan dengan awal kata di deskripsi atau kategori"
+        )
+        
         # Filter options
         col1, col2, col3 = st.columns(3)
         
@@ -1101,59 +1130,123 @@ class FinanceAppGUI:
             filter_type = st.selectbox("Filter Jenis", ["Semua", "Pemasukan", "Pengeluaran"])
         
         with col2:
-            categories = list(set([t.category for t in transactions]))
-            filter_category = st.selectbox("Filter Kategori", ["Semua"] + categories)
+            filter_category = st.selectbox("Filter Kategori", ["Semua"] + self.account.get_categories())
         
         with col3:
-            limit = st.selectbox("Tampilkan", [10, 25, 50, "Semua"])
+            page_size = st.selectbox("Tampilkan", [10, 25, 50, 100])
         
-        # Filter transactions
-        filtered_transactions = transactions
+        with st.expander("🔎 Filter Lanjutan"):
+            col1, col2 = st.columns(2)
+            with col1:
+                date_range = st.date_input("Rentang Tanggal", value=(), key="history_date_range")
+            with col2:
+                min_amount = st.number_input("Jumlah Minimum (Rp)", min_value=0.0, value=0.0, step=1000.0)
+                max_amount = st.number_input("Jumlah Maksimum (Rp, 0 = tanpa batas)", min_value=0.0, value=0.0, step=1000.0)
         
-        if filter_type != "Semua":
-            type_filter = "income" if filter_type == "Pemasukan" else "expense"
-            filtered_transactions = [t for t in filtered_transactions if t.transaction_type == type_filter]
+        start_date = end_date = None
+        if len(date_range) == 2:
+            start_date = datetime.combine(date_range[0], datetime.min.time())
+            end_date = datetime.combine(date_range[1], datetime.max.time())
         
-        if filter_category != "Semua":
-            filtered_transactions = [t for t in filtered_transactions if t.category == filter_category]
+        query = {
+            "transaction_type": None if filter_type == "Semua" else ("income" if filter_type == "Pemasukan" else "expense"),
+            "category": None if filter_category == "Semua" else filter_category,
+            "start_date": start_date,
+            "end_date": end_date,
+            "text": search_text.strip() or None,
+            "min_amount": min_amount or None,
+            "max_amount": max_amount or None,
+        }
         
-        if limit != "Semua":
-            filtered_transactions = filtered_transactions[-limit:]
+        # Ambil hanya halaman yang ditampilkan
+        page = st.session_state.get("history_page", 1)
+        result = self.account.query_transactions(page=page, page_size=page_size, **query)
+        if page > result["total_pages"]:
+            # Filter berubah sehingga halaman lama tidak ada lagi
+            st.session_state.history_page = result["total_pages"]
+            result = self.account.query_transactions(page=result["total_pages"], page_size=page_size, **query)
         
         # Display transactions
-        if filtered_transactions:
+        if result["items"]:
             # Create DataFrame for better display
-            df_data = []
-            running_balance = 0
-            
-            # Calculate running balance from the beginning if showing all
-            if limit == "Semua":
-                running_balance = 0
-                for transaction in self.account.transactions:
-                    if transaction in filtered_transactions:
-                        if transaction.transaction_type == "income":
-                            running_balance += transaction.amount
-                        else:
-                            running_balance -= transaction.amount
+            with measure("FinanceAppGUI.history.table"):
+                df_data = []
             
-            for transaction in reversed(filtered_transactions):
-                icon = "💵" if transaction.transaction_type == "income" else "💸"
-                amount_display = f"+ {transaction.amount:,.0f}" if transaction.transaction_type == "income" else f"- {transaction.amount:,.0f}"
-                trans_type = "Pemasukan 💵" if transaction.transaction_type == "income" else "Pengeluaran 💸"
+                for transaction in result["items"]:
+                    icon = "💵" if transaction.transaction_type == "income" else "💸"
+                    amount_display = f"+ {transaction.amount:,.0f}" if transaction.transaction_type == "income" else f"- {transaction.amount:,.0f}"
+                    trans_type = "Pemasukan 💵" if transaction.transaction_type == "income" else "Pengeluaran 💸"
                 
-                df_data.append({
-                    "Tanggal": transaction.date.strftime('%d/%m/%Y %H:%M'),
-                    "Jenis": trans_type,
-                    "Kategori": transaction.category,
-                    "Deskripsi": transaction.description,
-                    "Jumlah": amount_display
-                })
+                    df_data.append({
+                        "Tanggal": transaction.date.strftime('%d/%m/%Y %H:%M'),
+                        "Jenis": trans_type,
+                        "Kategori": transaction.category,
+                        "Deskripsi": transaction.description,
+                        "Jumlah": amount_display,
+                        "Saldo": f"{self.account.get_balance_after(transaction.id):,.0f}"
+                    })
             
-            df = pd.DataFrame(df_data)
+                import pandas as pd  # hanya dimuat saat riwayat ditampilkan
+                df = pd.DataFrame(df_data)
             st.dataframe(df, width='stretch', hide_index=True)
+            
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                st.number_input(
+                    "Halaman",
+                    min_value=1,
+                    max_value=result["total_pages"],
+                    key="history_page"
+                )
+            with col2:
+                st.markdown(f"Menampilkan {len(result['items'])} dari {result['total']} transaksi · {result['total_pages']} halaman")
         
         else:
             st.info("Tidak ada transaksi sesuai filter yang dipilih")
+        
+        self.edit_transaction_section()
+    
+    def edit_transaction_section(self):
+        """Edit or delete a transaction"""
+        with st.expander("✏️ Edit / Hapus Transaksi"):
+            recent_transactions = list(reversed(self.account.get_transaction_history(limit=50)))
+            transaction = st.selectbox(
+                "Pilih Transaksi",
+                recent_transactions,
+                format_func=lambda t: f"{t.date.strftime('%d/%m/%Y %H:%M')} - {t.category} - Rp {t.amount:,.0f}",
+                key="edit_transaction_select"
+            )
+            if transaction is None:
+                return
+            
+            with st.form("edit_transaction_form"):
+                amount = st.number_input("Jumlah (Rp)", min_value=0.01, value=float(transaction.amount), step=1000.0)
+                category = st.text_input("Kategori", value=transaction.category)
+                description = st.text_input("Deskripsi", value=transaction.description)
+                
+                col_btn1, col_btn2 = st.columns(2)
+                with col_btn1:
+                    update_clicked = st.form_submit_button("💾 Simpan Perubahan", type="primary")
+                with col_btn2:
+                    delete_clicked = st.form_submit_button("🗑️ Hapus Transaksi")
+            
+            if update_clicked:
+                if self.account.update_transaction(transaction.id, amount, description.strip() or None, category.strip() or None):
+                    if self.save_transaction_change(transaction.id):
+                        st.session_state.success_message = "✅ Transaksi berhasil diperbarui!"
+                        st.session_state.show_success_message = True
+                        st.rerun()
+                else:
+                    st.error(f"❌ Gagal memperbarui transaksi. Saldo saat ini: Rp {self.account.balance:,.0f}")
+            
+            if delete_clicked:
+                if self.account.delete_transaction(transaction.id):
+                    if self.save_transaction_change(transaction.id):
+                        st.session_state.success_message = "✅ Transaksi berhasil dihapus!"
+                        st.session_state.show_success_message = True
+                        st.rerun()
+                else:
+                    st.error(f"❌ Gagal menghapus transaksi. Saldo saat ini: Rp {self.account.balance:,.0f}")
     
     def financial_reports_tab(self):
         """Financial reports tab"""
@@ -1192,178 +1285,79 @@ class FinanceAppGUI:
         if category_summary:
             st.markdown("### 🏷️ Analisis per Kategori")
             
-            # Prepare data for charts
-            categories = []
-            income_amounts = []
-            expense_amounts = []
-            
-            for category, data in category_summary.items():
-                categories.append(category)
-                income_amounts.append(data["income"])
-                expense_amounts.append(data["expense"])
-            
+            # Figure diambil dari cache dan hanya dibuat ulang jika ledger berubah
             col1, col2 = st.columns(2)
             
             with col1:
                 # Income by category pie chart
-                if any(income_amounts):
-                    # Custom color palette for better contrast
-                    income_colors = ['#10b981', '#3b82f6', '#8b5cf6', '#f59e0b', '#ef4444', '#06b6d4', '#84cc16', '#f97316']
-                    
-                    fig_income = px.pie(
-                        values=[amount for amount in income_amounts if amount > 0],
-                        names=[cat for i, cat in enumerate(categories) if income_amounts[i] > 0],
-                        title="Pemasukan per Kategori",
-                        color_discrete_sequence=income_colors
-                    )
-                    fig_income.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='white',
-                        font=dict(color='#0f172a', size=12, family="Arial, sans-serif"),
-                        title=dict(
-                            font=dict(color='#1e40af', size=16, family="Arial, sans-serif"),
-                            x=0.5
-                        ),
-                        showlegend=True,
-                        legend=dict(
-                            font=dict(color='#374151', size=11),
-                            bgcolor='rgba(255,255,255,0.8)',
-                            bordercolor='#e5e7eb',
-                            borderwidth=1
-                        )
-                    )
-                    
-                    # Update text styling for better readability
-                    fig_income.update_traces(
-                        textposition='auto',
-                        textinfo='percent+label',
-                        textfont=dict(size=11, color='white', family="Arial, sans-serif"),
-                        marker=dict(line=dict(color='#ffffff', width=2)),
-                        hovertemplate='<b>%{label}</b><br>Jumlah: Rp %{value:,.0f}<br>Persentase: %{percent}<extra></extra>'
-                    )
-                    
+                if any(data["income"] for data in category_summary.values()):
+                    fig_income = charts.category_pie(self.figure_cache, self.account, "income")
                     st.plotly_chart(fig_income, width='stretch')
             
             with col2:
                 # Expense by category pie chart
-                if any(expense_amounts):
-                    # Custom color palette for expenses with better contrast
-                    expense_colors = ['#dc2626', '#f59e0b', '#7c3aed', '#ec4899', '#06b6d4', '#84cc16', '#f97316', '#6366f1']
-                    
-                    fig_expense = px.pie(
-                        values=[amount for amount in expense_amounts if amount > 0],
-                        names=[cat for i, cat in enumerate(categories) if expense_amounts[i] > 0],
-                        title="Pengeluaran per Kategori",
-                        color_discrete_sequence=expense_colors
-                    )
-                    fig_expense.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='white',
-                        font=dict(color='#0f172a', size=12, family="Arial, sans-serif"),
-                        title=dict(
-                            font=dict(color='#dc2626', size=16, family="Arial, sans-serif"),
-                            x=0.5
-                        ),
-                        showlegend=True,
-                        legend=dict(
-                            font=dict(color='#374151', size=11),
-                            bgcolor='rgba(255,255,255,0.8)',
-                            bordercolor='#e5e7eb',
-                            borderwidth=1
-                        )
-                    )
-                    
-                    # Update text styling for better readability
-                    fig_expense.update_traces(
-                        textposition='auto',
-                        textinfo='percent+label',
-                        textfont=dict(size=11, color='white', family="Arial, sans-serif"),
-                        marker=dict(line=dict(color='#ffffff', width=2)),
-                        hovertemplate='<b>%{label}</b><br>Jumlah: Rp %{value:,.0f}<br>Persentase: %{percent}<extra></extra>'
-                    )
-                    
+                if any(data["expense"] for data in category_summary.values()):
+                    fig_expense = charts.category_pie(self.figure_cache, self.account, "expense")
                     st.plotly_chart(fig_expense, width='stretch')
         
         # Daily Balance Trend (last 30 days)
         if len(transactions) > 1:
             st.markdown("### 📈 Tren Saldo Harian (30 Hari Terakhir)")
             
-            # Calculate daily balance
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
-            
-            daily_balances = {}
-            balance = 0
-            
-            # Get initial balance (transactions before start_date)
-            for transaction in transactions:
-                if transaction.date < start_date:
-                    if transaction.transaction_type == "income":
-                        balance += transaction.amount
-                    else:
-                        balance -= transaction.amount
-            
-            # Calculate daily balances for the last 30 days
-            current_date = start_date
-            while current_date <= end_date:
-                daily_balances[current_date.strftime('%Y-%m-%d')] = balance
-                
-                # Add transactions for this day
-                day_transactions = [t for t in transactions if t.date.date() == current_date.date()]
-                for transaction in day_transactions:
-                    if transaction.transaction_type == "income":
-                        balance += transaction.amount
-                    else:
-                        balance -= transaction.amount
-                
-                current_date += timedelta(days=1)
-            
-            # Create line chart
-            dates = list(daily_balances.keys())
-            balances = list(daily_balances.values())
-            
-            fig_trend = go.Figure()
-            fig_trend.add_trace(go.Scatter(
-                x=dates,
-                y=balances,
-                mode='lines+markers',
-                name='Saldo',
-                line=dict(color='#3b82f6', width=3),
-                marker=dict(color='#1e40af', size=6)
-            ))
-            
-            fig_trend.update_layout(
-                title=dict(
-                    text="Tren Saldo Harian",
-                    font=dict(color='#1e40af', size=16, family="Arial, sans-serif"),
-                    x=0.5
-                ),
-                xaxis_title=dict(
-                    text="Tanggal",
-                    font=dict(color='#374151', size=12)
-                ),
-                yaxis_title=dict(
-                    text="Saldo (Rp)",
-                    font=dict(color='#374151', size=12)
-                ),
-                xaxis=dict(
-                    tickfont=dict(color='#1f2937', size=10),
-                    gridcolor='#f3f4f6',
-                    linecolor='#d1d5db'
-                ),
-                yaxis=dict(
-                    tickfont=dict(color='#1f2937', size=10),
-                    gridcolor='#f3f4f6',
-                    linecolor='#d1d5db'
-                ),
-                plot_bgcolor='rgba(248,250,252,0.5)',
-                paper_bgcolor='white',
-                font=dict(color='#0f172a', family="Arial, sans-serif"),
-                showlegend=False,
-                margin=dict(l=60, r=20, t=60, b=40)
-            )
-            
+            fig_trend = charts.balance_trend(self.figure_cache, self.account, days=30)
             st.plotly_chart(fig_trend, width='stretch')
+        
+        self.forecast_section()
+    
+    def forecast_section(self):
+        """Proyeksi saldo 12 bulan, peringatan saldo rendah, dan kelayakan financial goal"""
+        from budget_manager import BudgetManager
+        from forecast import goal_feasibility, low_balance_warnings, project_balance
+        from recurring import RecurringScheduler
+        
+        st.markdown("### 🔮 Proyeksi Saldo (12 Bulan)")
+        
+        # Proyeksi disimpan per (versi akun, aturan berulang, budget/goal, hari ini);
+        # rerun tanpa perubahan tidak menghitung ulang simulasi 365 hari
+        recurring_section = self.storage.get_section(RecurringScheduler.SECTION, {})
+        manager_section = self.storage.get_section("budget_manager", {})
+        key = (self.account.version, recurring_section, manager_section, date.today())
+        cached = st.session_state.get("forecast_data")
+        if cached and cached[0] == key:
+            rules, forecast, warnings, feasibilities = cached[1]
+        else:
+            rules = list(RecurringScheduler.from_dict(recurring_section).rules.values())
+            forecast = project_balance(self.account, 365, rules)
+            warnings = low_balance_warnings(forecast)
+            manager = BudgetManager.from_dict(manager_section)
+            manager.sync_goals(self.account)
+            feasibilities = [goal_feasibility(forecast, goal) for goal in manager.goals.values()]
+            st.session_state.forecast_data = (key, (rules, forecast, warnings, feasibilities))
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📊 Arus Kas Harian", f"Rp {forecast['daily_net']:,.0f}")
+        with col2:
+            st.metric("📅 Saldo 12 Bulan Lagi", f"Rp {forecast['expected'][-1]:,.0f}")
+        with col3:
+            st.metric("📉 Saldo Terendah", f"Rp {forecast['lowest']['expected']:,.0f}")
+        
+        for warning in warnings:
+            st.warning(warning)
+        
+        fig_forecast = charts.balance_forecast(self.figure_cache, self.account, forecast, rules)
+        st.plotly_chart(fig_forecast, width='stretch')
+        
+        if feasibilities:
+            st.markdown("#### 🎯 Kelayakan Financial Goal")
+            for feasibility in feasibilities:
+                message = (f"{feasibility['name']}: peluang tercapai {feasibility['probability'] * 100:.0f}% "
+                           f"(sisa Rp {feasibility['remaining_amount']:,.0f}, "
+                           f"{feasibility['days_remaining']} hari lagi)")
+                if feasibility["is_feasible"]:
+                    st.success(f"✅ {message}")
+                else:
+                    st.warning(f"⚠️ {message}, kurang Rp {feasibility['shortfall']:,.0f}")
     
     def settings_tab(self):
         """Settings tab"""
@@ -1382,7 +1376,7 @@ class FinanceAppGUI:
                         old_name = self.account.owner_name
                         self.account.owner_name = new_name.strip()
                         
-                        if self.save_data_to_json():
+                        if self.save_data_to_json(background=True):
                             st.success(f"✅ Nama berhasil diubah dari '{old_name}' ke '{new_name}'")
                         else:
                             st.error("❌ Gagal menyimpan perubahan")
@@ -1408,8 +1402,8 @@ class FinanceAppGUI:
         
         with col1:
             if st.button("📁 Simpan Data Manual"):
-                if self.save_data_to_json():
-                    st.success("✅ Data berhasil disimpan")
+                if self.save_data_to_json(background=True):
+                    st.info("💾 Data sedang disimpan di latar belakang")
                 else:
                     st.error("❌ Gagal menyimpan data")
         
@@ -1425,6 +1419,9 @@ class FinanceAppGUI:
             if st.button("💾 Export ke CSV"):
                 self.export_to_csv()
         
+        self.recurring_section()
+        self.diagnostics_section()
+        
         # Reset account option (with confirmation)
         st.markdown("---")
         st.markdown("#### ⚠️ Zona Berbahaya")
@@ -1437,6 +1434,50 @@ class FinanceAppGUI:
                 st.success("✅ Akun berhasil direset. Silakan refresh halaman.")
                 st.rerun()
     
+    def diagnostics_section(self):
+        """Hidden diagnostics panel (tampil dengan ?diagnostics=1 atau saat instrumentasi aktif)"""
+        if st.query_params.get("diagnostics") != "1" and not instrumentation.is_enabled():
+            return
+        
+        st.markdown("---")
+        with st.expander("🩺 Diagnostics"):
+            enabled = st.toggle("Aktifkan instrumentasi", value=instrumentation.is_enabled(), key="diagnostics_enabled")
+            if enabled and not instrumentation.is_enabled():
+                instrumentation.enable()
+            elif not enabled and instrumentation.is_enabled():
+                instrumentation.disable()
+            
+            if st.button("🔄 Reset Statistik", key="diagnostics_reset"):
+                instrumentation.reset()
+            
+            cache = self.figure_cache
+            st.caption(f"📊 Cache chart: {len(cache)}/{cache.maxsize} figure · {cache.hits} hit · {cache.misses} miss")
+            
+            stats = instrumentation.get_stats()
+            if not stats:
+                st.info("📭 Belum ada data instrumentasi. Aktifkan lalu gunakan aplikasi.")
+                return
+            
+            st.dataframe(
+                [{
+                    "Operasi": stat["name"],
+                    "Jumlah": stat["count"],
+                    "Total (ms)": round(stat["total_ms"], 2),
+                    "Rata-rata (ms)": round(stat["mean_ms"], 3),
+                    "p50 (ms)": round(stat["p50_ms"], 3),
+                    "p95 (ms)": round(stat["p95_ms"], 3),
+                    "p99 (ms)": round(stat["p99_ms"], 3),
+                    "Maks (ms)": round(stat["max_ms"], 3),
+                } for stat in stats],
+                width='stretch',
+                hide_index=True
+            )
+            
+            selected = st.selectbox("Histogram latensi", [stat["name"] for stat in stats], key="diagnostics_histogram")
+            histogram = next(stat["histogram"] for stat in stats if stat["name"] == selected)
+            st.bar_chart({"Jumlah panggilan": histogram})
+    
+    @timed()
     def export_to_csv(self):
         """Export transactions to CSV"""
         if not self.account or not self.account.transactions:
@@ -1444,29 +1485,39 @@ class FinanceAppGUI:
             return
         
         try:
-            # Prepare data for CSV
-            csv_data = []
-            running_balance = 0
+            # CSV disimpan per versi akun; export ulang tanpa perubahan tidak dihitung lagi
+            cached = st.session_state.get("csv_export")
+            if cached and cached[0] == self.account.version:
+                csv = cached[1]
+            else:
+                # Prepare data for CSV
+                csv_data = []
+                running_balances = self.account.get_running_balances()
             
-            for transaction in self.account.transactions:
-                if transaction.transaction_type == "income":
-                    running_balance += transaction.amount
-                    amount_display = f"+{transaction.amount:,.0f}"
-                else:
-                    running_balance -= transaction.amount
-                    amount_display = f"-{transaction.amount:,.0f}"
+                for transaction, running_balance in zip(self.account.transactions, running_balances):
+                    if transaction.transaction_type == "income":
+                        amount_display = f"+{transaction.amount:,.0f}"
+                    else:
+                        amount_display = f"-{transaction.amount:,.0f}"
                 
-                csv_data.append({
-                    'Tanggal': transaction.date.strftime('%d/%m/%Y %H:%M'),
-                    'Jenis': transaction.transaction_type.capitalize(),
-                    'Kategori': transaction.category,
-                    'Deskripsi': transaction.description,
-                    'Jumlah': amount_display,
-                    'Saldo': f"{running_balance:,.0f}"
-                })
+                    csv_data.append({
+                        'Tanggal': transaction.date.strftime('%d/%m/%Y %H:%M'),
+                        'Jenis': transaction.transaction_type.capitalize(),
+                        'Kategori': transaction.category,
+                        'Deskripsi': transaction.description,
+                        'Jumlah': amount_display,
+                        'Saldo': f"{running_balance:,.0f}"
+                    })
             
-            df = pd.DataFrame(csv_data)
-            csv = df.to_csv(index=False)
+                # Modul csv bawaan cukup untuk export; pandas tidak perlu dimuat
+                import csv as csv_module
+                import io
+                buffer = io.StringIO()
+                writer = csv_module.DictWriter(buffer, fieldnames=list(csv_data[0].keys()), lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(csv_data)
+                csv = buffer.getvalue()
+                st.session_state.csv_export = (self.account.version, csv)
             
             # Create download button
             filename = f"finance_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -1483,8 +1534,77 @@ class FinanceAppGUI:
         except Exception as e:
             st.error(f"❌ Error exporting to CSV: {e}")
     
+    def run_recurring(self):
+        """Catat transaksi berulang yang jatuh tempo; dicek setiap rerun (biasanya tidak ada yang baru)"""
+        from recurring import RecurringScheduler
+        
+        scheduler = RecurringScheduler.from_dict(self.storage.get_section(RecurringScheduler.SECTION, {}))
+        count = scheduler.catch_up(self.account, storage=self.storage)
+        if count is None:
+            st.error(f"❌ Transaksi berulang yang jatuh tempo belum dicatat: {scheduler.last_message}")
+        elif count:
+            # Satu batch dan satu kali simpan, berapa pun jumlah kejadian yang terlewat
+            self.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+            self.save_data_to_json(background=True)
+            st.session_state.success_message = f"🔁 {count} transaksi berulang yang terlewat telah dicatat"
+            st.session_state.show_success_message = True
+    
+    def recurring_section(self):
+        """Daftar aturan transaksi berulang beserta form tambah/hapus"""
+        from recurring import FREQUENCY_LABELS, RecurringScheduler
+        
+        scheduler = RecurringScheduler.from_dict(self.storage.get_section(RecurringScheduler.SECTION, {}))
+        st.markdown("---")
+        st.markdown("#### 🔁 Transaksi Berulang")
+        
+        for rule in list(scheduler.rules.values()):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.write(("✅ " if not rule.is_finished else "⏹️ ") + str(rule))
+            with col2:
+                if st.button("🗑️ Hapus", key=f"recurring_delete_{rule.id}"):
+                    scheduler.remove_rule(rule.id)
+                    self.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+                    self.save_data_to_json(background=True)
+                    st.rerun()
+        if not scheduler.rules:
+            st.caption("📭 Belum ada transaksi berulang")
+        
+        with st.expander("➕ Tambah Transaksi Berulang"):
+            with st.form("add_recurring_form", clear_on_submit=True):
+                col1, col2 = st.columns(2)
+                with col1:
+                    transaction_type = st.selectbox("Jenis", ["expense", "income"],
+                                                    format_func=lambda t: "💸 Pengeluaran" if t == "expense" else "💵 Pemasukan")
+                    amount = st.number_input("Jumlah (Rp)", min_value=0.0, step=1000.0)
+                    category = st.text_input("🏷️ Kategori", value="Tagihan")
+                    description = st.text_input("📝 Deskripsi", placeholder="mis. Listrik PLN")
+                with col2:
+                    frequency = st.selectbox("Frekuensi", list(FREQUENCY_LABELS), index=2,
+                                             format_func=FREQUENCY_LABELS.get)
+                    interval = st.number_input("Setiap (hari/minggu/bulan)", min_value=1, value=1, step=1)
+                    start = st.date_input("Mulai", value=datetime.now().date())
+                    end = st.date_input("Sampai (opsional)", value=None)
+                
+                if st.form_submit_button("💾 Simpan Aturan"):
+                    rule = scheduler.add_rule(
+                        transaction_type, amount, category.strip() or "Lainnya",
+                        description.strip() or category.strip() or "Transaksi berulang", frequency,
+                        datetime.combine(start, datetime.min.time()), int(interval),
+                        datetime.combine(end, datetime.max.time()) if end else None
+                    )
+                    if rule is None:
+                        st.error("❌ Aturan tidak valid, periksa jumlah dan tanggal")
+                    else:
+                        self.storage.set_section(RecurringScheduler.SECTION, scheduler.to_dict())
+                        # Kejadian yang sudah lewat langsung di-catch-up pada rerun berikutnya
+                        self.save_data_to_json(background=True)
+                        st.rerun()
+    
     def run(self):
         """Run the Streamlit application"""
+        self.run_recurring()
+        
         # Account sudah di-handle di __init__, jadi langsung tampilkan main_dashboard
         self.main_dashboard()
         
@@ -1493,7 +1613,20 @@ class FinanceAppGUI:
             st.success(st.session_state.success_message)
             st.session_state.show_success_message = False  # Reset after showing
 
+def run_app():
+    app = FinanceAppGUI()
+    app.run()
+
 # Run the application
 if __name__ == "__main__":
-    app = FinanceAppGUI()
-    app.run()
\ No newline at end of file
+    import profiling
+
+    if profiling.is_requested(st.query_params):
+        # Mode debug: profil setiap rerun penuh, diberi nama sesuai interaksi pemicunya
+        trigger = profiling.detect_trigger(st.session_state)
+        try:
+            profiling.profile_rerun(run_app, trigger)
+        finally:
+            profiling.remember_state(st.session_state)
+    else:
+        run_app()
\ No newline at end of file
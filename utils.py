@@ -1,10 +1,34 @@
 """
 Utilities untuk Personal Finance App
 """
+import calendar
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from currency import BASE_CURRENCY, format_amount
+
+def add_months(moment: datetime, months: int, day: int) -> datetime:
+    """Tambah `months` bulan; tanggal `day` dipotong ke akhir bulan (31 -> 28/29 Februari)"""
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+class Reporter:
+    """Pesan ✅/❌ untuk pengguna: di-print (CLI) dan disimpan di last_message
+
+    Frontend lain (API, GUI) membaca last_message setelah memanggil method, bukan menangkap
+    stdout yang dipakai bersama oleh semua thread. echo=False mematikan print.
+    """
+    
+    last_message: Optional[str] = None
+    echo = True
+    
+    def _report(self, message: str):
+        self.last_message = message
+        if self.echo:
+            print(message)
 
 class DataManager:
     """Class untuk mengelola penyimpanan dan loading data"""
@@ -95,14 +119,40 @@ class InputValidator:
     def validate_name(name: str) -> bool:
         """Validasi nama (tidak kosong dan tidak hanya whitespace)"""
         return bool(name and name.strip())
+    
+    @staticmethod
+    def validate_batch_line(line: str, transaction_type: str = "expense") -> tuple[bool, Any]:
+        """Validasi satu baris input batch 'jumlah;kategori;deskripsi'
+        
+        Awalan '+' atau '-' pada jumlah mengganti jenis menjadi pemasukan/pengeluaran.
+        Hasil: (True, (jenis, jumlah, kategori, deskripsi)) atau (False, pesan error).
+        """
+        parts = [part.strip() for part in line.split(';', 2)]
+        amount_str = parts[0]
+        if amount_str[:1] in ('+', '-'):
+            transaction_type = "income" if amount_str[0] == '+' else "expense"
+            amount_str = amount_str[1:].strip()
+        
+        is_valid, amount = InputValidator.validate_amount(amount_str)
+        if not is_valid or amount <= 0:
+            return False, f"jumlah '{parts[0]}' tidak valid"
+        
+        category = parts[1] if len(parts) > 1 and InputValidator.validate_name(parts[1]) else (
+            "Income" if transaction_type == "income" else "Expense")
+        if len(parts) > 2 and InputValidator.validate_name(parts[2]):
+            description = parts[2]
+        else:
+            description = f"{'Pemasukan' if transaction_type == 'income' else 'Pengeluaran'} - {category}"
+        
+        return True, (transaction_type, amount, category, description)
 
 class Formatter:
     """Class untuk formatting output"""
     
     @staticmethod
-    def format_currency(amount: float) -> str:
-        """Format angka menjadi format mata uang Rupiah"""
-        return f"Rp {amount:,.0f}".replace(',', '.')
+    def format_currency(amount: float, currency: str = BASE_CURRENCY) -> str:
+        """Format angka menjadi format mata uang (default Rupiah, pemisah ribuan titik)"""
+        return format_amount(amount, currency, thousands=".")
     
     @staticmethod
     def format_percentage(percentage: float, decimal_places: int = 1) -> str: